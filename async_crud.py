@@ -0,0 +1,39 @@
+import functools
+import inspect
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import crud
+
+# ==================== АСИНХРОННЫЕ ВЕРСИИ ФУНКЦИЙ crud.py ====================
+# Каждая функция crud.py с первым параметром session доступна здесь под тем же
+# именем как корутина, принимающая AsyncSession:
+#
+#     from async_crud import get_all_books
+#     books = await get_all_books(async_session, 50, None)
+#
+# Логика запросов не дублируется: функция выполняется через AsyncSession.run_sync,
+# где ввод-вывод идет через asyncpg в цикле событий (greenlet SQLAlchemy),
+# а не в отдельном потоке.
+
+
+def to_async(func):
+    """Сделать из функции crud.py корутину с AsyncSession вместо Session"""
+
+    @functools.wraps(func)
+    async def wrapper(session: AsyncSession, *args, **kwargs):
+        return await session.run_sync(func, *args, **kwargs)
+
+    return wrapper
+
+
+def _takes_session(func) -> bool:
+    params = list(inspect.signature(func).parameters)
+    return bool(params) and params[0] == "session"
+
+
+__all__ = []
+for _name, _func in inspect.getmembers(crud, inspect.isfunction):
+    if _func.__module__ == crud.__name__ and not _name.startswith("_") and _takes_session(_func):
+        globals()[_name] = to_async(_func)
+        __all__.append(_name)
@@ -0,0 +1,80 @@
+import functools
+import inspect
+import os
+
+from fastapi import APIRouter, Depends
+from fastapi.routing import APIRoute
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import get_session, get_async_session
+
+# ==================== АСИНХРОННЫЙ РЕЖИМ ЭНДПОИНТОВ ====================
+# ASYNC_ENDPOINTS=1 - все эндпоинты с Depends(get_session) становятся async def
+# и работают через AsyncSession (asyncpg). Запрос к БД больше не занимает поток
+# из пула, поэтому один воркер uvicorn держит много одновременных запросов.
+# Применяется к каждому роутеру при подключении (см. routers/__init__.py).
+# run_sync выполняет тело эндпоинта в самом цикле событий: async подходит только
+# эндпоинтам, которые лишь читают и пишут БД. Эндпоинты со своей работой вне БД
+# (встроенные индексы, кэш фасетов) помечены @sync_endpoint и остаются в пуле потоков,
+# эндпоинты без get_session (импорт/экспорт CSV, пересчет представлений) - тоже.
+ASYNC_ENDPOINTS = os.getenv("ASYNC_ENDPOINTS", "0") == "1"
+
+
+def _session_param(endpoint):
+    """Имя параметра эндпоинта с Depends(get_session) или None"""
+    for param in inspect.signature(endpoint).parameters.values():
+        if getattr(param.default, "dependency", None) is get_session:
+            return param.name
+    return None
+
+
+def _to_async_endpoint(endpoint, session_param: str):
+    """Обернуть синхронный эндпоинт: тело выполняется через AsyncSession.run_sync"""
+    signature = inspect.signature(endpoint)
+    params = [
+        param.replace(annotation=AsyncSession, default=Depends(get_async_session))
+        if param.name == session_param else param
+        for param in signature.parameters.values()
+    ]
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        async_session = kwargs.pop(session_param)
+        return await async_session.run_sync(lambda session: endpoint(**kwargs, **{session_param: session}))
+
+    wrapper.__signature__ = signature.replace(parameters=params)
+    return wrapper
+
+
+def enable_async_endpoints(router: APIRouter) -> int:
+    """Перевести синхронные эндпоинты роутера (кроме @sync_endpoint) на AsyncSession. Возвращает число замененных"""
+    replaced = 0
+    for index, route in enumerate(router.routes):
+        if not isinstance(route, APIRoute) or inspect.iscoroutinefunction(route.endpoint):
+            continue
+        if getattr(route.endpoint, "sync_only", False):
+            continue
+        session_param = _session_param(route.endpoint)
+        if session_param is None:
+            continue
+        router.routes[index] = APIRoute(
+            route.path,
+            _to_async_endpoint(route.endpoint, session_param),
+            methods=route.methods,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            name=route.name,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            openapi_extra=route.openapi_extra,
+        )
+        replaced += 1
+    return replaced
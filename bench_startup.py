@@ -0,0 +1,56 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# ==================== БЮДЖЕТ ВРЕМЕНИ ЗАПУСКА ====================
+# Импорт main.py (то, что платит каждый воркер и каждый тест/скрипт) и полная
+# готовность приложения (подключены все роутеры) замеряются в чистом процессе.
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "700"))
+READY_BUDGET_MS = float(os.getenv("STARTUP_READY_BUDGET_MS", "2000"))
+
+PROBE = """
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.lazy_routers.load_all()
+ready = time.perf_counter()
+print((imported - start) * 1000, (ready - start) * 1000)
+"""
+
+
+def measure(runs: int) -> tuple:
+    """Медианы времени импорта и готовности, мс"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    imports, readies = [], []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=here, capture_output=True, text=True, check=True
+        )
+        imported, ready = map(float, result.stdout.split()[-2:])
+        imports.append(imported)
+        readies.append(ready)
+    return statistics.median(imports), statistics.median(readies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени импорта приложения")
+    parser.add_argument("--runs", type=int, default=5, help="число замеров (берется медиана)")
+    args = parser.parse_args()
+
+    import_ms, ready_ms = measure(args.runs)
+    ok = True
+    for title, value, budget in [
+        ("Импорт main", import_ms, IMPORT_BUDGET_MS),
+        ("Все роутеры подключены", ready_ms, READY_BUDGET_MS),
+    ]:
+        within = value <= budget
+        ok = ok and within
+        print(f"{'✅' if within else '❌'} {title}: {value:.0f} мс (бюджет {budget:.0f} мс)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import gzip
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, select, func
+from sqlalchemy import literal, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from models import Author, Book, BookAuthor
+
+# ==================== ВСТРОЕННЫЙ ИНВЕРТИРОВАННЫЙ ИНДЕКС КАТАЛОГА ====================
+# Для установок на PostgreSQL без расширений: индекс по заглавиям, ключевым словам
+# и авторам книг живет в памяти процесса. Строится при старте потоковым чтением
+# каталога, сохраняется в сжатый файл и обновляется при записи через crud.py.
+# Поиск совпадений (пересечение списков вхождений + BM25) к БД не обращается.
+# CATALOG_SEARCH_BACKEND=index - /search/books ищет по этому индексу,
+# postgres (по умолчанию) - полнотекстовым поиском PostgreSQL (fulltext.py).
+# У каждого процесса свой индекс. У каждой книги штамп версии строки: при старте
+# заново индексируются только книги, изменившиеся с сохранения файла, а при
+# поиске не чаще раза в CATALOG_SYNC_SECONDS штампы сверяются с БД - так в индекс
+# попадают записи других процессов API и загрузки CSV (transfer.py).
+CATALOG_SEARCH_BACKEND = os.getenv("CATALOG_SEARCH_BACKEND", "postgres")
+CATALOG_INDEX_PATH = os.getenv("CATALOG_INDEX_PATH", "catalog_index.json.gz")
+CATALOG_BUILD_BATCH = 2000   # Строк каталога за одну порцию потокового чтения
+CATALOG_MAX_HITS = 1000      # Совпадений в одном окне фильтрации в БД
+CATALOG_SYNC_SECONDS = float(os.getenv("CATALOG_SYNC_SECONDS", "30"))  # Сверка штампов с БД, 0 - не сверять
+INDEX_FORMAT = 1
+
+# Вес вхождения слова в зависимости от поля
+FIELD_WEIGHTS = {"title": 2.0, "authors": 1.5, "keywords": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r"\w+")
+STOP_WORDS = {
+    "и", "в", "во", "на", "с", "со", "о", "об", "по", "к", "ко", "а", "но", "из", "за", "для", "от", "до",
+    "a", "an", "and", "the", "of", "in", "on", "to", "for",
+}
+# Окончания для простого стемминга (русский и английский), длинные проверяются первыми
+ENDINGS = sorted([
+    "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими", "ией", "иям", "иях",
+    "ая", "яя", "ое", "ее", "ые", "ие", "ой", "ей", "ий", "ый", "ом", "ем", "ам", "ям", "ах", "ях",
+    "ов", "ев", "ую", "юю", "ию", "ия", "ии",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+    "ing", "ed", "es", "s",
+], key=len, reverse=True)
+MIN_STEM = 3
+
+
+def stem(word: str) -> str:
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Слова текста в нормальной форме: нижний регистр, ё -> е, без окончаний и стоп-слов"""
+    if not text:
+        return []
+    words = TOKEN_RE.findall(text.lower().replace("ё", "е"))
+    return [stem(word) for word in words if word not in STOP_WORDS]
+
+
+def highlight(text: Optional[str], query: str) -> Optional[str]:
+    """Выделить в тексте слова запроса тегами <b>...</b>"""
+    if not text:
+        return text
+    terms = set(tokenize(query))
+    return TOKEN_RE.sub(
+        lambda match: f"<b>{match.group()}</b>" if stem(match.group().lower().replace("ё", "е")) in terms else match.group(),
+        text
+    )
+
+
+def _document(row) -> Dict[str, float]:
+    """Взвешенные частоты слов книги"""
+    terms: Dict[str, float] = {}
+    fields = {
+        "title": [row.main_title, row.parallel_title, row.additional_title],
+        "authors": [row.authors],
+        "keywords": [row.keywords],
+    }
+    for field, texts in fields.items():
+        for text in texts:
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0.0) + FIELD_WEIGHTS[field]
+    return terms
+
+
+def _xmin(model):
+    table = model.__table__
+    return literal_column(f'"{table.schema}".{table.name}.xmin::text')
+
+
+def _catalog_query(with_text: bool = True):
+    """Книги с авторами одной строкой и штампом версии строки.
+
+    Штамп - xmin книги и ее связей с авторами: меняется при любом изменении
+    книги, ее авторов и состава авторов, кем бы оно ни было сделано.
+    """
+    links = (
+        select(
+            BookAuthor.book_id,
+            func.string_agg(
+                func.concat_ws(" ", Author.last_name, Author.first_name, Author.middle_name),
+                aggregate_order_by(literal(" "), BookAuthor.author_order, BookAuthor.id)
+            ).label("authors"),
+            func.string_agg(
+                func.concat(_xmin(BookAuthor), ".", _xmin(Author)),
+                aggregate_order_by(literal(","), BookAuthor.id)
+            ).label("links_version")
+        )
+        .join(Author, Author.id == BookAuthor.author_id)
+        .group_by(BookAuthor.book_id)
+        .subquery()
+    )
+    columns = [Book.id, func.concat(_xmin(Book), "/", links.c.links_version).label("stamp")]
+    if with_text:
+        columns += [Book.main_title, Book.parallel_title, Book.additional_title, Book.keywords, links.c.authors]
+    return select(*columns).select_from(Book).outerjoin(links, links.c.book_id == Book.id)
+
+
+class CatalogIndex:
+    """Инвертированный индекс: слово -> {id книги: вес}, книга -> {слово: вес}"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.loaded = False
+        self._docs: Dict[int, Dict[str, float]] = {}
+        self._stamps: Dict[int, str] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---------- содержимое ----------
+
+    def _add(self, book_id: int, stamp: str, terms: Dict[str, float]) -> None:
+        self._remove(book_id)
+        self._docs[book_id] = terms
+        self._stamps[book_id] = stamp
+        for term, weight in terms.items():
+            self._postings.setdefault(term, {})[book_id] = weight
+        length = sum(terms.values())
+        self._lengths[book_id] = length
+        self._total_length += length
+
+    def _remove(self, book_id: int) -> None:
+        terms = self._docs.pop(book_id, None)
+        if terms is None:
+            return
+        del self._stamps[book_id]
+        for term in terms:
+            postings = self._postings[term]
+            del postings[book_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(book_id)
+
+    def _replace(self, other: "CatalogIndex") -> None:
+        with self._lock:
+            self._docs, self._stamps = other._docs, other._stamps
+            self._postings, self._lengths, self._total_length = other._postings, other._lengths, other._total_length
+            self._synced_at = time.monotonic()
+            self.loaded = True
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---------- файл и загрузка ----------
+
+    def save(self) -> None:
+        """Сохранить документы в файл (списки вхождений восстанавливаются при загрузке)"""
+        with self._lock:
+            docs = {str(book_id): [self._stamps[book_id], terms] for book_id, terms in self._docs.items()}
+        # Свой временный файл у каждого процесса: файл подменяется целиком, без смешения записей
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(dir=directory, prefix=".catalog_index.", delete=False) as raw:
+            tmp_path = raw.name
+            with gzip.open(raw, "wt", encoding="utf-8") as file:
+                json.dump({"format": INDEX_FORMAT, "docs": docs}, file, ensure_ascii=False, separators=(",", ":"))
+        try:
+            os.replace(tmp_path, self.path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+    def _read_file(self) -> Dict[int, list]:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if data.get("format") != INDEX_FORMAT:
+            return {}
+        return {int(book_id): doc for book_id, doc in data["docs"].items()}
+
+    def load(self, session: Session) -> dict:
+        """Загрузить индекс: документы из файла, штампы которых совпадают с БД,
+        остальные книги проиндексировать заново (без файла - весь каталог).
+        Каталог читается потоково порциями по CATALOG_BUILD_BATCH строк."""
+        saved = self._read_file()
+        fresh = CatalogIndex(self.path)
+        stale = []
+        stamps = session.execute(_catalog_query(with_text=False).execution_options(yield_per=CATALOG_BUILD_BATCH))
+        for book_id, stamp in stamps:
+            doc = saved.get(book_id)
+            if doc and doc[0] == stamp:
+                fresh._add(book_id, stamp, doc[1])
+            else:
+                stale.append(book_id)
+
+        if saved:
+            for start in range(0, len(stale), CATALOG_BUILD_BATCH):
+                chunk = stale[start:start + CATALOG_BUILD_BATCH]
+                for row in session.execute(_catalog_query().where(Book.id.in_(chunk))):
+                    fresh._add(row.id, row.stamp, _document(row))
+        elif stale:
+            for row in session.execute(_catalog_query().execution_options(yield_per=CATALOG_BUILD_BATCH)):
+                fresh._add(row.id, row.stamp, _document(row))
+
+        self._replace(fresh)
+        if stale or len(saved) != len(fresh):
+            self.save()
+        return {"books": len(fresh), "from_file": len(fresh) - len(stale), "indexed": len(stale)}
+
+    # ---------- инкрементальные изменения ----------
+
+    def index_books(self, session: Session, book_ids: Iterable[int]) -> None:
+        """Переиндексировать книги после изменения (удаленные убираются из индекса)"""
+        book_ids = list(book_ids)
+        if not self.loaded or not book_ids:
+            return
+        rows = session.execute(_catalog_query().where(Book.id.in_(book_ids))).all()
+        with self._lock:
+            for book_id in book_ids:
+                self._remove(book_id)
+            for row in rows:
+                self._add(row.id, row.stamp, _document(row))
+
+    def sync(self, session: Session) -> int:
+        """Сверить штампы всех книг с БД и переиндексировать изменившиеся, новые и
+        удаленные (записи других процессов). Возвращает число таких книг"""
+        stamps = session.execute(_catalog_query(with_text=False).execution_options(yield_per=CATALOG_BUILD_BATCH))
+        current = {book_id: stamp for book_id, stamp in stamps}
+        with self._lock:
+            changed = [book_id for book_id, stamp in current.items() if self._stamps.get(book_id) != stamp]
+            changed += [book_id for book_id in self._stamps if book_id not in current]
+        for start in range(0, len(changed), CATALOG_BUILD_BATCH):
+            self.index_books(session, changed[start:start + CATALOG_BUILD_BATCH])
+        return len(changed)
+
+    def sync_if_due(self, session: Session) -> int:
+        """sync(), если с прошлой сверки прошло CATALOG_SYNC_SECONDS"""
+        if not self.loaded or CATALOG_SYNC_SECONDS <= 0:
+            return 0
+        with self._lock:
+            if time.monotonic() - self._synced_at < CATALOG_SYNC_SECONDS:
+                return 0
+            # Сверку начинает один поток, остальные запросы ищут по текущему индексу
+            self._synced_at = time.monotonic()
+        return self.sync(session)
+
+    # ---------- поиск ----------
+
+    def search(self, text: str, limit: Optional[int] = CATALOG_MAX_HITS) -> List[Tuple[int, float]]:
+        """Книги, содержащие все слова запроса: [(id, оценка BM25)] по убыванию оценки"""
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return []
+            # Пересечение: идем по самому короткому списку, остальные проверяем по хэшу
+            postings.sort(key=len)
+            candidates = [book_id for book_id in postings[0] if all(book_id in other for other in postings[1:])]
+            count = len(self._docs)
+            average_length = self._total_length / count
+            scored = []
+            for book_id in candidates:
+                length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[book_id] / average_length)
+                score = 0.0
+                for posting in postings:
+                    idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    weight = posting[book_id]
+                    score += idf * weight * (BM25_K1 + 1) / (weight + length_norm)
+                scored.append((book_id, score))
+        scored.sort(key=lambda hit: (-hit[1], hit[0]))
+        return scored[:limit] if limit else scored
+
+
+catalog_index = CatalogIndex(CATALOG_INDEX_PATH)
@@ -0,0 +1,284 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select, delete, insert, func, or_, true, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import Book, BookCopy, ClassificationKey, ClassificationNode
+from repository import commit
+
+# ==================== ИНДЕКС КЛАССИФИКАЦИИ (УДК, ББК) ====================
+# Book.udk и Book.bbk - свободный текст ("821.133.1", "84(4Фра)", "004.42'236").
+# Из него берется основной индекс (вспомогательные определители в скобках,
+# после дефиса, апострофа и т.п. отбрасываются) и приводится к каноническому
+# виду. Каждая следующая цифра индекса - уровень ниже ("8" > "82" > "821" >
+# "821.1"), поэтому индекс - материализованный путь: все книги узла "004.4"
+# находятся одним LIKE '004.4%' по индексу classification_keys.
+# В classification_nodes хранятся узлы дерева, встречающиеся в каталоге, со
+# счетчиками книг и экземпляров всего поддерева. Узлы книги - все префиксы ее
+# индексов, поэтому при записи книг и экземпляров через crud.py счетчики этих
+# узлов сдвигаются на разницу (±1 книга, ±N экземпляров) без пересчета поддеревьев;
+# полный пересчет по LIKE - только при загрузке CSV и в rebuild_classification.
+SCHEMES = {
+    # схема: (цифр в индексе верхнего уровня, цифр в первой группе до точки)
+    "udk": (1, 3),
+    "bbk": (2, 2),
+}
+GROUP_DIGITS = 3         # Цифр в следующих группах (через точку)
+MAX_CODE_DIGITS = 40
+
+_PARTS_RE = re.compile(r"[+:;,/\s]+")   # Разделители нескольких индексов в одном поле
+_CODE_RE = re.compile(r"\d+(?:\.\d+)*", re.ASCII)
+
+Node = Tuple[str, str]   # (схема, индекс узла)
+
+
+def _canonical(scheme: str, digits: str) -> str:
+    first = SCHEMES[scheme][1]
+    groups = [digits[:first]] + [digits[position:position + GROUP_DIGITS] for position in range(first, len(digits), GROUP_DIGITS)]
+    return ".".join(group for group in groups if group)
+
+
+def parse_codes(scheme: str, text: Optional[str]) -> List[str]:
+    """Основные индексы из текста поля udk/bbk в каноническом виде"""
+    codes = []
+    for part in _PARTS_RE.split(text or ""):
+        match = _CODE_RE.match(part.lstrip("[(\"'"))
+        if match:
+            digits = match.group().replace(".", "")[:MAX_CODE_DIGITS]
+            codes.append(_canonical(scheme, digits))
+    return list(dict.fromkeys(codes))
+
+
+def code_levels(scheme: str, code: str) -> List[str]:
+    """Узлы от верхнего уровня до самого индекса: "821.1" -> ["8", "82", "821", "821.1"]"""
+    digits = code.replace(".", "")
+    top = min(SCHEMES[scheme][0], len(digits))
+    return [_canonical(scheme, digits[:length]) for length in range(top, len(digits) + 1)]
+
+
+def normalize_code(scheme: str, text: str) -> Optional[str]:
+    """Индекс из строки запроса ("0044", "004.4") в каноническом виде или None"""
+    codes = parse_codes(scheme, text)
+    return codes[0] if codes else None
+
+
+def classification_match(scheme: str, code: str):
+    """Подзапрос id книг в поддереве узла"""
+    return select(ClassificationKey.book_id).where(
+        ClassificationKey.scheme == scheme,
+        ClassificationKey.code.like(f"{code}%")
+    )
+
+
+# ---------- пересчет узлов ----------
+
+def _roots(codes: List[str]) -> List[str]:
+    """Узлы, не входящие в поддерево других узлов списка"""
+    roots = []
+    for code in sorted(codes):
+        if not roots or not code.startswith(roots[-1]):
+            roots.append(code)
+    return roots
+
+
+def _node_counts(scheme: str, codes: Optional[List[str]] = None):
+    """Запрос (узел, книг, экземпляров) по индексам книг; codes - только эти узлы"""
+    key = ClassificationKey
+    top = SCHEMES[scheme][0]
+    # Все префиксы индекса книги, заканчивающиеся цифрой, - узлы, в которые она входит
+    length = func.length(key.code)
+    prefixes = (
+        func.generate_series(func.least(top, length), length)
+        .table_valued("n").render_derived(name="prefixes").lateral()
+    )
+    node = func.left(key.code, prefixes.c.n)
+    pairs = (
+        select(key.book_id, node.label("code"))
+        .select_from(key)
+        .join(prefixes, true())
+        .where(key.scheme == scheme, func.substr(key.code, prefixes.c.n, 1) != ".")
+    )
+    if codes is not None:
+        pairs = pairs.where(or_(*[key.code.like(f"{root}%") for root in _roots(codes)]), node.in_(codes))
+    pairs = pairs.distinct().cte("pairs")
+    copies = (
+        select(BookCopy.book_id, func.count().label("copies"))
+        .where(BookCopy.book_id.in_(select(pairs.c.book_id)))
+        .group_by(BookCopy.book_id)
+        .subquery()
+    )
+    return (
+        select(pairs.c.code, func.count(), func.coalesce(func.sum(copies.c.copies), 0))
+        .select_from(pairs)
+        .outerjoin(copies, copies.c.book_id == pairs.c.book_id)
+        .group_by(pairs.c.code)
+    )
+
+
+def _node_row(scheme: str, code: str, books: int, copies: int) -> dict:
+    levels = code_levels(scheme, code)
+    return {
+        "scheme": scheme, "code": code, "parent": levels[-2] if len(levels) > 1 else None,
+        "depth": len(levels), "book_count": books, "copy_count": copies,
+    }
+
+
+def recount_nodes(session: Session, nodes: Iterable[Node]) -> None:
+    """Пересчитать счетчики узлов (узлы без книг удаляются). Без commit"""
+    nodes = set(nodes)
+    for scheme in SCHEMES:
+        codes = sorted(code for node_scheme, code in nodes if node_scheme == scheme)
+        if not codes:
+            continue
+        counts = {code: (books, copies) for code, books, copies in session.execute(_node_counts(scheme, codes))}
+        empty = set(codes) - set(counts)
+        if empty:
+            session.execute(delete(ClassificationNode).where(
+                ClassificationNode.scheme == scheme, ClassificationNode.code.in_(empty)
+            ))
+        if counts:
+            query = pg_insert(ClassificationNode).values(
+                [_node_row(scheme, code, books, copies) for code, (books, copies) in counts.items()]
+            )
+            session.execute(query.on_conflict_do_update(
+                index_elements=["scheme", "code"],
+                set_={"book_count": query.excluded.book_count, "copy_count": query.excluded.copy_count}
+            ))
+
+
+def _shift_nodes(session: Session, deltas: Dict[Node, Tuple[int, int]]) -> None:
+    """Прибавить к счетчикам узлов (книг, экземпляров) разницу: новые узлы создаются,
+    узлы без книг удаляются. Без commit"""
+    deltas = {node: change for node, change in deltas.items() if any(change)}
+    if not deltas:
+        return
+    query = pg_insert(ClassificationNode).values(
+        [_node_row(scheme, code, books, copies) for (scheme, code), (books, copies) in deltas.items()]
+    )
+    session.execute(query.on_conflict_do_update(
+        index_elements=["scheme", "code"],
+        set_={
+            "book_count": ClassificationNode.book_count + query.excluded.book_count,
+            "copy_count": ClassificationNode.copy_count + query.excluded.copy_count,
+        }
+    ))
+    session.execute(delete(ClassificationNode).where(
+        ClassificationNode.book_count <= 0,
+        tuple_(ClassificationNode.scheme, ClassificationNode.code).in_(list(deltas))
+    ))
+
+
+def _add(deltas: Dict[Node, Tuple[int, int]], nodes: Iterable[Node], books: int, copies: int) -> None:
+    for node in nodes:
+        old_books, old_copies = deltas.get(node, (0, 0))
+        deltas[node] = (old_books + books, old_copies + copies)
+
+
+def book_nodes(session: Session, book_ids: List[int]) -> Dict[int, Set[Node]]:
+    """Узлы (со всеми предками), в которые сейчас входит каждая из книг"""
+    nodes: Dict[int, Set[Node]] = {book_id: set() for book_id in book_ids}
+    keys = session.execute(
+        select(ClassificationKey.book_id, ClassificationKey.scheme, ClassificationKey.code)
+        .where(ClassificationKey.book_id.in_(book_ids))
+    ).all()
+    for book_id, scheme, code in keys:
+        nodes[book_id].update((scheme, level) for level in code_levels(scheme, code))
+    return nodes
+
+
+def _copies_by_book(session: Session, book_ids: List[int]) -> Dict[int, int]:
+    return dict(session.execute(
+        select(BookCopy.book_id, func.count()).where(BookCopy.book_id.in_(book_ids)).group_by(BookCopy.book_id)
+    ).all())
+
+
+def refresh_classification(session: Session, book_ids: List[int],
+                           previous: Optional[Dict[int, Set[Node]]] = None) -> None:
+    """Пересчитать индексы созданных/измененных/удаленных книг. У узлов, из которых
+    книга ушла или в которые пришла, счетчики меняются на 1 книгу и ее экземпляры.
+    previous - узлы книг до изменения, если их индексы уже удалены (удаление книги)"""
+    book_ids = list(set(book_ids))
+    if not book_ids:
+        return
+    old = book_nodes(session, book_ids) if previous is None else previous
+    session.execute(delete(ClassificationKey).where(ClassificationKey.book_id.in_(book_ids)))
+    books = session.execute(select(Book.id, Book.udk, Book.bbk).where(Book.id.in_(book_ids))).all()
+    rows = [
+        {"scheme": scheme, "book_id": book.id, "code": code}
+        for book in books for scheme in SCHEMES for code in parse_codes(scheme, getattr(book, scheme))
+    ]
+    if rows:
+        session.execute(insert(ClassificationKey), rows)
+    new: Dict[int, Set[Node]] = {book_id: set() for book_id in book_ids}
+    for row in rows:
+        new[row["book_id"]].update((row["scheme"], level) for level in code_levels(row["scheme"], row["code"]))
+    copies = _copies_by_book(session, book_ids)
+    deltas: Dict[Node, Tuple[int, int]] = {}
+    for book_id in book_ids:
+        before, after = old.get(book_id, set()), new[book_id]
+        _add(deltas, before - after, -1, -copies.get(book_id, 0))
+        _add(deltas, after - before, 1, copies.get(book_id, 0))
+    _shift_nodes(session, deltas)
+    commit(session)
+
+
+def shift_copy_counts(session: Session, copies: Dict[int, int]) -> None:
+    """У книг добавились (+n) или убыли (-n) экземпляры: сдвинуть счетчики их узлов"""
+    copies = {book_id: count for book_id, count in copies.items() if count}
+    if not copies:
+        return
+    deltas: Dict[Node, Tuple[int, int]] = {}
+    for book_id, nodes in book_nodes(session, list(copies)).items():
+        _add(deltas, nodes, 0, copies[book_id])
+    _shift_nodes(session, deltas)
+    commit(session)
+
+
+def refresh_copy_counts(session: Session, book_ids: List[int]) -> None:
+    """Полный пересчет узлов книг, у которых экземпляры изменились неизвестно как
+    (загрузка CSV: прежние значения строк недоступны)"""
+    book_ids = list(set(book_ids))
+    if not book_ids:
+        return
+    recount_nodes(session, set().union(*book_nodes(session, book_ids).values()))
+    commit(session)
+
+
+def changed_book_ids(cursor, model) -> List[int]:
+    """ID книг, строки которых (книги или экземпляры) изменены текущей транзакцией (курсор psycopg2)"""
+    table = model.__table__
+    column = "id" if model is Book else "book_id"
+    cursor.execute(
+        f'SELECT DISTINCT {column} FROM "{table.schema}".{table.name} '
+        "WHERE xmin::text::bigint = txid_current() & 4294967295"
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_classification(session: Session, batch_size: int = 5000) -> int:
+    """Построить индексы всех книг и дерево узлов заново. Возвращает число узлов"""
+    session.execute(delete(ClassificationNode))
+    session.execute(delete(ClassificationKey))
+    query = select(Book.id, Book.udk, Book.bbk).execution_options(yield_per=batch_size)
+    for partition in session.execute(query).partitions():
+        rows = [
+            {"scheme": scheme, "book_id": book.id, "code": code}
+            for book in partition for scheme in SCHEMES for code in parse_codes(scheme, getattr(book, scheme))
+        ]
+        if rows:
+            session.execute(insert(ClassificationKey), rows)
+    count = 0
+    for scheme in SCHEMES:
+        rows = [_node_row(scheme, code, books, copies) for code, books, copies in session.execute(_node_counts(scheme))]
+        for start in range(0, len(rows), batch_size):
+            session.execute(insert(ClassificationNode), rows[start:start + batch_size])
+        count += len(rows)
+    session.commit()
+    return count
+
+
+if __name__ == "__main__":
+    from database import get_engine
+    print("🗂️ Строим дерево классификации УДК/ББК...")
+    with Session(get_engine()) as session:
+        print(f"✅ Узлов классификации: {rebuild_classification(session)}")
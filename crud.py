@@ -0,0 +1,1307 @@
+from collections import Counter
+from sqlmodel import select, Session, func
+from sqlalchemy import ARRAY, Date, Float, Integer, case, cast, literal, literal_column, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from typing import List, Optional, Tuple
+from datetime import date, datetime
+from models import *
+from repository import Repository, atomic, keyset_select
+from reference_cache import reference_cache, CachedRepository
+from fulltext import refresh_book_documents, book_tsquery, ranked_search_columns, matches, search_headline
+from catalog_index import CATALOG_SEARCH_BACKEND, CATALOG_MAX_HITS, catalog_index, highlight
+from facet_cache import facet_cache, normalize_query
+from suggest_index import suggest_index
+from name_keys import refresh_name_keys, remove_name_keys, name_match
+from identifiers import isbn13_or_none, normalize_barcode, with_isbn13
+from keywords import KEYWORD_CLOUD_LIMIT, keyword_key, refresh_book_keywords
+from statistics_engine import METRICS, refresh_row_statistics, refresh_rows_statistics, statistic_key
+from stat_views import book_availability_view, day_counter_columns, library_counters_query, library_counters_view, read_view
+from classification import (
+    book_nodes, classification_match, code_levels, refresh_classification, shift_copy_counts
+)
+
+# ==================== КОНСТАНТЫ ДЛЯ РАСЧЕТА ШТРАФОВ ====================
+FINE_PER_DAY = 10.0      # Штраф за день просрочки
+MAX_FINE_DAYS = 30       # Максимальное количество дней для расчета
+MAX_FINE = 300.0         # Максимальный штраф
+GRACE_PERIOD_DAYS = 3    # Дни без штрафа после срока возврата
+
+# Ограничения
+MAX_BOOKS_PER_READER = 10
+MAX_LOAN_DAYS = 60
+DEFAULT_LOAN_DAYS = 30
+# =======================================================================
+
+# ==================== РЕПОЗИТОРИИ ====================
+# Один общий Repository на каждую из 20 таблиц (см. repository.py).
+# Девять справочников читаются из кэша процесса (см. reference_cache.py)
+edition_type_repo = CachedRepository(EditionType, reference_cache)
+language_repo = CachedRepository(Language, reference_cache)
+country_repo = CachedRepository(Country, reference_cache)
+city_repo = CachedRepository(City, reference_cache)
+publisher_repo = CachedRepository(Publisher, reference_cache)
+reader_category_repo = CachedRepository(ReaderCategory, reference_cache)
+book_status_repo = CachedRepository(BookStatus, reference_cache)
+loan_status_repo = CachedRepository(LoanStatus, reference_cache)
+operation_type_repo = CachedRepository(OperationType, reference_cache)
+reader_repo = Repository(Reader)
+book_repo = Repository(Book)
+author_repo = Repository(Author)
+book_author_repo = Repository(BookAuthor)
+book_copy_repo = Repository(BookCopy)
+loan_repo = Repository(Loan)
+payment_repo = Repository(Payment)
+reservation_repo = Repository(Reservation)
+visit_repo = Repository(Visit)
+reference_request_repo = Repository(ReferenceRequest)
+daily_statistic_repo = Repository(DailyStatistic)
+
+def _books_changed(session: Session, book_ids) -> None:
+    """Книги, их авторы или связи изменились: пересчитать поисковые документы (в транзакции записи)"""
+    refresh_book_documents(session, list(set(book_ids)))
+
+def _reindex_books(session: Session, book_ids) -> None:
+    """После commit: встроенный индекс каталога и кэш фасетов процесса"""
+    catalog_index.index_books(session, list(set(book_ids)))
+    facet_cache.clear()
+
+# ==================== СПРАВОЧНИКИ (CRUD для всех) ====================
+
+# 1. EditionType
+def get_all_edition_types(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[EditionType]:
+    return edition_type_repo.list(session, limit, after_id)
+
+def get_edition_type_by_id(session: Session, type_id: int) -> Optional[EditionType]:
+    return edition_type_repo.get(session, type_id)
+
+def create_edition_type(session: Session, edition_type: EditionType) -> EditionType:
+    return edition_type_repo.create(session, edition_type)
+
+def update_edition_type(session: Session, type_id: int, edition_type_data: dict) -> Optional[EditionType]:
+    return edition_type_repo.update(session, type_id, edition_type_data)
+
+def delete_edition_type(session: Session, type_id: int) -> bool:
+    return edition_type_repo.delete(session, type_id)
+
+# 2. Language
+def get_all_languages(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Language]:
+    return language_repo.list(session, limit, after_id)
+
+def get_language_by_id(session: Session, language_id: int) -> Optional[Language]:
+    return language_repo.get(session, language_id)
+
+def create_language(session: Session, language: Language) -> Language:
+    return language_repo.create(session, language)
+
+def update_language(session: Session, language_id: int, language_data: dict) -> Optional[Language]:
+    return language_repo.update(session, language_id, language_data)
+
+def delete_language(session: Session, language_id: int) -> bool:
+    return language_repo.delete(session, language_id)
+
+# 3. Country
+def get_all_countries(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Country]:
+    return country_repo.list(session, limit, after_id)
+
+def get_country_by_id(session: Session, country_id: int) -> Optional[Country]:
+    return country_repo.get(session, country_id)
+
+def create_country(session: Session, country: Country) -> Country:
+    return country_repo.create(session, country)
+
+def update_country(session: Session, country_id: int, country_data: dict) -> Optional[Country]:
+    return country_repo.update(session, country_id, country_data)
+
+def delete_country(session: Session, country_id: int) -> bool:
+    return country_repo.delete(session, country_id)
+
+# 4. City
+def get_all_cities(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[City]:
+    return city_repo.list(session, limit, after_id)
+
+def get_city_by_id(session: Session, city_id: int) -> Optional[City]:
+    return city_repo.get(session, city_id)
+
+def create_city(session: Session, city: City) -> City:
+    return city_repo.create(session, city)
+
+def update_city(session: Session, city_id: int, city_data: dict) -> Optional[City]:
+    return city_repo.update(session, city_id, city_data)
+
+def delete_city(session: Session, city_id: int) -> bool:
+    return city_repo.delete(session, city_id)
+
+# 5. Publisher
+def get_all_publishers(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Publisher]:
+    return publisher_repo.list(session, limit, after_id)
+
+def get_publisher_by_id(session: Session, publisher_id: int) -> Optional[Publisher]:
+    return publisher_repo.get(session, publisher_id)
+
+def create_publisher(session: Session, publisher: Publisher) -> Publisher:
+    db_publisher = publisher_repo.create(session, publisher)
+    suggest_index.put_publisher(db_publisher)
+    return db_publisher
+
+def update_publisher(session: Session, publisher_id: int, publisher_data: dict) -> Optional[Publisher]:
+    db_publisher = publisher_repo.update(session, publisher_id, publisher_data)
+    if db_publisher:
+        suggest_index.put_publisher(db_publisher)
+    return db_publisher
+
+def delete_publisher(session: Session, publisher_id: int) -> bool:
+    deleted = publisher_repo.delete(session, publisher_id)
+    if deleted:
+        suggest_index.remove("publisher", publisher_id)
+    return deleted
+
+# 6. ReaderCategory
+def get_all_reader_categories(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[ReaderCategory]:
+    return reader_category_repo.list(session, limit, after_id)
+
+def get_reader_category_by_id(session: Session, category_id: int) -> Optional[ReaderCategory]:
+    return reader_category_repo.get(session, category_id)
+
+def create_reader_category(session: Session, reader_category: ReaderCategory) -> ReaderCategory:
+    return reader_category_repo.create(session, reader_category)
+
+def update_reader_category(session: Session, category_id: int, reader_category_data: dict) -> Optional[ReaderCategory]:
+    return reader_category_repo.update(session, category_id, reader_category_data)
+
+def delete_reader_category(session: Session, category_id: int) -> bool:
+    return reader_category_repo.delete(session, category_id)
+
+# 7. BookStatus
+def get_all_book_statuses(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[BookStatus]:
+    return book_status_repo.list(session, limit, after_id)
+
+def get_book_status_by_id(session: Session, status_id: int) -> Optional[BookStatus]:
+    return book_status_repo.get(session, status_id)
+
+def create_book_status(session: Session, book_status: BookStatus) -> BookStatus:
+    return book_status_repo.create(session, book_status)
+
+def update_book_status(session: Session, status_id: int, book_status_data: dict) -> Optional[BookStatus]:
+    return book_status_repo.update(session, status_id, book_status_data)
+
+def delete_book_status(session: Session, status_id: int) -> bool:
+    return book_status_repo.delete(session, status_id)
+
+# 8. LoanStatus
+def get_all_loan_statuses(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[LoanStatus]:
+    return loan_status_repo.list(session, limit, after_id)
+
+def get_loan_status_by_id(session: Session, status_id: int) -> Optional[LoanStatus]:
+    return loan_status_repo.get(session, status_id)
+
+def create_loan_status(session: Session, loan_status: LoanStatus) -> LoanStatus:
+    return loan_status_repo.create(session, loan_status)
+
+def update_loan_status(session: Session, status_id: int, loan_status_data: dict) -> Optional[LoanStatus]:
+    return loan_status_repo.update(session, status_id, loan_status_data)
+
+def delete_loan_status(session: Session, status_id: int) -> bool:
+    return loan_status_repo.delete(session, status_id)
+
+# 9. OperationType
+def get_all_operation_types(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[OperationType]:
+    return operation_type_repo.list(session, limit, after_id)
+
+def get_operation_type_by_id(session: Session, type_id: int) -> Optional[OperationType]:
+    return operation_type_repo.get(session, type_id)
+
+def create_operation_type(session: Session, operation_type: OperationType) -> OperationType:
+    return operation_type_repo.create(session, operation_type)
+
+def update_operation_type(session: Session, type_id: int, operation_type_data: dict) -> Optional[OperationType]:
+    return operation_type_repo.update(session, type_id, operation_type_data)
+
+def delete_operation_type(session: Session, type_id: int) -> bool:
+    return operation_type_repo.delete(session, type_id)
+
+# Поиск по коду справочника (из кэша, без запроса к БД)
+def get_book_status_by_code(session: Session, code: str) -> Optional[BookStatus]:
+    return reference_cache.get_by_code(session, BookStatus, code)
+
+def get_loan_status_by_code(session: Session, code: str) -> Optional[LoanStatus]:
+    return reference_cache.get_by_code(session, LoanStatus, code)
+
+def get_reader_category_by_code(session: Session, code: str) -> Optional[ReaderCategory]:
+    return reference_cache.get_by_code(session, ReaderCategory, code)
+
+def get_reader_loan_limit(session: Session, reader: Reader) -> int:
+    """Лимит книг на руках по категории читателя"""
+    category = get_reader_category_by_id(session, reader.category_id)
+    return category.loan_limit if category else MAX_BOOKS_PER_READER
+
+# ==================== ОСНОВНЫЕ ТАБЛИЦЫ (CRUD для всех) ====================
+
+# 10. Reader
+def get_all_readers(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None, fields: Optional[List[str]] = None) -> List[Reader]:
+    if fields:
+        return reader_repo.list_fields(session, fields, limit, after_id)
+    return reader_repo.list(session, limit, after_id)
+
+def get_reader_by_id(session: Session, reader_id: int) -> Optional[Reader]:
+    return reader_repo.get(session, reader_id)
+
+def create_reader(session: Session, reader: ReaderCreate) -> Reader:
+    with atomic(session):
+        db_reader = reader_repo.create(session, Reader(**reader.dict()))
+        refresh_name_keys(session, "reader", [db_reader])
+        refresh_row_statistics(session, None, statistic_key(db_reader))
+    return db_reader
+
+def update_reader(session: Session, reader_id: int, reader_data: ReaderUpdate) -> Optional[Reader]:
+    with atomic(session):
+        old_key = statistic_key(reader_repo.get_for_update(session, reader_id))
+        db_reader = reader_repo.update(session, reader_id, reader_data.dict(exclude_unset=True))
+        if db_reader:
+            refresh_name_keys(session, "reader", [db_reader])
+            refresh_row_statistics(session, old_key, statistic_key(db_reader))
+    return db_reader
+
+def delete_reader(session: Session, reader_id: int) -> bool:
+    with atomic(session):
+        old_key = statistic_key(reader_repo.get_for_update(session, reader_id))
+        deleted = reader_repo.delete(session, reader_id)
+        if deleted:
+            remove_name_keys(session, "reader", [reader_id])
+            refresh_row_statistics(session, old_key, None)
+    return deleted
+
+# 11. Book
+def get_all_books(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None, fields: Optional[List[str]] = None) -> List[Book]:
+    if fields:
+        return book_repo.list_fields(session, fields, limit, after_id)
+    return book_repo.list(session, limit, after_id)
+
+def get_book_by_id(session: Session, book_id: int) -> Optional[Book]:
+    return book_repo.get(session, book_id)
+
+def get_book_by_isbn(session: Session, isbn13: str) -> Optional[Book]:
+    """Книга по нормализованному ISBN-13 (индекс по isbn13)"""
+    return session.exec(select(Book).where(Book.isbn13 == isbn13).order_by(Book.id).limit(1)).first()
+
+def create_book(session: Session, book: BookCreate) -> Book:
+    with atomic(session):
+        db_book = book_repo.create(session, Book(**with_isbn13(book.dict())))
+        _books_changed(session, [db_book.id])
+        refresh_classification(session, [db_book.id])
+        refresh_book_keywords(session, [db_book.id])
+    _reindex_books(session, [db_book.id])
+    suggest_index.put_book(db_book)
+    return db_book
+
+def update_book(session: Session, book_id: int, book_data: BookUpdate) -> Optional[Book]:
+    values = with_isbn13(book_data.dict(exclude_unset=True))
+    with atomic(session):
+        db_book = book_repo.update(session, book_id, values)
+        if db_book:
+            _books_changed(session, [book_id])
+            if "udk" in values or "bbk" in values:
+                refresh_classification(session, [book_id])
+            if "keywords" in values:
+                refresh_book_keywords(session, [book_id])
+    if db_book:
+        _reindex_books(session, [book_id])
+        suggest_index.put_book(db_book)
+    return db_book
+
+def delete_book(session: Session, book_id: int) -> bool:
+    with atomic(session):
+        nodes = book_nodes(session, [book_id])  # Индексы книги удалятся вместе с ней (CASCADE)
+        deleted = book_repo.delete(session, book_id)
+        if deleted:
+            refresh_classification(session, [book_id], previous=nodes)
+    if deleted:
+        _reindex_books(session, [book_id])
+        suggest_index.remove_book(book_id)
+    return deleted
+
+# 12. Author
+def get_all_authors(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Author]:
+    return author_repo.list(session, limit, after_id)
+
+def get_author_by_id(session: Session, author_id: int) -> Optional[Author]:
+    return author_repo.get(session, author_id)
+
+def create_author(session: Session, author: AuthorCreate) -> Author:
+    with atomic(session):
+        db_author = author_repo.create(session, Author(**author.dict()))
+        refresh_name_keys(session, "author", [db_author])
+    suggest_index.put_author(db_author)
+    return db_author
+
+def update_author(session: Session, author_id: int, author_data: dict) -> Optional[Author]:
+    with atomic(session):
+        db_author = author_repo.update(session, author_id, author_data)
+        if db_author:
+            book_ids = session.exec(select(BookAuthor.book_id).where(BookAuthor.author_id == author_id)).all()
+            _books_changed(session, book_ids)
+            refresh_name_keys(session, "author", [db_author])
+    if db_author:
+        _reindex_books(session, book_ids)
+        suggest_index.put_author(db_author)
+    return db_author
+
+def delete_author(session: Session, author_id: int) -> bool:
+    with atomic(session):
+        # Книги автора запоминаем до удаления: после него их уже не найти по связям
+        book_ids = session.exec(select(BookAuthor.book_id).where(BookAuthor.author_id == author_id)).all()
+        deleted = author_repo.delete(session, author_id)
+        if deleted:
+            _books_changed(session, book_ids)
+            remove_name_keys(session, "author", [author_id])
+    if deleted:
+        _reindex_books(session, book_ids)
+        suggest_index.remove("author", author_id)
+    return deleted
+
+# 13. BookAuthor
+def get_all_book_authors(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[BookAuthor]:
+    return book_author_repo.list(session, limit, after_id)
+
+def get_book_author_by_id(session: Session, book_author_id: int) -> Optional[BookAuthor]:
+    return book_author_repo.get(session, book_author_id)
+
+def create_book_author(session: Session, book_author: BookAuthor) -> BookAuthor:
+    with atomic(session):
+        db_link = book_author_repo.create(session, book_author)
+        _books_changed(session, [db_link.book_id])
+    _reindex_books(session, [db_link.book_id])
+    suggest_index.link_author(db_link.book_id, db_link.author_id)
+    return db_link
+
+def update_book_author(session: Session, book_author_id: int, book_author_data: dict) -> Optional[BookAuthor]:
+    with atomic(session):
+        link = book_author_repo.get_for_update(session, book_author_id)
+        if not link:
+            return None
+        old_book_id, old_author_id = link.book_id, link.author_id
+        db_link = book_author_repo.update(session, book_author_id, book_author_data)
+        if db_link is None:
+            return None
+        _books_changed(session, [old_book_id, db_link.book_id])
+    _reindex_books(session, [old_book_id, db_link.book_id])
+    suggest_index.link_author(old_book_id, old_author_id, linked=False)
+    suggest_index.link_author(db_link.book_id, db_link.author_id)
+    return db_link
+
+def delete_book_author(session: Session, book_author_id: int) -> bool:
+    with atomic(session):
+        link = book_author_repo.get_for_update(session, book_author_id)
+        if not link:
+            return False
+        book_id, author_id = link.book_id, link.author_id
+        deleted = book_author_repo.delete(session, book_author_id)
+        if deleted:
+            _books_changed(session, [book_id])
+    if deleted:
+        _reindex_books(session, [book_id])
+        suggest_index.link_author(book_id, author_id, linked=False)
+    return deleted
+
+# 14. BookCopy
+def get_all_book_copies(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[BookCopy]:
+    return book_copy_repo.list(session, limit, after_id)
+
+def get_book_copy_by_id(session: Session, copy_id: int) -> Optional[BookCopy]:
+    return book_copy_repo.get(session, copy_id)
+
+def get_book_copy_by_barcode(session: Session, barcode: str) -> Optional[BookCopy]:
+    """Экземпляр по штрих-коду (уникальный индекс по barcode)"""
+    return session.exec(select(BookCopy).where(BookCopy.barcode == normalize_barcode(barcode))).first()
+
+def create_book_copy(session: Session, book_copy: BookCopyCreate) -> BookCopy:
+    with atomic(session):
+        db_copy = book_copy_repo.create(session, BookCopy(**book_copy.dict()))
+        shift_copy_counts(session, {db_copy.book_id: 1})
+        refresh_row_statistics(session, None, statistic_key(db_copy))
+    return db_copy
+
+def update_book_copy(session: Session, copy_id: int, book_copy_data: dict) -> Optional[BookCopy]:
+    if isinstance(book_copy_data.get("barcode"), str):
+        book_copy_data = {**book_copy_data, "barcode": normalize_barcode(book_copy_data["barcode"])}
+    with atomic(session):
+        old_copy = book_copy_repo.get_for_update(session, copy_id)
+        old_book_id = old_copy.book_id if old_copy else None
+        old_key = statistic_key(old_copy)
+        db_copy = book_copy_repo.update(session, copy_id, book_copy_data)
+        if db_copy and old_book_id is not None and old_book_id != db_copy.book_id:
+            shift_copy_counts(session, {old_book_id: -1, db_copy.book_id: 1})
+        if db_copy:
+            refresh_row_statistics(session, old_key, statistic_key(db_copy))
+    return db_copy
+
+def delete_book_copy(session: Session, copy_id: int) -> bool:
+    with atomic(session):
+        book_copy = book_copy_repo.get_for_update(session, copy_id)
+        old_key = statistic_key(book_copy)
+        deleted = book_copy_repo.delete(session, copy_id)
+        if deleted:
+            shift_copy_counts(session, {book_copy.book_id: -1})
+            refresh_row_statistics(session, old_key, None)
+    return deleted
+
+# 15. Loan
+def get_all_loans(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Loan]:
+    return loan_repo.list(session, limit, after_id)
+
+def get_loan_by_id(session: Session, loan_id: int) -> Optional[Loan]:
+    return loan_repo.get(session, loan_id)
+
+def create_loan(session: Session, loan: LoanCreate) -> Loan:
+    with atomic(session):
+        db_loan = loan_repo.create(session, Loan(**loan.dict()))
+        refresh_row_statistics(session, None, statistic_key(db_loan))
+    if suggest_index.loaded:
+        suggest_index.add_loans(session.get(BookCopy, db_loan.book_copy_id).book_id)
+    return db_loan
+
+def update_loan(session: Session, loan_id: int, loan_data: LoanUpdate) -> Optional[Loan]:
+    with atomic(session):
+        old_key = statistic_key(loan_repo.get_for_update(session, loan_id))
+        db_loan = loan_repo.update(session, loan_id, loan_data.dict(exclude_unset=True))
+        if db_loan:
+            refresh_row_statistics(session, old_key, statistic_key(db_loan))
+    return db_loan
+
+def delete_loan(session: Session, loan_id: int) -> bool:
+    with atomic(session):
+        loan = loan_repo.get_for_update(session, loan_id)
+        old_key = statistic_key(loan)
+        deleted = loan_repo.delete(session, loan_id)
+        if deleted:
+            refresh_row_statistics(session, old_key, None)
+    if deleted and suggest_index.loaded:
+        suggest_index.add_loans(session.get(BookCopy, loan.book_copy_id).book_id, -1)
+    return deleted
+
+# 16. Payment
+def get_all_payments(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Payment]:
+    return payment_repo.list(session, limit, after_id)
+
+def get_payment_by_id(session: Session, payment_id: int) -> Optional[Payment]:
+    return payment_repo.get(session, payment_id)
+
+def create_payment(session: Session, payment: PaymentCreate) -> Payment:
+    return payment_repo.create(session, Payment(**payment.dict()))
+
+def update_payment(session: Session, payment_id: int, payment_data: dict) -> Optional[Payment]:
+    return payment_repo.update(session, payment_id, payment_data)
+
+def delete_payment(session: Session, payment_id: int) -> bool:
+    return payment_repo.delete(session, payment_id)
+
+# 17. Reservation
+def get_all_reservations(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Reservation]:
+    return reservation_repo.list(session, limit, after_id)
+
+def get_reservation_by_id(session: Session, reservation_id: int) -> Optional[Reservation]:
+    return reservation_repo.get(session, reservation_id)
+
+def create_reservation(session: Session, reservation: Reservation) -> Reservation:
+    return reservation_repo.create(session, reservation)
+
+def update_reservation(session: Session, reservation_id: int, reservation_data: dict) -> Optional[Reservation]:
+    return reservation_repo.update(session, reservation_id, reservation_data)
+
+def delete_reservation(session: Session, reservation_id: int) -> bool:
+    return reservation_repo.delete(session, reservation_id)
+
+# 18. Visit
+def get_all_visits(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Visit]:
+    return visit_repo.list(session, limit, after_id)
+
+def get_visit_by_id(session: Session, visit_id: int) -> Optional[Visit]:
+    return visit_repo.get(session, visit_id)
+
+def create_visit(session: Session, visit: Visit) -> Visit:
+    with atomic(session):
+        db_visit = visit_repo.create(session, visit)
+        refresh_row_statistics(session, None, statistic_key(db_visit))
+    return db_visit
+
+def update_visit(session: Session, visit_id: int, visit_data: dict) -> Optional[Visit]:
+    with atomic(session):
+        old_key = statistic_key(visit_repo.get_for_update(session, visit_id))
+        db_visit = visit_repo.update(session, visit_id, visit_data)
+        if db_visit:
+            refresh_row_statistics(session, old_key, statistic_key(db_visit))
+    return db_visit
+
+def delete_visit(session: Session, visit_id: int) -> bool:
+    with atomic(session):
+        old_key = statistic_key(visit_repo.get_for_update(session, visit_id))
+        deleted = visit_repo.delete(session, visit_id)
+        if deleted:
+            refresh_row_statistics(session, old_key, None)
+    return deleted
+
+# 19. ReferenceRequest
+def get_all_reference_requests(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[ReferenceRequest]:
+    return reference_request_repo.list(session, limit, after_id)
+
+def get_reference_request_by_id(session: Session, request_id: int) -> Optional[ReferenceRequest]:
+    return reference_request_repo.get(session, request_id)
+
+def create_reference_request(session: Session, reference_request: ReferenceRequest) -> ReferenceRequest:
+    with atomic(session):
+        db_reference_request = reference_request_repo.create(session, reference_request)
+        refresh_row_statistics(session, None, statistic_key(db_reference_request))
+    return db_reference_request
+
+def update_reference_request(session: Session, request_id: int, reference_request_data: dict) -> Optional[ReferenceRequest]:
+    with atomic(session):
+        old_key = statistic_key(reference_request_repo.get_for_update(session, request_id))
+        db_reference_request = reference_request_repo.update(session, request_id, reference_request_data)
+        if db_reference_request:
+            refresh_row_statistics(session, old_key, statistic_key(db_reference_request))
+    return db_reference_request
+
+def delete_reference_request(session: Session, request_id: int) -> bool:
+    with atomic(session):
+        old_key = statistic_key(reference_request_repo.get_for_update(session, request_id))
+        deleted = reference_request_repo.delete(session, request_id)
+        if deleted:
+            refresh_row_statistics(session, old_key, None)
+    return deleted
+
+# 20. DailyStatistic
+def get_all_daily_statistics(session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[DailyStatistic]:
+    return daily_statistic_repo.list(session, limit, after_id)
+
+def get_daily_statistic_by_id(session: Session, statistic_id: int) -> Optional[DailyStatistic]:
+    return daily_statistic_repo.get(session, statistic_id)
+
+def create_daily_statistic(session: Session, daily_statistic: DailyStatistic) -> DailyStatistic:
+    return daily_statistic_repo.create(session, daily_statistic)
+
+def update_daily_statistic(session: Session, statistic_id: int, daily_statistic_data: dict) -> Optional[DailyStatistic]:
+    return daily_statistic_repo.update(session, statistic_id, daily_statistic_data)
+
+def delete_daily_statistic(session: Session, statistic_id: int) -> bool:
+    return daily_statistic_repo.delete(session, statistic_id)
+
+
+# ==================== ВЕРСИИ ДАННЫХ (для ETag) ====================
+# Системная колонка xmin PostgreSQL меняется при каждом UPDATE строки,
+# поэтому служит версией строки без отдельного поля updated_at
+ROW_VERSION = literal_column("xmin::text")
+
+def get_book_with_version(session: Session, book_id: int) -> Optional[Tuple[Book, str]]:
+    """Книга вместе с версией строки (одним запросом)"""
+    row = session.exec(select(Book, ROW_VERSION).where(Book.id == book_id)).first()
+    return (row[0], row[1]) if row else None
+
+def get_daily_statistics_version(session: Session, days: int) -> Tuple[int, Optional[datetime], str]:
+    """Количество дней, время последнего расчета и версия последних days дней.
+    Ответ /statistics/daily состоит только из них, поэтому вся таблица не читается:
+    количество и max(calculated_at) берутся из индексов, версии - у days строк"""
+    latest = (
+        select(DailyStatistic.id, ROW_VERSION.label("row_version"))
+        .order_by(DailyStatistic.statistic_date.desc())
+        .limit(days)
+        .subquery()
+    )
+    row_versions = func.concat(latest.c.id, ":", latest.c.row_version)
+    query = select(
+        select(func.count()).select_from(DailyStatistic).scalar_subquery(),
+        select(func.max(DailyStatistic.calculated_at)).scalar_subquery(),
+        select(func.string_agg(row_versions, aggregate_order_by(literal(","), latest.c.id))).scalar_subquery()
+    )
+    total_days, calculated_at, version = session.exec(query).one()
+    return total_days, calculated_at, f"{total_days}:{calculated_at}:{version or ''}"
+
+def get_latest_daily_statistics(session: Session, days: int) -> List[DailyStatistic]:
+    """Статистика за последние days дней (сортировка в БД)"""
+    query = select(DailyStatistic).order_by(DailyStatistic.statistic_date.desc()).limit(days)
+    return session.exec(query).all()
+
+# ==================== СТАТИСТИКА ЗА ПЕРИОДЫ ====================
+STATISTIC_BUCKETS = ("day", "week", "month", "year")
+# Остатки на конец периода берутся за его последний день, активные читатели -
+# наибольшее число за день (разных читателей за период из дневных строк не сложить),
+# остальные показатели суммируются
+STATISTIC_END_OF_PERIOD = ("overdue_loans", "total_copies")
+STATISTIC_PEAK = ("active_readers",)
+
+def get_statistics_range(session: Session, date_from: date, date_to: date, bucket: str = "day") -> List[dict]:
+    """Ежедневная статистика за [date_from, date_to], свернутая по периодам
+    (неделя, месяц, год) группировкой date_trunc в БД"""
+    if bucket not in STATISTIC_BUCKETS:
+        raise ValueError(f"Неизвестный период: {bucket}")
+    stat = DailyStatistic
+    period = cast(func.date_trunc(literal_column(f"'{bucket}'"), stat.statistic_date), Date)
+    columns = []
+    for name in METRICS:
+        column = getattr(stat, name)
+        if name in STATISTIC_END_OF_PERIOD:
+            value = func.array_agg(aggregate_order_by(column, stat.statistic_date.desc()))[1]
+        elif name in STATISTIC_PEAK:
+            value = func.max(column)
+        else:
+            value = func.sum(column)
+        columns.append(value.label(name))
+    query = (
+        select(
+            period.label("period_start"),
+            func.min(stat.statistic_date).label("first_day"),
+            func.max(stat.statistic_date).label("last_day"),
+            func.count().label("days"),
+            *columns
+        )
+        .where(stat.statistic_date.between(date_from, date_to))
+        .group_by(period)
+        .order_by(period)
+    )
+    return [dict(row) for row in session.execute(query).mappings()]
+
+# ==================== СВОДНАЯ СТАТИСТИКА ====================
+
+def get_library_counters(session: Session, live: bool = False, today: Optional[date] = None) -> dict:
+    """Счетчики библиотеки и calculated_at - время их расчета. Читаются из
+    представления library_counters_mv, счетчики на текущую дату - по таблицам
+    тем же запросом; live=True - все считаются по таблицам сейчас"""
+    today = today or date.today()
+    if not live:
+        view_columns = [column for column in library_counters_view.c if column.name != "row_id"]
+        rows = read_view(session, select(*view_columns, *day_counter_columns(today)))
+        if rows:
+            return dict(rows[0])
+    query = library_counters_query(today).add_columns(func.now().label("calculated_at"))
+    return dict(session.execute(query).mappings().one())
+
+
+# ==================== МАССОВАЯ ЗАГРУЗКА ====================
+MAX_BULK_ITEMS = 5000    # Максимум записей в одном запросе
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
+
+def _bulk_create(session: Session, repo: Repository, schema, items: List[dict], prepare=None) -> dict:
+    """Проверить записи по одной и вставить корректные одним пакетом.
+    prepare - функция, дополняющая строку вычисляемыми колонками"""
+    model = repo.model
+    # Значения по умолчанию для колонок, которых нет в схеме создания (created_at и т.п.),
+    # считаем один раз на пакет: создание ORM-объектов на каждую строку слишком дорого
+    defaults = {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if name != "id" and name not in schema.model_fields
+    }
+    errors = []
+    candidates = []  # (индекс во входном массиве, строка для INSERT)
+    for index, item in enumerate(items):
+        try:
+            row = {**defaults, **schema(**item).dict()}
+            candidates.append((index, prepare(row) if prepare else row))
+        except ValidationError as e:
+            errors.append({"index": index, "error": _format_validation_error(e)})
+
+    # Внешние ключи и уникальные поля проверяем одним запросом на колонку
+    for column in model.__table__.columns:
+        values = {row.get(column.name) for _, row in candidates} - {None}
+        if not values:
+            continue
+        if column.foreign_keys:
+            target = next(iter(column.foreign_keys)).column
+            reference = reference_cache.model_for_table(target.table)
+            if reference is not None:
+                found = set(reference_cache.get_many(session, reference, values))
+            else:
+                found = set(session.scalars(select(target).where(target.in_(values))).all())
+            taken = set()
+            missing = values - found
+        elif column.unique:
+            taken = set(session.scalars(select(column).where(column.in_(values))).all())
+            missing = set()
+        else:
+            continue
+
+        remaining = []
+        seen = set()
+        for index, row in candidates:
+            value = row.get(column.name)
+            if value in missing:
+                errors.append({"index": index, "error": f"{column.name}={value}: запись не найдена"})
+            elif value in taken:
+                errors.append({"index": index, "error": f"{column.name}={value}: уже существует"})
+            elif column.unique and value is not None and value in seen:
+                errors.append({"index": index, "error": f"{column.name}={value}: повторяется в запросе"})
+            else:
+                seen.add(value)
+                remaining.append((index, row))
+        candidates = remaining
+
+    try:
+        created = repo.bulk_create(session, [row for _, row in candidates])
+    except IntegrityError as e:
+        session.rollback()
+        errors.append({"index": None, "error": f"Пакет отклонен базой данных: {e.orig}"})
+        created = []
+
+    errors.sort(key=lambda err: -1 if err["index"] is None else err["index"])
+    return {
+        "created": len(created),
+        "failed": len(items) - len(created),
+        "items": created,
+        "errors": errors
+    }
+
+def bulk_create_books(session: Session, items: List[dict]) -> dict:
+    with atomic(session):
+        result = _bulk_create(session, book_repo, BookCreate, items, prepare=with_isbn13)
+        book_ids = [book.id for book in result["items"]]
+        _books_changed(session, book_ids)
+        refresh_classification(session, book_ids)
+        refresh_book_keywords(session, book_ids)
+    _reindex_books(session, book_ids)
+    for book in result["items"]:
+        suggest_index.put_book(book)
+    return result
+
+def bulk_create_authors(session: Session, items: List[dict]) -> dict:
+    with atomic(session):
+        result = _bulk_create(session, author_repo, AuthorCreate, items)
+        refresh_name_keys(session, "author", result["items"])
+    for author in result["items"]:
+        suggest_index.put_author(author)
+    return result
+
+def bulk_create_book_authors(session: Session, items: List[dict]) -> dict:
+    with atomic(session):
+        result = _bulk_create(session, book_author_repo, BookAuthorCreate, items)
+        _books_changed(session, [link.book_id for link in result["items"]])
+    _reindex_books(session, [link.book_id for link in result["items"]])
+    for link in result["items"]:
+        suggest_index.link_author(link.book_id, link.author_id)
+    return result
+
+def bulk_create_book_copies(session: Session, items: List[dict]) -> dict:
+    with atomic(session):
+        result = _bulk_create(session, book_copy_repo, BookCopyCreate, items)
+        shift_copy_counts(session, Counter(book_copy.book_id for book_copy in result["items"]))
+        refresh_rows_statistics(session, [(None, statistic_key(book_copy)) for book_copy in result["items"]])
+    return result
+
+
+# ==================== ВЫБОРОЧНЫЕ ПОЛЯ (?fields=) ====================
+BOOK_LIST_FIELDS = list(BookListItem.model_fields)
+READER_LIST_FIELDS = list(ReaderListItem.model_fields)
+
+def resolve_fields(model, fields: Optional[str], default: List[str]) -> List[str]:
+    """Разобрать fields=a,b,c в список колонок; "*" - все колонки, id включается всегда"""
+    if not fields:
+        return default
+    columns = list(model.__table__.columns.keys())
+    if fields.strip() == "*":
+        return columns
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in columns]
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id"] + requested))
+
+def _fields_query(model, fields: Optional[List[str]]):
+    if fields:
+        return select(*[model.__table__.columns[name] for name in fields])
+    return select(model)
+
+def _fetch(session: Session, query, fields: Optional[List[str]]) -> list:
+    if fields:
+        return [dict(row) for row in session.execute(query).mappings()]
+    return session.exec(query).all()
+
+# ==================== ПОИСК ====================
+
+READER_SEARCH_MIN_LENGTH = 3   # Короче триграммы индекс pg_trgm не помогает, а совпадений слишком много
+_extensions = {}
+
+def has_extension(session: Session, name: str) -> bool:
+    """Установлено ли расширение PostgreSQL (проверяется один раз на базу)"""
+    key = (str(session.get_bind().url), name)
+    if key not in _extensions:
+        query = text("SELECT 1 FROM pg_extension WHERE extname = :name")
+        _extensions[key] = session.execute(query, {"name": name}).first() is not None
+    return _extensions[key]
+
+def search_readers(
+    session: Session,
+    last_name: Optional[str] = None,
+    first_name: Optional[str] = None,
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    fields: Optional[List[str]] = None,
+    mode: str = "name",
+    limit: Optional[int] = None
+) -> List[Reader]:
+    """Поиск читателей по фрагментам (fields - вернуть только эти колонки)
+
+    mode="name" - имя и фамилия по началу слова с учетом транслитерации
+    (Ivanov = Иванов, ключи name_keys), телефон и e-mail - подстрока;
+    mode="contains" - подстрока во всех полях (ilike, GIN-индексы pg_trgm),
+    mode="similar" - по похожести слов (word_similarity), лучшие совпадения первыми.
+    """
+    terms = [
+        (name, column, value.strip())
+        for name, column, value in [
+            ("last_name", Reader.last_name, last_name),
+            ("first_name", Reader.first_name, first_name),
+            ("phone", Reader.phone, phone),
+            ("email", Reader.email, email),
+        ]
+        if value and value.strip()
+    ]
+    short = [name for name, _, term in terms if len(term) < READER_SEARCH_MIN_LENGTH]
+    if short:
+        raise ValueError(f"Минимальная длина строки поиска - {READER_SEARCH_MIN_LENGTH} символа: {', '.join(short)}")
+    
+    query = _fields_query(Reader, fields)
+    if mode == "similar":
+        if not has_extension(session, "pg_trgm"):
+            raise ValueError("Поиск по похожести недоступен: не установлено расширение pg_trgm")
+        for _, column, term in terms:
+            query = query.where(literal(term).op("<%")(column))
+        if terms:
+            score = sum(func.word_similarity(term, column) for _, column, term in terms)
+            query = query.order_by(score.desc())
+    elif mode in ("name", "contains"):
+        for name, column, term in terms:
+            if mode == "name" and name in ("last_name", "first_name"):
+                query = query.where(Reader.id.in_(name_match("reader", name, term)))
+            else:
+                query = query.where(column.ilike(f"%{term}%"))
+    else:
+        raise ValueError(f"Неизвестный режим поиска: {mode}")
+    
+    if is_active is not None:
+        query = query.where(Reader.is_active == is_active)
+    query = query.order_by(Reader.last_name, Reader.first_name, Reader.id)
+    if limit:
+        query = query.limit(limit)
+    
+    return _fetch(session, query, fields)
+
+def _book_filters(author_name, isbn, publication_year, is_electronic, language_id) -> list:
+    filters = []
+    if author_name:
+        # Фамилия или имя автора с начала слова, с учетом транслитерации (Tolstoy = Толстой)
+        author_ids = name_match("author", "last_name", author_name).union(name_match("author", "first_name", author_name))
+        filters.append(Book.id.in_(select(BookAuthor.book_id).where(BookAuthor.author_id.in_(author_ids))))
+    if isbn:
+        # Полный ISBN (в любой записи) - точное совпадение по индексу isbn13, часть - подстрока
+        isbn13 = isbn13_or_none(isbn)
+        filters.append(Book.isbn13 == isbn13 if isbn13 else Book.isbn.ilike(f"%{isbn}%"))
+    if publication_year:
+        filters.append(Book.publication_year == publication_year)
+    if is_electronic is not None:
+        filters.append(Book.is_electronic == is_electronic)
+    if language_id:
+        filters.append(Book.language_id == language_id)
+    return filters
+
+def _catalog_hits(session: Session, text: str, limit: Optional[int] = CATALOG_MAX_HITS) -> dict:
+    """{id книги: оценка} из встроенного индекса (при первом обращении индекс загружается,
+    потом периодически сверяется с БД)"""
+    if not catalog_index.loaded:
+        catalog_index.load(session)
+    elif catalog_index.sync_if_due(session):
+        facet_cache.clear()
+    return dict(catalog_index.search(text, limit))
+
+def _hit_ids(ids):
+    """Найденные индексом id для JOIN: один параметр-массив и unnest вместо IN (...) на тысячи параметров"""
+    return func.unnest(literal(list(ids), ARRAY(Integer))).table_valued("id").render_derived("hits")
+
+def _search_books_in_index(session: Session, text: str, filters: list, fields: Optional[List[str]], limit: Optional[int]) -> list:
+    """Совпадения ищутся во встроенном индексе (catalog_index.py), из БД читаются только найденные книги.
+    Фильтры проверяются в БД окнами по CATALOG_MAX_HITS лучших совпадений, пока не наберется limit"""
+    scores = _catalog_hits(session, text, limit=None)
+    hits = list(scores.items())
+    names = fields or list(Book.__table__.columns.keys())
+    columns = [Book.__table__.columns[name] for name in dict.fromkeys(["id", "main_title", *names])]
+    rows = []
+    for start in range(0, len(hits), CATALOG_MAX_HITS):
+        window_ids = _hit_ids(book_id for book_id, _ in hits[start:start + CATALOG_MAX_HITS])
+        query = select(*columns).join(window_ids, window_ids.c.id == Book.id).where(*filters)
+        window = session.execute(query).mappings()
+        rows += sorted(window, key=lambda row: (-scores[row["id"]], row["id"]))
+        if limit and len(rows) >= limit:
+            break
+    return [
+        {**{name: row[name] for name in names}, "rank": scores[row["id"]], "headline": highlight(row["main_title"], text)}
+        for row in rows[:limit]
+    ]
+
+def search_books(
+    session: Session,
+    query_text: Optional[str] = None,
+    title: Optional[str] = None,
+    author_name: Optional[str] = None,
+    isbn: Optional[str] = None,
+    publication_year: Optional[int] = None,
+    is_electronic: Optional[bool] = None,
+    language_id: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> list:
+    """Поиск книг по параметрам (fields - вернуть только эти колонки)
+
+    Текстовые условия (query_text, title) ищутся полнотекстовым
+    поиском по документу книги (или во встроенном индексе, если
+    CATALOG_SEARCH_BACKEND=index): результат - словари с колонками книги,
+    рангом rank и фрагментом headline, по убыванию ранга.
+    author_name - начало фамилии или имени автора с учетом транслитерации.
+    """
+    text = " ".join(part for part in (query_text, title) if part)
+    filters = _book_filters(author_name, isbn, publication_year, is_electronic, language_id)
+    if text and CATALOG_SEARCH_BACKEND == "index":
+        return _search_books_in_index(session, text, filters, fields, limit)
+    if text:
+        tsquery = book_tsquery(text)
+        columns = [Book.__table__.columns[name] for name in fields] if fields else list(Book.__table__.columns)
+        rank, headline = ranked_search_columns(tsquery)
+        query = (
+            select(*columns, rank, headline)
+            .join(BookSearchDocument, BookSearchDocument.book_id == Book.id)
+            .where(matches(tsquery), *filters)
+            .order_by(rank.desc(), Book.id)
+        )
+    else:
+        query = _fields_query(Book, fields).where(*filters).order_by(Book.main_title)
+    if limit:
+        query = query.limit(limit)
+    
+    if text:
+        return [dict(row) for row in session.execute(query).mappings()]
+    return _fetch(session, query, fields)
+
+
+# Фасеты поиска книг: название -> колонка; названия значений берутся из кэша справочников
+BOOK_FACETS = {
+    "year": Book.publication_year,
+    "language": Book.language_id,
+    "edition_type": Book.edition_type_id,
+    "electronic": Book.is_electronic,
+    "publisher": Book.publisher_id,
+}
+BOOK_FACET_REFERENCES = {"language": Language, "edition_type": EditionType, "publisher": Publisher}
+
+def _facet_key(text, author_name, isbn, publication_year, is_electronic, language_id) -> tuple:
+    return (CATALOG_SEARCH_BACKEND, normalize_query(text), normalize_query(author_name), isbn, publication_year, is_electronic, language_id)
+
+def _matching_books(session: Session, text: str, filters: list, columns: list):
+    """Книги, подходящие под поиск, с колонками columns (при текстовом поиске - и ранг rank)"""
+    if text and CATALOG_SEARCH_BACKEND == "index":
+        scores = _catalog_hits(session, text, limit=None)
+        hits = func.unnest(
+            literal(list(scores), ARRAY(Integer)), literal(list(scores.values()), ARRAY(Float))
+        ).table_valued("id", "score").render_derived("hits")
+        query = select(*columns, hits.c.score.label("rank")).join(hits, hits.c.id == Book.id)
+    elif text:
+        tsquery = book_tsquery(text)
+        query = (
+            select(*columns, func.ts_rank(BookSearchDocument.document, tsquery).label("rank"))
+            .join(BookSearchDocument, BookSearchDocument.book_id == Book.id)
+            .where(matches(tsquery))
+        )
+    else:
+        query = select(*columns)
+    return query.where(*filters)
+
+def _facet_counts(matching):
+    """Счетчики всех фасетов и общее число одним запросом с GROUPING SETS"""
+    columns = [matching.c[column.name] for column in BOOK_FACETS.values()]
+    return (
+        select(*columns, *[func.grouping(column) for column in columns], func.count())
+        .group_by(func.grouping_sets(*columns, literal_column("()")))
+    )
+
+def _book_facets(session: Session, rows) -> dict:
+    facets = {"total": 0, **{name: [] for name in BOOK_FACETS}}
+    size = len(BOOK_FACETS)
+    for row in rows:
+        values, grouped, count = row[:size], row[size:-1], row[-1]
+        if all(grouped):
+            facets["total"] = count  # Пустой набор группировки - все найденные книги
+            continue
+        index = list(grouped).index(0)
+        name = list(BOOK_FACETS)[index]
+        item = {"value": values[index], "count": count}
+        if name in BOOK_FACET_REFERENCES and values[index] is not None:
+            reference = reference_cache.get(session, BOOK_FACET_REFERENCES[name], values[index])
+            item["name"] = reference.name if reference else None
+        facets[name].append(item)
+    for name in BOOK_FACETS:
+        facets[name].sort(key=lambda item: (-item["count"], item["value"] is None, str(item["value"])))
+    return facets
+
+def get_book_facets(
+    session: Session,
+    query_text: Optional[str] = None,
+    title: Optional[str] = None,
+    author_name: Optional[str] = None,
+    isbn: Optional[str] = None,
+    publication_year: Optional[int] = None,
+    is_electronic: Optional[bool] = None,
+    language_id: Optional[int] = None
+) -> dict:
+    """Счетчики фасетов по всем книгам, подходящим под запрос search_books.
+
+    Все фасеты и общее число считаются одним запросом с GROUPING SETS.
+    """
+    text = " ".join(part for part in (query_text, title) if part)
+    key = _facet_key(text, author_name, isbn, publication_year, is_electronic, language_id)
+    cached = facet_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    filters = _book_filters(author_name, isbn, publication_year, is_electronic, language_id)
+    matching = _matching_books(session, text, filters, list(BOOK_FACETS.values())).subquery()
+    facets = _book_facets(session, session.execute(_facet_counts(matching)))
+    facet_cache.put(key, facets)
+    return facets
+
+def search_books_with_facets(
+    session: Session,
+    query_text: Optional[str] = None,
+    title: Optional[str] = None,
+    author_name: Optional[str] = None,
+    isbn: Optional[str] = None,
+    publication_year: Optional[int] = None,
+    is_electronic: Optional[bool] = None,
+    language_id: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> Tuple[list, dict]:
+    """search_books и get_book_facets за одно обращение к БД.
+
+    Подходящие книги выбираются один раз (CTE), из них берется страница
+    найденных и считаются фасеты (GROUPING SETS, JSON в первой строке).
+    Если фасеты уже в кэше, выполняется только search_books.
+    """
+    text = " ".join(part for part in (query_text, title) if part)
+    key = _facet_key(text, author_name, isbn, publication_year, is_electronic, language_id)
+    cached = facet_cache.get(key)
+    if cached is not None:
+        books = search_books(
+            session, query_text, title, author_name, isbn, publication_year, is_electronic, language_id, fields, limit
+        )
+        return books, cached
+    
+    filters = _book_filters(author_name, isbn, publication_year, is_electronic, language_id)
+    names = fields or list(Book.__table__.columns.keys())
+    extra = ["id", "main_title", "abstract", *[column.name for column in BOOK_FACETS.values()]]
+    columns = [Book.__table__.columns[name] for name in dict.fromkeys([*names, *extra])]
+    in_database = text and CATALOG_SEARCH_BACKEND != "index"
+    if in_database:
+        columns.append(BookSearchDocument.config)
+    matching = _matching_books(session, text, filters, columns).cte("matching")
+    
+    facet_rows = _facet_counts(matching).subquery("facet_rows")
+    facets_json = select(func.json_agg(func.json_build_array(*facet_rows.c))).scalar_subquery()
+    order = [matching.c.rank.desc(), matching.c.id] if text else [matching.c.main_title, matching.c.id]
+    outputs = [matching]
+    if in_database:
+        outputs.append(search_headline(book_tsquery(text), matching.c.config, matching.c.main_title, matching.c.abstract))
+    # JSON фасетов только в первой строке страницы, а не в каждой
+    first = func.row_number().over(order_by=order) == 1
+    query = select(*outputs, case((first, facets_json)).label("facets")).order_by(*order)
+    if limit:
+        query = query.limit(limit)
+    
+    rows = session.execute(query).mappings().all()
+    facets = _book_facets(session, next((row["facets"] for row in rows if row["facets"] is not None), []))
+    facet_cache.put(key, facets)
+    books = []
+    for row in rows:
+        book = {name: row[name] for name in names}
+        if text:
+            book["rank"] = row["rank"]
+            book["headline"] = row["headline"] if in_database else highlight(row["main_title"], text)
+        books.append(book)
+    return books, facets
+
+# ==================== ПОДСКАЗКИ ====================
+
+def suggest(session: Session, prefix: str, limit: int = 10, kinds: Optional[List[str]] = None) -> List[dict]:
+    """Подсказки для набираемого текста: заглавия, авторы, издательства (по популярности)"""
+    if not suggest_index.loaded:
+        suggest_index.load(session)
+    else:
+        suggest_index.reload_if_due(session.get_bind())
+    return suggest_index.suggest(prefix, limit, kinds)
+
+# ==================== КЛАССИФИКАЦИЯ (УДК, ББК) ====================
+
+def get_classification_children(session: Session, scheme: str, parent: Optional[str] = None) -> List[ClassificationNode]:
+    """Подклассы узла (parent=None - верхний уровень) со счетчиками книг и экземпляров"""
+    query = select(ClassificationNode).where(ClassificationNode.scheme == scheme)
+    query = query.where(ClassificationNode.parent == parent if parent else ClassificationNode.parent.is_(None))
+    return session.exec(query.order_by(ClassificationNode.code)).all()
+
+def get_classification_node(session: Session, scheme: str, code: str) -> Optional[dict]:
+    """Узел, путь к нему от верхнего уровня и его подклассы"""
+    levels = code_levels(scheme, code)
+    path = session.exec(
+        select(ClassificationNode)
+        .where(ClassificationNode.scheme == scheme, ClassificationNode.code.in_(levels))
+        .order_by(ClassificationNode.depth)
+    ).all()
+    if not path or path[-1].code != code:
+        return None
+    return {"node": path[-1], "path": path[:-1], "children": get_classification_children(session, scheme, code)}
+
+def get_classification_books(
+    session: Session,
+    scheme: str,
+    code: str,
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> list:
+    """Книги поддерева узла (keyset-пагинация по id)"""
+    query = _fields_query(Book, fields).where(Book.id.in_(classification_match(scheme, code)))
+    if after_id is not None:
+        query = query.where(Book.id > after_id)
+    query = query.order_by(Book.id)
+    if limit:
+        query = query.limit(limit)
+    return _fetch(session, query, fields)
+
+# ==================== КЛЮЧЕВЫЕ СЛОВА ====================
+
+def get_keyword(session: Session, text: str) -> Optional[Keyword]:
+    """Ключевое слово словаря в любом написании (регистр, ё/е, пробелы)"""
+    key = keyword_key(text)
+    return session.exec(select(Keyword).where(Keyword.key == key)).first() if key else None
+
+def get_keyword_books(
+    session: Session,
+    keyword_id: int,
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> list:
+    """Книги с ключевым словом (keyset-пагинация по id)"""
+    query = (
+        _fields_query(Book, fields)
+        .join(BookKeyword, BookKeyword.book_id == Book.id)
+        .where(BookKeyword.keyword_id == keyword_id)
+    )
+    if after_id is not None:
+        query = query.where(BookKeyword.book_id > after_id)
+    query = query.order_by(BookKeyword.book_id)
+    if limit:
+        query = query.limit(limit)
+    return _fetch(session, query, fields)
+
+def get_keyword_cloud(session: Session, limit: int = KEYWORD_CLOUD_LIMIT, min_books: int = 1) -> List[dict]:
+    """Самые частые ключевые слова с числом книг"""
+    counts = (
+        select(BookKeyword.keyword_id, func.count().label("books"))
+        .group_by(BookKeyword.keyword_id)
+        .having(func.count() >= min_books)
+        .order_by(func.count().desc(), BookKeyword.keyword_id)
+        .limit(limit)
+        .subquery()
+    )
+    rows = session.execute(
+        select(Keyword.id, Keyword.name, counts.c.books)
+        .join(counts, counts.c.keyword_id == Keyword.id)
+        .order_by(counts.c.books.desc(), Keyword.name)
+    )
+    return [{"id": keyword_id, "keyword": name, "books": books} for keyword_id, name, books in rows]
+
+def get_author_books_with_counts(session: Session, author_id: int, live: bool = False) -> dict:
+    """Получить все книги автора с количеством экземпляров.
+    Количество берется из представления book_availability_mv; live=True - считается по экземплярам"""
+    from sqlmodel import select, func, case
+    
+    # Получаем автора
+    author = get_author_by_id(session, author_id)
+    if not author:
+        return {"error": "Автор не найден"}
+    
+    calculated_at = None
+    if not live:
+        rows = read_view(session, select(library_counters_view.c.calculated_at))
+        calculated_at = rows[0]["calculated_at"] if rows else None
+
+    if calculated_at is not None:
+        view = book_availability_view
+        query = (
+            select(
+                Book.id,
+                Book.main_title,
+                Book.isbn,
+                Book.publication_year,
+                view.c.total_copies.label("copies_count"),
+                view.c.available_copies
+            )
+            .join(BookAuthor, Book.id == BookAuthor.book_id)
+            .outerjoin(view, view.c.book_id == Book.id)
+            .where(BookAuthor.author_id == author_id)
+            .order_by(Book.main_title)
+        )
+    else:
+        calculated_at = session.scalar(select(func.now()))
+        available = get_book_status_by_code(session, "AVAILABLE")
+        available_status_id = available.id if available else None
+
+        # Получаем все книги автора с количеством экземпляров
+        query = (
+            select(
+                Book.id,
+                Book.main_title,
+                Book.isbn,
+                Book.publication_year,
+                func.count(BookCopy.id).label("copies_count"),
+                func.sum(
+                    case((BookCopy.current_status_id == available_status_id, 1), else_=0)
+                ).label("available_copies")
+            )
+            .join(BookAuthor, Book.id == BookAuthor.book_id)
+            .join(BookCopy, Book.id == BookCopy.book_id, isouter=True)
+            .where(BookAuthor.author_id == author_id)
+            .group_by(Book.id, Book.main_title, Book.isbn, Book.publication_year)
+            .order_by(Book.main_title)
+        )
+    
+    books_with_counts = session.exec(query).all()
+    
+    # Преобразуем результат
+    books = []
+    for book in books_with_counts:
+        books.append({
+            "book_id": book.id,
+            "title": book.main_title,
+            "isbn": book.isbn,
+            "publication_year": book.publication_year,
+            "total_copies": book.copies_count or 0,
+            "available_copies": book.available_copies or 0,
+            "loaned_copies": (book.copies_count or 0) - (book.available_copies or 0)
+        })
+    
+    # Общая статистика
+    total_copies = sum(b["total_copies"] for b in books)
+    available_copies = sum(b["available_copies"] for b in books)
+    
+    return {
+        "author": {
+            "id": author.id,
+            "name": f"{author.last_name} {author.first_name or ''} {author.middle_name or ''}".strip(),
+            "birth_year": author.birth_year,
+            "death_year": author.death_year
+        },
+        "books_count": len(books),
+        "total_copies": total_copies,
+        "available_copies": available_copies,
+        "books": books,
+        "calculated_at": calculated_at.isoformat()
+    }
\ No newline at end of file
@@ -13,7 +13,8 @@ engine = create_engine(DATABASE_URL)
 
 # Список таблиц для удаления
 tables = [
-    "daily_statistics", "reference_requests", "visits", "reservations",
+    "classification_nodes", "classification_keys", "book_keywords", "keywords",
+    "name_keys", "book_search", "daily_statistics_queue", "daily_statistics", "reference_requests", "visits", "reservations",
     "payments", "loans", "book_copies", "book_authors", "authors", "books",
     "readers", "operation_types", "loan_statuses", "book_statuses",
     "reader_categories", "publishers", "cities", "countries", "languages",
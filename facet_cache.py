@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+# ==================== КЭШ ФАСЕТОВ ПОИСКА ====================
+# Счетчики фасетов (год, язык, тип издания, ...) для одного и того же запроса
+# одинаковы у всех посетителей, поэтому держим их в памяти процесса с коротким
+# TTL. Ключ - нормализованный запрос и фильтры. Любая запись книг через
+# crud.py очищает кэш целиком.
+FACET_CACHE_TTL = float(os.getenv("FACET_CACHE_TTL", "60"))     # секунд, 0 - не кэшировать
+FACET_CACHE_SIZE = int(os.getenv("FACET_CACHE_SIZE", "1000"))   # запросов
+
+
+def normalize_query(text: Optional[str]) -> str:
+    """Запрос без различий в регистре, ё/е и пробелах"""
+    return " ".join((text or "").lower().replace("ё", "е").split())
+
+
+class FacetCache:
+    """LRU-кэш с временем жизни записей"""
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+facet_cache = FacetCache(FACET_CACHE_SIZE, FACET_CACHE_TTL)
@@ -1,6 +1,13 @@
 from sqlmodel import Session, select
 from database import engine
 from models import *
+from fulltext import refresh_book_documents
+from name_keys import rebuild_name_keys
+from identifiers import backfill_codes
+from classification import rebuild_classification
+from keywords import rebuild_keywords
+from statistics_engine import refresh_daily_statistics
+from stat_views import create_statistics_views, refresh_statistics_views
 from datetime import date, datetime, timedelta
 import random
 
@@ -330,7 +337,7 @@ def fill_test_data():
         
         books = [
             Book(
-                isbn="978-5-699-12345-6",
+                isbn="978-5-699-12345-2",
                 udk="821.133.1",
                 bbk="84(4Фра)",
                 main_title="Граф Монте-Кристо",
@@ -351,7 +358,7 @@ def fill_test_data():
                 is_electronic=False,
             ),
             Book(
-                isbn="978-5-17-098765-4",
+                isbn="978-5-17-098765-8",
                 main_title="Сквозняки",
                 publisher_id=publishers[2].id if len(publishers) > 2 else None,  # Эксмо
                 publication_year=2014,
@@ -363,7 +370,7 @@ def fill_test_data():
                 is_electronic=False,
             ),
             Book(
-                isbn="978-5-389-01234-5",
+                isbn="978-5-389-01234-9",
                 main_title="Мастер и Маргарита",
                 publisher_id=publishers[0].id if publishers else None,  # Просвещение
                 publication_year=2003,
@@ -376,7 +383,7 @@ def fill_test_data():
                 electronic_file_size=2048576,
             ),
             Book(
-                isbn="978-5-17-134567-8",
+                isbn="978-5-17-134567-9",
                 main_title="Война и мир",
                 publication_year=2019,
                 edition_type_id=edition_types[0].id if edition_types else 1,  # Книга
@@ -387,7 +394,7 @@ def fill_test_data():
                 keywords="эпопея, война, мир, Наполеон, Россия, XIX век",
             ),
             Book(
-                isbn="978-5-04-112233-4",
+                isbn="978-5-04-112233-1",
                 main_title="Преступление и наказание",
                 publication_year=2020,
                 edition_type_id=edition_types[0].id if edition_types else 1,  # Книга
@@ -400,7 +407,7 @@ def fill_test_data():
                 electronic_file_size=1536000,
             ),
             Book(
-                isbn="978-5-353-04567-1",
+                isbn="978-5-353-04567-0",
                 main_title="Гарри Поттер и философский камень",
                 parallel_title="Harry Potter and the Philosopher's Stone",
                 publication_year=2001,
@@ -644,44 +651,46 @@ def fill_test_data():
         print(f"✅ Создано {len(reference_requests)} справочных запросов")
         print("=" * 60)
         
-        # Перезагружаем запросы
-        reference_requests = session.exec(select(ReferenceRequest)).all()
-        
         # ==================== 13. ЕЖЕДНЕВНАЯ СТАТИСТИКА ====================
-        print("📊 Создаем ежедневную статистику...")
+        print("📊 Считаем ежедневную статистику...")
         
-        daily_stats = []
+        # Статистика за последние 7 дней по выдачам, посещениям, запросам и фонду
+        days = refresh_daily_statistics(session, date.today() - timedelta(days=6))
+        print(f"✅ Создано {days} записей ежедневной статистики")
+        print("=" * 60)
         
-        # Создаем статистику за последние 7 дней
-        for i in range(7):
-            stat_date = date.today() - timedelta(days=i)
-            
-            # Подсчитываем статистику для этой даты
-            daily_visits = len([v for v in visits if v.visit_date == stat_date])
-            physical_visits = len([v for v in visits if v.visit_date == stat_date and not v.is_remote])
-            
-            daily_stat = DailyStatistic(
-                statistic_date=stat_date,
-                total_visits=daily_visits,
-                physical_visits=physical_visits,
-                remote_visits=daily_visits - physical_visits,
-                new_readers=1 if i == 0 else 0,  # Предположим, что новый читатель был только сегодня
-                active_readers=len([r for r in readers if r.is_active]),
-                total_loans=len([l for l in loans if l.loan_date == stat_date]),
-                book_loans=len([l for l in loans if l.loan_date == stat_date]),
-                electronic_loans=0,  # Упрощенно
-                overdue_loans=len([l for l in loans if l.due_date < stat_date and not l.return_date]),
-                total_copies=len(book_copies),
-                new_copies=1 if i == 2 else 0,  # Предположим, что новые книги поступили 2 дня назад
-                written_off_copies=1 if i == 4 else 0,  # Предположим, что списание было 4 дня назад
-                reference_requests=len([r for r in reference_requests if r.request_date.date() == stat_date]),
-                complex_requests=len([r for r in reference_requests if r.request_date.date() == stat_date and r.complexity_level == "сложный"])
-            )
-            daily_stats.append(daily_stat)
-            session.add(daily_stat)
+        # ==================== 14. ПОИСКОВЫЕ ДОКУМЕНТЫ ====================
+        print("🔎 Строим поисковые документы книг...")
+        indexed = refresh_book_documents(session)
+        print(f"✅ Проиндексировано {indexed} книг")
+        print("=" * 60)
         
-        session.commit()
-        print(f"✅ Создано {len(daily_stats)} записей ежедневной статистики")
+        # ==================== 15. КЛЮЧИ ИМЕН ====================
+        print("🔤 Строим ключи имен авторов и читателей...")
+        print(f"✅ Создано {rebuild_name_keys(session)} ключей")
+        print("=" * 60)
+        
+        # ==================== 16. ISBN-13 И ШТРИХ-КОДЫ ====================
+        print("🏷️ Нормализуем ISBN и штрих-коды...")
+        codes = backfill_codes(session)
+        print(f"✅ ISBN-13 у {codes['books']} книг, штрих-кодов нормализовано: {codes['copies']}")
+        print("=" * 60)
+        
+        # ==================== 17. КЛАССИФИКАЦИЯ УДК/ББК ====================
+        print("🗂️ Строим дерево классификации УДК/ББК...")
+        print(f"✅ Узлов классификации: {rebuild_classification(session)}")
+        print("=" * 60)
+        
+        # ==================== 18. КЛЮЧЕВЫЕ СЛОВА ====================
+        print("🏷️ Строим словарь ключевых слов...")
+        print(f"✅ Ключевых слов: {rebuild_keywords(session)}")
+        print("=" * 60)
+        
+        # ==================== 19. ПРЕДСТАВЛЕНИЯ СТАТИСТИКИ ====================
+        print("📊 Пересчитываем представления статистики...")
+        create_statistics_views(engine)
+        refresh_statistics_views(engine)
+        print("✅ Представления статистики обновлены")
         print("=" * 60)
         
         # ==================== ФИНАЛЬНЫЙ ОТЧЕТ ====================
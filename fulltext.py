@@ -0,0 +1,125 @@
+from functools import reduce
+from typing import List, Optional
+
+from sqlalchemy import case, cast, func, literal, literal_column, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert
+from sqlmodel import Session
+from models import Author, Book, BookAuthor, BookSearchDocument, Language
+from repository import commit
+
+# ==================== ПОЛНОТЕКСТОВЫЙ ПОИСК ПО КНИГАМ ====================
+# Для каждой книги хранится tsvector в таблице book_search (GIN-индекс).
+# Веса: A - основное и параллельное заглавие, B - доп. заглавие и авторы,
+# C - ключевые слова, D - аннотация. Конфигурация выбирается по языку книги.
+SEARCH_CONFIGS = {          # ISO 639 -> конфигурация текстового поиска PostgreSQL
+    "ru": "russian",
+    "en": "english",
+    "de": "german",
+    "fr": "french",
+    "es": "spanish",
+}
+DEFAULT_SEARCH_CONFIG = "russian"    # Книги без языка (русская конфигурация стеммит и латиницу)
+OTHER_SEARCH_CONFIG = "simple"       # Остальные языки - без стемминга
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=25, MinWords=8, StartSel=<b>, StopSel=</b>"
+
+
+def _text(*columns):
+    return func.concat_ws(" ", *columns)
+
+
+def _refresh_statement(where):
+    """INSERT ... SELECT ... ON CONFLICT: пересчитать документы книг, подходящих под where"""
+    config = case(
+        (Language.iso_code.is_(None), DEFAULT_SEARCH_CONFIG),
+        *[(Language.iso_code == code, name) for code, name in SEARCH_CONFIGS.items()],
+        else_=OTHER_SEARCH_CONFIG
+    )
+    authors = (
+        select(func.string_agg(_text(Author.last_name, Author.first_name, Author.middle_name), " "))
+        .join(BookAuthor, BookAuthor.author_id == Author.id)
+        .where(BookAuthor.book_id == Book.id)
+        .scalar_subquery()
+    )
+    book = (
+        select(
+            Book.id, config.label("config"), Book.main_title, Book.parallel_title,
+            Book.additional_title, Book.keywords, Book.abstract, authors.label("authors")
+        )
+        .select_from(Book)
+        .outerjoin(Language, Language.id == Book.language_id)
+        .where(where)
+        .subquery()
+    )
+    regconfig = cast(book.c.config, REGCONFIG)
+    document = (
+        func.setweight(func.to_tsvector(regconfig, _text(book.c.main_title, book.c.parallel_title)), "A")
+        .op("||")(func.setweight(func.to_tsvector(regconfig, _text(book.c.additional_title, book.c.authors)), "B"))
+        .op("||")(func.setweight(func.to_tsvector(regconfig, func.coalesce(book.c.keywords, "")), "C"))
+        .op("||")(func.setweight(func.to_tsvector(regconfig, func.coalesce(book.c.abstract, "")), "D"))
+    )
+    rows = select(book.c.id, book.c.config, document, func.now())
+    statement = insert(BookSearchDocument).from_select(["book_id", "config", "document", "updated_at"], rows)
+    return statement.on_conflict_do_update(
+        index_elements=["book_id"],
+        set_={
+            "config": statement.excluded.config,
+            "document": statement.excluded.document,
+            "updated_at": statement.excluded.updated_at,
+        }
+    )
+
+
+def refresh_book_documents(session: Session, book_ids: Optional[List[int]] = None) -> int:
+    """Пересчитать поисковые документы книг (None - всех книг). Возвращает число книг"""
+    if book_ids is not None and not book_ids:
+        return 0
+    where = Book.id.in_(book_ids) if book_ids is not None else literal(True)
+    count = session.execute(_refresh_statement(where)).rowcount
+    commit(session)
+    return count
+
+
+def refresh_current_transaction_sql() -> str:
+    """SQL пересчета документов книг, измененных текущей транзакцией (для COPY-импорта в transfer.py)"""
+    # xmin строки совпадает с номером транзакции, которая ее вставила или обновила
+    table = Book.__table__
+    row_xid = literal_column(f'"{table.schema}".{table.name}.xmin::text::bigint')
+    changed = row_xid == func.txid_current().op("&")(0xFFFFFFFF)  # младшие 32 бита - xid без эпохи
+    return str(_refresh_statement(changed).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+
+def book_tsquery(text: str):
+    """Запрос для всех используемых конфигураций сразу - константа, поэтому GIN-индекс применим"""
+    configs = dict.fromkeys([DEFAULT_SEARCH_CONFIG, *SEARCH_CONFIGS.values(), OTHER_SEARCH_CONFIG])
+    queries = [func.websearch_to_tsquery(cast(name, REGCONFIG), text) for name in configs]
+    return reduce(lambda left, right: left.op("||")(right), queries)
+
+
+def ranked_search_columns(tsquery) -> list:
+    """Колонки ранга и подсвеченного фрагмента для найденной книги"""
+    rank = func.ts_rank(BookSearchDocument.document, tsquery).label("rank")
+    return [rank, search_headline(tsquery)]
+
+
+def search_headline(tsquery, config=BookSearchDocument.config, title=Book.main_title, abstract=Book.abstract):
+    """Подсвеченный фрагмент заглавия и аннотации (колонки можно взять и из подзапроса)"""
+    return func.ts_headline(
+        cast(config, REGCONFIG),
+        func.concat_ws(" — ", title, abstract),
+        tsquery,
+        HEADLINE_OPTIONS
+    ).label("headline")
+
+
+def matches(tsquery):
+    return BookSearchDocument.document.op("@@")(tsquery)
+
+
+if __name__ == "__main__":
+    from database import get_engine
+    print("🔎 Перестраиваем поисковые документы книг...")
+    with Session(get_engine()) as session:
+        print(f"✅ Проиндексировано {refresh_book_documents(session)} книг")
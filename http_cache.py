@@ -0,0 +1,36 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# ==================== HTTP-КЭШИРОВАНИЕ (ETag / Cache-Control) ====================
+REFERENCE_CACHE_CONTROL = "public, max-age=60"     # Справочники меняются редко
+BOOK_CACHE_CONTROL = "no-cache"                    # Хранить можно, но перед показом сверять ETag
+STATISTICS_CACHE_CONTROL = "public, max-age=60"    # Статистика пересчитывается не чаще раза в минуту
+
+
+def make_etag(*parts) -> str:
+    """Сильный ETag из версии данных и параметров запроса"""
+    raw = "|".join(str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли ETag с заголовком If-None-Match (список через запятую, W/ или *)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Для If-None-Match используется слабое сравнение (RFC 9110, 13.1.2)
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def conditional(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """Проставить ETag и Cache-Control; если у клиента актуальная версия - вернуть 304"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,97 @@
+import re
+from typing import Optional
+
+from sqlmodel import Session, select, update, func
+
+# ==================== ISBN И ШТРИХ-КОДЫ ====================
+# ISBN вводится по-разному: с дефисами и без, ISBN-10 и ISBN-13, со сканера
+# и вручную. Для поиска у книги хранится нормализованный ISBN-13 (только цифры,
+# ISBN-10 переведен в 978..., контрольная цифра проверена) в колонке isbn13
+# с b-tree индексом, поэтому поиск по ISBN - одно точное сравнение по индексу.
+# Колонка isbn остается в том виде, в котором ее ввели (для библиографической
+# записи). Штрих-коды экземпляров хранятся сразу нормализованными.
+ISBN13_PREFIXES = ("978", "979")
+
+_ISBN_SEPARATORS_RE = re.compile(r"[\s\-‐‑‒–]+")
+_ISBN10_RE = re.compile(r"\d{9}[\dX]", re.ASCII)
+_ISBN13_RE = re.compile(r"\d{13}", re.ASCII)
+_BARCODE_SEPARATORS_RE = re.compile(r"[\s\-]+")
+
+
+def _ean_check_digit(digits: str) -> str:
+    """Контрольная цифра EAN-13 для первых 12 цифр"""
+    total = sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(digits))
+    return str(-total % 10)
+
+
+def to_isbn13(value: str) -> str:
+    """ISBN-10 или ISBN-13 в любой записи -> 13 цифр. ValueError, если ISBN некорректен"""
+    code = _ISBN_SEPARATORS_RE.sub("", value).upper()
+    if code.startswith("ISBN"):
+        code = code[4:].lstrip(":")
+    if _ISBN10_RE.fullmatch(code):
+        total = sum((10 - position) * (10 if char == "X" else int(char)) for position, char in enumerate(code))
+        if total % 11:
+            raise ValueError(f"Неверная контрольная цифра ISBN-10: {value}")
+        code = "978" + code[:9]
+        return code + _ean_check_digit(code)
+    if _ISBN13_RE.fullmatch(code) and code.startswith(ISBN13_PREFIXES):
+        if code[12] != _ean_check_digit(code[:12]):
+            raise ValueError(f"Неверная контрольная цифра ISBN-13: {value}")
+        return code
+    raise ValueError(f"Некорректный ISBN: {value}")
+
+
+def isbn13_or_none(value: Optional[str]) -> Optional[str]:
+    """Нормализованный ISBN-13 или None для пустого и некорректного значения"""
+    if not value:
+        return None
+    try:
+        return to_isbn13(value)
+    except ValueError:
+        return None
+
+
+def with_isbn13(values: dict) -> dict:
+    """Значения книги для записи: isbn13 пересчитывается, если передан isbn"""
+    if "isbn" in values:
+        values = {**values, "isbn13": isbn13_or_none(values["isbn"])}
+    return values
+
+
+def normalize_barcode(code: Optional[str]) -> Optional[str]:
+    """Штрих-код без пробелов и дефисов в верхнем регистре (пустой -> None)"""
+    if code is None:
+        return None
+    return _BARCODE_SEPARATORS_RE.sub("", code).upper() or None
+
+
+def backfill_codes(session: Session, batch_size: int = 5000) -> dict:
+    """Заполнить isbn13 всех книг и нормализовать штрих-коды всех экземпляров"""
+    from models import Book, BookCopy
+    books = 0
+    query = select(Book.id, Book.isbn, Book.isbn13).execution_options(yield_per=batch_size)
+    for partition in session.execute(query).partitions():
+        rows = [
+            {"id": book_id, "isbn13": code}
+            for book_id, isbn, old_code in partition
+            if (code := isbn13_or_none(isbn)) != old_code
+        ]
+        if rows:
+            session.execute(update(Book), rows)
+            books += len(rows)
+    # То же правило, что в normalize_barcode, одним UPDATE
+    normalized = func.nullif(func.upper(func.regexp_replace(BookCopy.barcode, r"[\s-]+", "", "g")), "")
+    copies = session.execute(
+        update(BookCopy).where(BookCopy.barcode.is_distinct_from(normalized)).values(barcode=normalized)
+    ).rowcount
+    session.commit()
+    return {"books": books, "copies": copies}
+
+
+if __name__ == "__main__":
+    from database import get_engine
+    print("🏷️ Нормализуем ISBN книг и штрих-коды экземпляров...")
+    with Session(get_engine()) as session:
+        result = backfill_codes(session)
+    print(f"✅ Обновлено книг: {result['books']}, экземпляров: {result['copies']}")
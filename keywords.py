@@ -0,0 +1,86 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select, delete, insert, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import Book, BookKeyword, Keyword
+from repository import commit
+
+# ==================== КЛЮЧЕВЫЕ СЛОВА КНИГ ====================
+# Book.keywords - список через запятую ("приключения, месть, Франция").
+# Каждое слово хранится один раз в словаре keywords (ключ - нижний регистр,
+# ё -> е, одиночные пробелы) и связывается с книгами через book_keywords.
+# Книги по слову - поиск по уникальному индексу словаря и индексу связей,
+# облако слов - группировка связей по keyword_id. Связи пересчитываются
+# при записи книг через crud.py и при импорте CSV.
+MAX_KEYWORD_LENGTH = 200
+KEYWORD_CLOUD_LIMIT = 100     # Слов в облаке по умолчанию
+
+_SEPARATORS_RE = re.compile(r"[,;\n]+")
+
+
+def keyword_key(text: Optional[str]) -> str:
+    """Нормализованная форма ключевого слова"""
+    return " ".join((text or "").lower().replace("ё", "е").split())[:MAX_KEYWORD_LENGTH]
+
+
+def split_keywords(text: Optional[str]) -> List[Tuple[str, str]]:
+    """[(ключ, написание)] из поля keywords, без повторов"""
+    found: Dict[str, str] = {}
+    for part in _SEPARATORS_RE.split(text or ""):
+        name = " ".join(part.split()).strip(" .")[:MAX_KEYWORD_LENGTH]
+        key = keyword_key(name)
+        if key and key not in found:
+            found[key] = name
+    return list(found.items())
+
+
+def _keyword_ids(session: Session, names: Dict[str, str]) -> Dict[str, int]:
+    """ID слов словаря по ключам; недостающие слова добавляются"""
+    if not names:
+        return {}
+    session.execute(
+        pg_insert(Keyword)
+        .values([{"key": key, "name": name} for key, name in names.items()])
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    return dict(session.execute(select(Keyword.key, Keyword.id).where(Keyword.key.in_(list(names)))).all())
+
+
+def _link_rows(session: Session, books) -> List[dict]:
+    books_keywords = [(book_id, split_keywords(text)) for book_id, text in books]
+    ids = _keyword_ids(session, {key: name for _, pairs in books_keywords for key, name in pairs})
+    return [{"book_id": book_id, "keyword_id": ids[key]} for book_id, pairs in books_keywords for key, _ in pairs]
+
+
+def refresh_book_keywords(session: Session, book_ids: List[int]) -> None:
+    """Пересчитать связи созданных/измененных книг со словарем"""
+    book_ids = list(set(book_ids))
+    if not book_ids:
+        return
+    session.execute(delete(BookKeyword).where(BookKeyword.book_id.in_(book_ids)))
+    books = session.execute(select(Book.id, Book.keywords).where(Book.id.in_(book_ids))).all()
+    rows = _link_rows(session, books)
+    if rows:
+        session.execute(insert(BookKeyword), rows)
+    commit(session)
+
+
+def rebuild_keywords(session: Session, batch_size: int = 5000) -> int:
+    """Построить словарь и связи для всех книг заново. Возвращает число слов"""
+    session.execute(delete(BookKeyword))
+    session.execute(delete(Keyword))
+    query = select(Book.id, Book.keywords).where(Book.keywords.is_not(None)).execution_options(yield_per=batch_size)
+    for partition in session.execute(query).partitions():
+        rows = _link_rows(session, partition)
+        if rows:
+            session.execute(insert(BookKeyword), rows)
+    session.commit()
+    return session.scalar(select(func.count()).select_from(Keyword))
+
+
+if __name__ == "__main__":
+    from database import get_engine
+    print("🏷️ Строим словарь ключевых слов...")
+    with Session(get_engine()) as session:
+        print(f"✅ Ключевых слов: {rebuild_keywords(session)}")
@@ -1,6 +1,25 @@
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Column, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from pydantic import field_validator
 from typing import Optional
 from datetime import date, datetime
+from identifiers import to_isbn13, normalize_barcode
+
+# ==================== ИНДЕКСЫ НА РАСШИРЕНИЯХ ====================
+
+def requires_extension(name: str):
+    """Условие для ddl_if: индекс создается, только если расширение PostgreSQL установлено"""
+    def check(ddl, target, bind, **kw):
+        query = text("SELECT 1 FROM pg_extension WHERE extname = :name")
+        return bind.execute(query, {"name": name}).first() is not None
+    return check
+
+def trigram_index(table: str, column: str) -> Index:
+    """GIN-индекс pg_trgm для поиска подстроки (ilike '%...%') и похожести"""
+    return Index(
+        f"ix_{table}_{column}_trgm", column,
+        postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+    ).ddl_if(callable_=requires_extension("pg_trgm"))
 
 # ==================== СПРАВОЧНИКИ (ГОСТ 7.60-2003) ====================
 
@@ -97,7 +116,14 @@ class OperationType(SQLModel, table=True):
 class Reader(SQLModel, table=True):
     """Читатели библиотеки"""
     __tablename__ = "readers"
-    __table_args__ = {'schema': 'Ichetovkina'}
+    __table_args__ = (
+        # Поиск на кафедре выдачи по фрагментам (см. search_readers)
+        trigram_index("readers", "last_name"),
+        trigram_index("readers", "first_name"),
+        trigram_index("readers", "phone"),
+        trigram_index("readers", "email"),
+        {'schema': 'Ichetovkina'}
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     # ЛИЧНЫЕ ДАННЫЕ
@@ -121,7 +147,7 @@ class Reader(SQLModel, table=True):
     document_issued_date: Optional[date] = Field(default=None)  # Дата выдачи
     
     # СТАТУС
-    registration_date: date = Field(default_factory=date.today)  # Дата регистрации
+    registration_date: date = Field(default_factory=date.today, index=True)  # Дата регистрации
     card_expiry_date: Optional[date] = Field(default=None)  # Срок действия карты
     is_active: bool = Field(default=True)                  # Активен ли читатель
     notes: Optional[str] = Field(default=None)             # Примечания
@@ -139,6 +165,7 @@ class Book(SQLModel, table=True):
     
     # БИБЛИОГРАФИЧЕСКОЕ ОПИСАНИЕ
     isbn: Optional[str] = Field(max_length=17, default=None)  # ISBN (ГОСТ 7.53-2001)
+    isbn13: Optional[str] = Field(max_length=13, default=None, index=True)  # ISBN-13 без дефисов (для поиска)
     udk: Optional[str] = Field(max_length=50, default=None)   # УДК
     bbk: Optional[str] = Field(max_length=50, default=None)   # ББК
     main_title: str = Field(max_length=500)                   # Основное заглавие
@@ -203,24 +230,28 @@ class BookCopy(SQLModel, table=True):
     __table_args__ = {'schema': 'Ichetovkina'}
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    book_id: int = Field(foreign_key="Ichetovkina.books.id")        # ID книги
+    book_id: int = Field(foreign_key="Ichetovkina.books.id", index=True)  # ID книги
     inventory_number: str = Field(max_length=50, unique=True)       # Инвентарный номер
-    barcode: Optional[str] = Field(max_length=100, default=None)    # Штрих-код
+    barcode: Optional[str] = Field(max_length=100, default=None, unique=True, index=True)  # Штрих-код (нормализованный)
     copy_number: int = Field(default=1, ge=1)                       # Номер экземпляра
-    acquisition_date: date = Field(default_factory=date.today)      # Дата поступления
+    acquisition_date: date = Field(default_factory=date.today, index=True)  # Дата поступления
     acquisition_source: Optional[str] = Field(default=None, max_length=200)  # Источник поступления
     price: Optional[float] = Field(default=None)                    # Цена
     location: Optional[str] = Field(max_length=100, default=None)   # Место хранения
     current_status_id: int = Field(foreign_key="Ichetovkina.book_statuses.id", default=1)  # Текущий статус
     condition_notes: Optional[str] = Field(default=None)            # Заметки о состоянии
-    write_off_date: Optional[date] = Field(default=None)            # Дата списания
+    write_off_date: Optional[date] = Field(default=None, index=True)  # Дата списания
     write_off_reason: Optional[str] = Field(default=None)           # Причина списания
     created_at: datetime = Field(default_factory=datetime.now)      # Дата создания
 
 class Loan(SQLModel, table=True):
     """Выдачи книг читателям"""
     __tablename__ = "loans"
-    __table_args__ = {'schema': 'Ichetovkina'}
+    __table_args__ = (
+        # Невозвращенные выдачи по сроку: счетчик просроченных на текущую дату
+        Index("ix_loans_open_due_date", "due_date", postgresql_where=text("return_date IS NULL")),
+        {'schema': 'Ichetovkina'}
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     # СВЯЗИ
@@ -229,8 +260,8 @@ class Loan(SQLModel, table=True):
     librarian_id: Optional[int] = Field(default=None)                    # ID библиотекаря
     
     # ДАТЫ
-    loan_date: date = Field(default_factory=date.today)                  # Дата выдачи
-    due_date: date                                                       # Плановая дата возврата
+    loan_date: date = Field(default_factory=date.today, index=True)      # Дата выдачи
+    due_date: date = Field(index=True)                                   # Плановая дата возврата
     return_date: Optional[date] = Field(default=None)                    # Фактическая дата возврата
     
     # СТАТУС
@@ -249,8 +280,8 @@ class Loan(SQLModel, table=True):
     notes: Optional[str] = Field(default=None)                           # Примечания
     
     # СИСТЕМНЫЕ ПОЛЯ
-    created_at: datetime = Field(default_factory=datetime.now)           # Дата создания
-    updated_at: Optional[datetime] = Field(default=None)                 # Дата обновления
+    created_at: datetime = Field(default_factory=datetime.now, index=True) # Дата создания
+    updated_at: Optional[datetime] = Field(default=None, index=True)     # Дата обновления
 
     def calculate_fine(self, fine_per_day: float = None, max_fine_days: int = None, max_fine: float = None) -> float:
         """Рассчитать штраф за просрочку"""
@@ -289,7 +320,7 @@ class Payment(SQLModel, table=True):
     transaction_id: Optional[str] = Field(max_length=100, default=None)  # Номер транзакции
     description: Optional[str] = Field(default=None)                     # Описание
     related_loan_id: Optional[int] = Field(foreign_key="Ichetovkina.loans.id", default=None)  # Связанная выдача
-    created_at: datetime = Field(default_factory=datetime.now)           # Дата создания
+    created_at: datetime = Field(default_factory=datetime.now, index=True) # Дата создания
 
 class Reservation(SQLModel, table=True):
     """Бронирования книг"""
@@ -314,12 +345,12 @@ class Visit(SQLModel, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     reader_id: Optional[int] = Field(foreign_key="Ichetovkina.readers.id", default=None)  # ID читателя
-    visit_date: date = Field(default_factory=date.today)               # Дата посещения
+    visit_date: date = Field(default_factory=date.today, index=True)   # Дата посещения
     visit_time: datetime = Field(default_factory=datetime.now)         # Время посещения
     is_remote: bool = Field(default=False)                             # Удаленное посещение
     purpose: Optional[str] = Field(max_length=100, default=None)       # Цель посещения
     duration_minutes: Optional[int] = Field(default=None)              # Продолжительность в минутах
-    created_at: datetime = Field(default_factory=datetime.now)         # Дата создания
+    created_at: datetime = Field(default_factory=datetime.now, index=True) # Дата создания
 
 class ReferenceRequest(SQLModel, table=True):
     """Статистика запросов"""
@@ -328,7 +359,7 @@ class ReferenceRequest(SQLModel, table=True):
     
     id: Optional[int] = Field(default=None, primary_key=True)
     reader_id: Optional[int] = Field(foreign_key="Ichetovkina.readers.id", default=None)  # ID читателя
-    request_date: datetime = Field(default_factory=datetime.now)       # Дата запроса
+    request_date: datetime = Field(default_factory=datetime.now, index=True)  # Дата запроса
     request_type: Optional[str] = Field(max_length=100, default=None)  # Тип запроса
     subject: Optional[str] = Field(max_length=500, default=None)       # Тема запроса
     complexity_level: Optional[str] = Field(max_length=50, default=None)  # Уровень сложности
@@ -369,7 +400,102 @@ class DailyStatistic(SQLModel, table=True):
     complex_requests: int = Field(default=0)                           # Сложных запросов
     
     # СИСТЕМНЫЕ ПОЛЯ
-    calculated_at: datetime = Field(default_factory=datetime.now)      # Дата расчета
+    calculated_at: datetime = Field(default_factory=datetime.now, index=True)  # Дата расчета
+
+class DailyStatisticQueue(SQLModel, table=True):
+    """Дни daily_statistics, ожидающие пересчета после записи (см. statistics_engine.py)"""
+    __tablename__ = "daily_statistics_queue"
+    __table_args__ = {'schema': 'Ichetovkina'}
+    
+    statistic_date: date = Field(primary_key=True)                     # День для пересчета
+
+# ==================== ПОИСКОВЫЕ ДОКУМЕНТЫ ====================
+
+class BookSearchDocument(SQLModel, table=True):
+    """Поисковый документ книги для полнотекстового поиска (см. fulltext.py)"""
+    __tablename__ = "book_search"
+    __table_args__ = (
+        Index("ix_book_search_document", "document", postgresql_using="gin"),
+        {'schema': 'Ichetovkina'}
+    )
+    
+    book_id: int = Field(foreign_key="Ichetovkina.books.id", primary_key=True, ondelete="CASCADE")  # Книга
+    config: str = Field(max_length=30)                                 # Конфигурация FTS (russian, english, ...)
+    document: str = Field(sa_column=Column(TSVECTOR, nullable=False))  # Заглавия, авторы, ключевые слова, аннотация
+    updated_at: datetime = Field(default_factory=datetime.now)         # Дата пересчета
+
+class NameKey(SQLModel, table=True):
+    """Ключ сопоставления имени автора/читателя: латиница ГОСТ 7.79-Б со сглаживанием (см. name_keys.py)"""
+    __tablename__ = "name_keys"
+    __table_args__ = (
+        # varchar_pattern_ops - индекс для LIKE 'префикс%' при любой локали БД
+        Index("ix_name_keys_lookup", "entity", "field", "key", postgresql_ops={"key": "varchar_pattern_ops"}),
+        Index("ix_name_keys_entity", "entity", "entity_id"),
+        {'schema': 'Ichetovkina'}
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(max_length=10)                                 # author / reader
+    entity_id: int                                                     # ID автора или читателя
+    field: str = Field(max_length=20)                                  # last_name / first_name / middle_name
+    key: str = Field(max_length=200)                                   # Ключ (начиная с любого слова поля)
+
+# ==================== КЛЮЧЕВЫЕ СЛОВА ====================
+
+class Keyword(SQLModel, table=True):
+    """Словарь ключевых слов книг (см. keywords.py)"""
+    __tablename__ = "keywords"
+    __table_args__ = {'schema': 'Ichetovkina'}
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    key: str = Field(max_length=200, unique=True, index=True)          # Нормализованная форма (поиск)
+    name: str = Field(max_length=200)                                  # Написание при первом появлении
+
+class BookKeyword(SQLModel, table=True):
+    """Связь книг и ключевых слов"""
+    __tablename__ = "book_keywords"
+    __table_args__ = (
+        # Книги по слову в порядке id - для постраничной выдачи и подсчета без чтения таблицы
+        Index("ix_book_keywords_keyword", "keyword_id", "book_id"),
+        {'schema': 'Ichetovkina'}
+    )
+    
+    book_id: int = Field(foreign_key="Ichetovkina.books.id", primary_key=True, ondelete="CASCADE")  # Книга
+    keyword_id: int = Field(foreign_key="Ichetovkina.keywords.id", primary_key=True)  # Ключевое слово
+
+# ==================== КЛАССИФИКАЦИЯ (УДК, ББК) ====================
+
+class ClassificationKey(SQLModel, table=True):
+    """Индекс УДК/ББК книги - материализованный путь (см. classification.py)"""
+    __tablename__ = "classification_keys"
+    __table_args__ = (
+        # Все книги узла "004.4" - LIKE '004.4%' по индексу
+        Index("ix_classification_keys_code", "scheme", "code", postgresql_ops={"code": "varchar_pattern_ops"}),
+        Index("ix_classification_keys_book", "book_id"),
+        {'schema': 'Ichetovkina'}
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    scheme: str = Field(max_length=3)                                  # udk / bbk
+    book_id: int = Field(foreign_key="Ichetovkina.books.id", ondelete="CASCADE")  # Книга
+    code: str = Field(max_length=60)                                   # Основной индекс в каноническом виде
+
+class ClassificationNode(SQLModel, table=True):
+    """Узел дерева УДК/ББК со счетчиками книг и экземпляров всего поддерева"""
+    __tablename__ = "classification_nodes"
+    __table_args__ = (
+        Index("ix_classification_nodes_code", "scheme", "code", unique=True),
+        Index("ix_classification_nodes_parent", "scheme", "parent", "code"),
+        {'schema': 'Ichetovkina'}
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    scheme: str = Field(max_length=3)                                  # udk / bbk
+    code: str = Field(max_length=60)                                   # Индекс узла
+    parent: Optional[str] = Field(max_length=60, default=None)         # Индекс родителя (NULL - верхний уровень)
+    depth: int = Field(default=1)                                      # Уровень (1 - верхний)
+    book_count: int = Field(default=0)                                 # Книг в поддереве
+    copy_count: int = Field(default=0)                                 # Экземпляров этих книг
 
 # ==================== МОДЕЛИ ДЛЯ СОЗДАНИЯ ====================
 
@@ -413,6 +539,13 @@ class BookCreate(SQLModel):
     electronic_access_url: Optional[str] = None
     electronic_file_size: Optional[int] = None
 
+    @field_validator("isbn")
+    @classmethod
+    def check_isbn(cls, value: Optional[str]) -> Optional[str]:
+        if value:
+            to_isbn13(value)  # Проверка контрольной цифры
+        return value
+
 class AuthorCreate(SQLModel):
     last_name: str
     first_name: Optional[str] = None
@@ -421,6 +554,12 @@ class AuthorCreate(SQLModel):
     death_year: Optional[int] = None
     biography: Optional[str] = None
 
+class BookAuthorCreate(SQLModel):
+    book_id: int
+    author_id: int
+    author_role: str = "author"
+    author_order: int = Field(default=1, ge=1)
+
 class BookCopyCreate(SQLModel):
     book_id: int
     inventory_number: str
@@ -433,6 +572,11 @@ class BookCopyCreate(SQLModel):
     current_status_id: int = 1
     condition_notes: Optional[str] = None
 
+    @field_validator("barcode")
+    @classmethod
+    def clean_barcode(cls, value: Optional[str]) -> Optional[str]:
+        return normalize_barcode(value)
+
 class LoanCreate(SQLModel):
     book_copy_id: int
     reader_id: int
@@ -494,6 +638,13 @@ class BookUpdate(SQLModel):
     electronic_access_url: Optional[str] = None
     electronic_file_size: Optional[int] = None
 
+    @field_validator("isbn")
+    @classmethod
+    def check_isbn(cls, value: Optional[str]) -> Optional[str]:
+        if value:
+            to_isbn13(value)  # Проверка контрольной цифры
+        return value
+
 class LoanUpdate(SQLModel):
     return_date: Optional[date] = None
     status_id: Optional[int] = None
@@ -502,4 +653,28 @@ class LoanUpdate(SQLModel):
     fine_amount: Optional[float] = None
     fine_paid: Optional[bool] = None
     fine_payment_date: Optional[date] = None
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+
+# ==================== МОДЕЛИ ДЛЯ СПИСКОВ ====================
+# Поля по умолчанию в списках и поиске: без больших текстов и документов
+
+class BookListItem(SQLModel):
+    id: int
+    isbn: Optional[str] = None
+    main_title: str
+    publisher_id: Optional[int] = None
+    publication_year: Optional[int] = None
+    edition_type_id: int
+    language_id: Optional[int] = None
+    is_electronic: bool = False
+
+class ReaderListItem(SQLModel):
+    id: int
+    last_name: str
+    first_name: str
+    middle_name: Optional[str] = None
+    category_id: int
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    card_expiry_date: Optional[date] = None
+    is_active: bool = True
@@ -0,0 +1,167 @@
+import re
+from typing import Iterable, List, Optional
+
+from sqlmodel import Session, select, delete, insert, false
+from models import Author, NameKey, Reader
+from repository import commit as commit_session
+
+# ==================== КЛЮЧИ СОПОСТАВЛЕНИЯ ИМЕН ====================
+# «Толстой», «Tolstoy» и «Tolstoj» должны находить одного автора. Для каждого
+# имени хранится ключ: нижний регистр, ё -> е, транслитерация по ГОСТ 7.79-2000
+# (система Б) и сглаживание вариантов латинского написания (y/j -> i, kh -> h,
+# ts -> c, удвоенные буквы -> одна, ...). Строка поиска приводится к ключу так же,
+# поэтому поиск - один LIKE 'ключ%' по индексу таблицы name_keys.
+NAME_FIELDS = {
+    "author": (Author, ["last_name", "first_name", "middle_name"]),
+    "reader": (Reader, ["last_name", "first_name", "middle_name"]),
+}
+MAX_KEY_LENGTH = 200
+
+# ГОСТ 7.79-2000, система Б (русский алфавит)
+GOST_779B = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "zh",
+    "з": "z", "и": "i", "й": "j", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "x", "ц": "cz",
+    "ч": "ch", "ш": "sh", "щ": "shh", "ъ": "``", "ы": "y`", "ь": "`", "э": "e`",
+    "ю": "yu", "я": "ya",
+}
+# Сглаживание: разные латинские написания одного звука -> одно (порядок важен)
+FOLDING = [
+    ("`", ""), ("'", ""),
+    ("shch", "sh"), ("shh", "sh"), ("tch", "ch"),
+    ("kh", "h"), ("x", "h"), ("cz", "c"), ("ts", "c"), ("tz", "c"),
+    ("w", "v"), ("ph", "f"), ("ck", "k"), ("q", "k"),
+    ("ye", "e"), ("je", "e"), ("yo", "e"), ("jo", "e"),
+    ("yu", "iu"), ("ju", "iu"), ("ya", "ia"), ("ja", "ia"),
+    ("j", "i"), ("y", "i"),
+]
+_NOT_WORD_RE = re.compile(r"(?:[^\w`']|_)+")   # "_" тоже разделитель: в LIKE это подстановочный знак
+_DOUBLE_RE = re.compile(r"(\w)\1+")
+
+
+def transliterate(text: str) -> str:
+    """Транслитерация кириллицы по ГОСТ 7.79-2000 (система Б), прочие символы без изменений"""
+    result = []
+    for position, char in enumerate(text):
+        if char == "ц":
+            # Перед i, e, y, j - "c", в остальных случаях "cz"
+            following = GOST_779B.get(text[position + 1], text[position + 1]) if position + 1 < len(text) else ""
+            result.append("c" if following[:1] in ("i", "e", "y", "j") else "cz")
+        else:
+            result.append(GOST_779B.get(char, char))
+    return "".join(result)
+
+
+def name_key(text: Optional[str]) -> str:
+    """Ключ сопоставления имени (и префикса имени из строки поиска)"""
+    if not text:
+        return ""
+    text = _NOT_WORD_RE.sub(" ", text.lower().replace("ё", "е")).strip()
+    key = transliterate(text)
+    for source, target in FOLDING:
+        key = key.replace(source, target)
+    return " ".join(_DOUBLE_RE.sub(r"\1", key).split())[:MAX_KEY_LENGTH]
+
+
+def _field_keys(value: Optional[str]) -> List[str]:
+    """Ключи поля: с начала значения и с начала каждого следующего слова (двойные фамилии)"""
+    words = name_key(value).split(" ")
+    return list(dict.fromkeys(" ".join(words[position:]) for position in range(len(words)) if words[position]))
+
+
+def _rows(entity: str, objects: Iterable) -> List[dict]:
+    _, fields = NAME_FIELDS[entity]
+    return [
+        {"entity": entity, "entity_id": obj.id, "field": field, "key": key}
+        for obj in objects
+        for field in fields
+        for key in _field_keys(getattr(obj, field))
+    ]
+
+
+def refresh_name_keys(session: Session, entity: str, objects: list) -> None:
+    """Пересчитать ключи созданных/измененных авторов или читателей"""
+    if not objects:
+        return
+    remove_name_keys(session, entity, [obj.id for obj in objects], commit=False)
+    rows = _rows(entity, objects)
+    if rows:
+        session.execute(insert(NameKey), rows)
+    commit_session(session)
+
+
+def remove_name_keys(session: Session, entity: str, entity_ids: List[int], commit: bool = True) -> None:
+    session.execute(delete(NameKey).where(NameKey.entity == entity, NameKey.entity_id.in_(entity_ids)))
+    if commit:
+        commit_session(session)
+
+
+def name_match(entity: str, field: str, text: str):
+    """Подзапрос id авторов/читателей, у которых поле field начинается с text (с учетом транслитерации)"""
+    key = name_key(text)
+    if not key:
+        return select(NameKey.entity_id).where(false())
+    return select(NameKey.entity_id).where(
+        NameKey.entity == entity,
+        NameKey.field == field,
+        NameKey.key.like(f"{key}%")
+    )
+
+
+def refresh_changed_rows(cursor, entity: str, batch_size: int = 5000) -> None:
+    """Пересчитать ключи строк, измененных текущей транзакцией (курсор psycopg2, для transfer.py).
+    Строки читаются серверным курсором порциями по batch_size, ключи пишутся одним
+    INSERT на порцию - память и число обращений к серверу не растут с размером файла"""
+    from psycopg2.extras import execute_values
+    model, fields = NAME_FIELDS[entity]
+    table = model.__table__
+    keys_table = NameKey.__table__
+    changed = cursor.connection.cursor(name=f"name_keys_{entity}")
+    changed.itersize = batch_size
+    changed.execute(
+        f'SELECT id, {", ".join(fields)} FROM "{table.schema}".{table.name} '
+        "WHERE xmin::text::bigint = txid_current() & 4294967295"
+    )
+    try:
+        while True:
+            batch = changed.fetchmany(batch_size)
+            if not batch:
+                break
+            cursor.execute(
+                f'DELETE FROM "{keys_table.schema}".{keys_table.name} WHERE entity = %s AND entity_id = ANY(%s)',
+                (entity, [row[0] for row in batch])
+            )
+            rows = [
+                (entity, row[0], field, key)
+                for row in batch for field, value in zip(fields, row[1:]) for key in _field_keys(value)
+            ]
+            if rows:
+                execute_values(
+                    cursor,
+                    f'INSERT INTO "{keys_table.schema}".{keys_table.name} (entity, entity_id, field, key) VALUES %s',
+                    rows, page_size=len(rows)
+                )
+    finally:
+        changed.close()
+
+
+def rebuild_name_keys(session: Session, batch_size: int = 5000) -> int:
+    """Построить ключи для всех авторов и читателей заново. Возвращает число ключей"""
+    session.execute(delete(NameKey))
+    count = 0
+    for entity, (model, fields) in NAME_FIELDS.items():
+        query = select(model.id, *[getattr(model, field) for field in fields]).execution_options(yield_per=batch_size)
+        for partition in session.execute(query).partitions():
+            rows = _rows(entity, partition)
+            if rows:
+                session.execute(insert(NameKey), rows)
+                count += len(rows)
+    session.commit()
+    return count
+
+
+if __name__ == "__main__":
+    from database import get_engine
+    print("🔤 Строим ключи имен авторов и читателей...")
+    with Session(get_engine()) as session:
+        print(f"✅ Создано {rebuild_name_keys(session)} ключей")
@@ -0,0 +1,64 @@
+import base64
+import binascii
+from typing import Generic, List, Optional, TypeVar
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+# ==================== KEYSET-ПАГИНАЦИЯ ====================
+DEFAULT_PAGE_SIZE = 50   # Размер страницы по умолчанию
+MAX_PAGE_SIZE = 500      # Максимальный размер страницы
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Страница списка с курсором на следующую страницу"""
+    items: List[T]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(last_id: int) -> str:
+    """Закодировать ID последней записи страницы в непрозрачный курсор"""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Раскодировать курсор обратно в ID последней записи"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, value = raw.split(":", 1)
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+class PageParams:
+    """Параметры страницы: limit и курсор (cursor или after_id)"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after_id: Optional[int] = Query(None, ge=0),
+        cursor: Optional[str] = None
+    ):
+        self.limit = limit
+        self.after_id = decode_cursor(cursor) if cursor else after_id
+
+    @property
+    def fetch_limit(self) -> int:
+        """Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница"""
+        return self.limit + 1
+
+
+def make_page(rows: list, params: PageParams) -> Page:
+    """Собрать страницу из результата запроса с fetch_limit записями"""
+    items = list(rows[:params.limit])
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["id"] if isinstance(last, dict) else last.id)
+    return Page(items=items, limit=params.limit, next_cursor=next_cursor)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# ==================== МЕТРИКИ ПУЛА СОЕДИНЕНИЙ ====================
+
+
+class PoolMetricsMixin:
+    """Считает время ожидания соединения из пула и число таймаутов"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        # Время выдачи соединения: ожидание свободного или открытие нового (overflow)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+class MeteredQueuePool(PoolMetricsMixin, QueuePool):
+    """QueuePool с метриками (синхронный движок)"""
+
+
+class MeteredAsyncPool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool с метриками (движок asyncpg)"""
+
+
+def pool_status(engine) -> dict:
+    """Текущее состояние пула движка"""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+    if isinstance(pool, PoolMetricsMixin):
+        status.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_avg_ms": round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "wait_max_ms": round(pool.wait_max * 1000, 3),
+        })
+    return status
@@ -0,0 +1,200 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlmodel import Session, select
+from models import *
+from repository import Repository
+
+# ==================== КЭШ СПРАВОЧНИКОВ ====================
+# Справочники почти не меняются, поэтому держим их целиком в памяти процесса.
+# Изменения через crud.py сразу попадают в кэш (write-through); изменения,
+# сделанные другими процессами, подхватываются после истечения TTL; id и коды,
+# которых нет в кэше (созданы другим процессом), ищутся в БД и добавляются в кэш,
+# а не найденные и там запоминаются как промахи до перезагрузки справочника.
+REFERENCE_MODELS = [
+    EditionType, Language, Country, City, Publisher,
+    ReaderCategory, BookStatus, LoanStatus, OperationType,
+]
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))  # секунд
+
+
+class _Table:
+    """Содержимое одного справочника"""
+
+    def __init__(self, rows: list):
+        self.by_id = {row.id: row for row in rows}
+        self.ids = sorted(self.by_id)
+        self.by_code = {row.code: row for row in rows if hasattr(row, "code")}
+        self.version = hashlib.sha1(
+            json.dumps([self.by_id[row_id].dict() for row_id in self.ids], sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        self.loaded_at = time.monotonic()
+        self.missing_ids = frozenset()    # Промахи: id и коды, которых нет и в БД
+        self.missing_codes = frozenset()
+
+
+class ReferenceCache:
+    """Версионированный кэш справочников: id -> объект, code -> объект.
+
+    Версия таблицы - хэш содержимого, поэтому одинакова во всех процессах
+    с одинаковыми данными и подходит для ETag.
+    """
+
+    def __init__(self, models: list, ttl: float):
+        self.models = models
+        self.ttl = ttl
+        self._tables: Dict[type, _Table] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _detach(model, obj):
+        # Кэш живет дольше сессий, поэтому храним копии, не привязанные к сессии
+        return model(**obj.dict())
+
+    def load(self, session: Session, model=None) -> None:
+        """Загрузить из БД один справочник или все сразу"""
+        for current in [model] if model else self.models:
+            rows = [self._detach(current, row) for row in session.exec(select(current))]
+            with self._lock:
+                self._tables[current] = _Table(rows)
+
+    def _table(self, session: Session, model) -> _Table:
+        table = self._tables.get(model)
+        if table is None or time.monotonic() - table.loaded_at > self.ttl:
+            self.load(session, model)
+            table = self._tables[model]
+        return table
+
+    def list(self, session: Session, model, limit: Optional[int] = None, after_id: Optional[int] = None) -> List:
+        table = self._table(session, model)
+        start = bisect.bisect_right(table.ids, after_id) if after_id is not None else 0
+        end = start + limit if limit is not None else len(table.ids)
+        return [table.by_id[row_id] for row_id in table.ids[start:end]]
+
+    def get(self, session: Session, model, obj_id: int):
+        return self.get_many(session, model, [obj_id]).get(obj_id)
+
+    def get_many(self, session: Session, model, ids) -> Dict[int, object]:
+        """{id: объект} для найденных id; отсутствующие в кэше ищутся в БД одним запросом"""
+        table = self._table(session, model)
+        found = {obj_id: table.by_id[obj_id] for obj_id in ids if obj_id in table.by_id}
+        missing = set(ids) - set(found) - table.missing_ids
+        if missing:
+            rows = self._fetch(session, model, model.id.in_(missing))
+            found.update((row.id, row) for row in rows)
+            self._miss(model, ids=missing - set(found))
+        return found
+
+    def get_by_code(self, session: Session, model, code: str):
+        table = self._table(session, model)
+        row = table.by_code.get(code)
+        if row is None and code not in table.missing_codes:
+            rows = self._fetch(session, model, model.code == code)
+            row = rows[0] if rows else None
+            if row is None:
+                self._miss(model, codes=[code])
+        return row
+
+    def _fetch(self, session: Session, model, condition) -> List:
+        """Строки, которых нет в кэше (созданы другим процессом): прочитать и добавить"""
+        rows = [self._detach(model, row) for row in session.exec(select(model).where(condition))]
+        self._store(model, rows)
+        return rows
+
+    def version(self, session: Session, model) -> str:
+        return self._table(session, model).version
+
+    def put(self, model, obj) -> None:
+        """Записать созданный/измененный объект в кэш"""
+        self._store(model, [self._detach(model, obj)])
+
+    def _store(self, model, objs: list) -> None:
+        if not objs:
+            return
+        with self._lock:
+            table = self._tables.get(model)
+            if table is None:
+                return
+            rows = dict(table.by_id)
+            rows.update((obj.id, obj) for obj in objs)
+            self._replace(model, table, list(rows.values()))
+
+    def remove(self, model, obj_id: int) -> None:
+        """Убрать удаленный объект из кэша"""
+        with self._lock:
+            table = self._tables.get(model)
+            if table is None:
+                return
+            rows = [row for row_id, row in table.by_id.items() if row_id != obj_id]
+            self._replace(model, table, rows)
+            self._tables[model].missing_ids |= {obj_id}
+
+    def _replace(self, model, table: _Table, rows: list) -> None:
+        """Заменить содержимое справочника (под _lock)"""
+        updated = _Table(rows)
+        # Срок жизни не продлевается: остальные строки все равно перечитаются по TTL
+        updated.loaded_at = table.loaded_at
+        updated.missing_ids = table.missing_ids - set(updated.by_id)
+        updated.missing_codes = table.missing_codes - set(updated.by_code)
+        self._tables[model] = updated
+
+    def _miss(self, model, ids=(), codes=()) -> None:
+        """Запомнить id и коды, которых нет в БД: до перезагрузки справочника их не ищем"""
+        with self._lock:
+            table = self._tables.get(model)
+            if table is not None:
+                table.missing_ids |= frozenset(ids)
+                table.missing_codes |= frozenset(codes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+    def model_for_table(self, table):
+        """Модель справочника по таблице SQLAlchemy (None, если таблица не кэшируется)"""
+        return next((model for model in self.models if model.__table__ is table), None)
+
+
+class CachedRepository(Repository):
+    """Repository справочника: чтение из кэша, запись в БД и сразу в кэш"""
+
+    def __init__(self, model, cache: ReferenceCache):
+        super().__init__(model)
+        self.cache = cache
+
+    def list(self, session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List:
+        return self.cache.list(session, self.model, limit, after_id)
+
+    def get(self, session: Session, obj_id: int):
+        return self.cache.get(session, self.model, obj_id)
+
+    def create(self, session: Session, obj):
+        db_obj = super().create(session, obj)
+        self.cache.put(self.model, db_obj)
+        return db_obj
+
+    def bulk_create(self, session: Session, rows: List[dict]) -> List:
+        db_objs = super().bulk_create(session, rows)
+        for db_obj in db_objs:
+            self.cache.put(self.model, db_obj)
+        return db_objs
+
+    def update(self, session: Session, obj_id: int, data: dict):
+        db_obj = super().update(session, obj_id, data)
+        if db_obj is not None:
+            self.cache.put(self.model, db_obj)
+        return db_obj
+
+    def delete(self, session: Session, obj_id: int) -> bool:
+        deleted = super().delete(session, obj_id)
+        if deleted:
+            self.cache.remove(self.model, obj_id)
+        return deleted
+
+
+reference_cache = ReferenceCache(REFERENCE_MODELS, REFERENCE_CACHE_TTL)
@@ -0,0 +1,55 @@
+import os
+import time
+from http.cookies import SimpleCookie
+
+from starlette.requests import Request
+
+# ==================== РЕПЛИКА ДЛЯ ЧТЕНИЯ ====================
+# Если задан REPLICA_DATABASE_URL, GET-запросы читают с реплики, запись идет в основную БД.
+# После своей записи клиент REPLICA_PIN_SECONDS секунд читает с основной БД
+# (cookie), чтобы увидеть собственные изменения несмотря на отставание реплики.
+# Модуль не импортирует SQLAlchemy: main.py подключает middleware при импорте.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+PRIMARY_PIN_COOKIE = "db_primary_until"
+READ_METHODS = {"GET", "HEAD"}
+
+
+def use_replica(request: Request) -> bool:
+    """Читать ли запрос с реплики: GET/HEAD без недавней записи этого клиента"""
+    if not REPLICA_DATABASE_URL or request.method not in READ_METHODS:
+        return False
+    try:
+        pinned_until = float(request.cookies.get(PRIMARY_PIN_COOKIE, 0))
+    except ValueError:
+        pinned_until = 0
+    return pinned_until <= time.time()
+
+
+def primary_pin_cookie() -> bytes:
+    """Заголовок Set-Cookie, закрепляющий клиента за основной БД"""
+    cookie = SimpleCookie()
+    cookie[PRIMARY_PIN_COOKIE] = str(int(time.time()) + REPLICA_PIN_SECONDS)
+    cookie[PRIMARY_PIN_COOKIE].update({"max-age": REPLICA_PIN_SECONDS, "path": "/", "httponly": True, "samesite": "lax"})
+    return cookie.output(header="").strip().encode("latin-1")
+
+
+class PrimaryPinMiddleware:
+    """ASGI-middleware: запись закрепляет клиента за основной БД. Cookie ставится
+    на исходящий ответ, поэтому не теряется, когда эндпоинт возвращает свой
+    Response/StreamingResponse или ошибку"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not REPLICA_DATABASE_URL or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", primary_pin_cookie())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
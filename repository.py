@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+from sqlmodel import SQLModel, Session, select, insert, update, delete
+from typing import Generic, List, Optional, Type, TypeVar
+from datetime import datetime
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+
+def commit(session: Session) -> None:
+    """Зафиксировать запись; внутри atomic() - только отправить ее в БД (flush)"""
+    if session.info.get("atomic"):
+        session.flush()
+    else:
+        session.commit()
+
+
+@contextmanager
+def atomic(session: Session):
+    """Запись строки и зависящих от нее таблиц одной транзакцией:
+    commit() внутри блока откладывается до его конца, при ошибке все откатывается"""
+    if session.info.get("atomic"):
+        yield session
+        return
+    session.info["atomic"] = True
+    try:
+        yield session
+    except BaseException:
+        session.info.pop("atomic", None)
+        session.rollback()
+        raise
+    session.info.pop("atomic", None)
+    session.commit()
+
+
+def keyset_select(model, limit: Optional[int] = None, after_id: Optional[int] = None, fields: Optional[List[str]] = None):
+    """SELECT с keyset-пагинацией: стабильная сортировка по id, записи после after_id.
+
+    Если переданы fields, выбираются только эти колонки, а не вся модель.
+    """
+    if fields:
+        query = select(*[model.__table__.columns[name] for name in fields]).order_by(model.id)
+    else:
+        query = select(model).order_by(model.id)
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+class Repository(Generic[ModelT]):
+    """Общий CRUD для таблиц с первичным ключом id.
+
+    Каждая запись в БД выполняется за один запрос:
+    INSERT/UPDATE ... RETURNING и DELETE ... RETURNING id.
+    Поиск по ID идет через session.get (identity map сессии).
+    """
+
+    def __init__(self, model: Type[ModelT]):
+        self.model = model
+        self.columns = set(model.__table__.columns.keys())
+
+    def list(self, session: Session, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[ModelT]:
+        return session.exec(keyset_select(self.model, limit, after_id)).all()
+
+    def list_fields(self, session: Session, fields: List[str], limit: Optional[int] = None, after_id: Optional[int] = None) -> List[dict]:
+        """Список только с выбранными колонками (строки - словари)"""
+        return [dict(row) for row in session.execute(keyset_select(self.model, limit, after_id, fields)).mappings()]
+
+    def get(self, session: Session, obj_id: int) -> Optional[ModelT]:
+        return session.get(self.model, obj_id)
+
+    def get_for_update(self, session: Session, obj_id: int) -> Optional[ModelT]:
+        """Строка из БД (не из identity map) с блокировкой до конца транзакции"""
+        return session.get(self.model, obj_id, with_for_update=True, populate_existing=True)
+
+    def create(self, session: Session, obj: ModelT) -> ModelT:
+        values = obj.dict(exclude={"id"} if obj.id is None else None)
+        db_obj = session.scalars(insert(self.model).values(**values).returning(self.model)).one()
+        commit(session)
+        return db_obj
+
+    def bulk_create(self, session: Session, rows: List[dict]) -> List[ModelT]:
+        """Вставить много строк многострочными INSERT ... RETURNING в одной транзакции"""
+        if not rows:
+            return []
+        query = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        db_objs = session.scalars(query, rows).all()
+        commit(session)
+        return db_objs
+
+    def update(self, session: Session, obj_id: int, data: dict) -> Optional[ModelT]:
+        values = {key: value for key, value in data.items() if key in self.columns and key != "id"}
+        if not values:
+            return self.get(session, obj_id)
+        if "updated_at" in self.columns and "updated_at" not in values:
+            values["updated_at"] = datetime.now()
+
+        query = update(self.model).where(self.model.id == obj_id).values(**values).returning(self.model)
+        db_obj = session.scalars(query, execution_options={"populate_existing": True}).first()
+        commit(session)
+        return db_obj
+
+    def delete(self, session: Session, obj_id: int) -> bool:
+        query = delete(self.model).where(self.model.id == obj_id).returning(self.model.id)
+        deleted_id = session.scalars(query).first()
+        commit(session)
+        return deleted_id is not None
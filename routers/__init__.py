@@ -0,0 +1,97 @@
+import importlib
+import threading
+
+# ==================== ЛЕНИВОЕ ПОДКЛЮЧЕНИЕ РОУТЕРОВ ====================
+# Эндпоинты разложены по модулям routers/<группа>.py. Модуль импортируется и
+# подключается к приложению при первом запросе к его префиксу, поэтому импорт
+# main.py не тянет за собой модели, crud и построение 118 маршрутов.
+
+# Первый сегмент пути -> модули роутеров, которые его обслуживают
+ROUTER_MODULES = {
+    "": ["routers.service"],
+    "health": ["routers.service"],
+    "api": ["routers.service", "routers.statistics"],
+    "statistics": ["routers.statistics"],
+    "test": ["routers.statistics"],
+    "search": ["routers.search"],
+    "suggest": ["routers.suggest"],
+    "classification": ["routers.classification"],
+    "keywords": ["routers.keywords"],
+    "csv": ["routers.import_export"],
+    "export": ["routers.import_export"],
+    # Справочники
+    "edition-types": ["routers.edition_types"],
+    "languages": ["routers.languages"],
+    "countries": ["routers.countries"],
+    "cities": ["routers.cities"],
+    "publishers": ["routers.publishers"],
+    "reader-categories": ["routers.reader_categories"],
+    "book-statuses": ["routers.book_statuses"],
+    "loan-statuses": ["routers.loan_statuses"],
+    "operation-types": ["routers.operation_types"],
+    # Основные таблицы
+    "readers": ["routers.readers"],
+    "books": ["routers.books"],
+    "authors": ["routers.authors"],
+    "book-authors": ["routers.book_authors"],
+    "book-copies": ["routers.book_copies"],
+    "loans": ["routers.loans"],
+    "payments": ["routers.payments"],
+    "reservations": ["routers.reservations"],
+    "visits": ["routers.visits"],
+    "reference-requests": ["routers.reference_requests"],
+    "daily-statistics": ["routers.daily_statistics"],
+}
+
+# Документации нужны все маршруты сразу
+LOAD_ALL_PATHS = {"/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"}
+
+
+class LazyRouters:
+    """Подключает модули роутеров к приложению при первом обращении"""
+
+    def __init__(self, app, modules: dict = ROUTER_MODULES):
+        self.app = app
+        self.modules = modules
+        self.loaded = set()
+        self._lock = threading.Lock()
+
+    def load(self, module_name: str) -> None:
+        if module_name in self.loaded:
+            return
+        with self._lock:
+            if module_name in self.loaded:
+                return
+            router = importlib.import_module(module_name).router
+            from async_endpoints import ASYNC_ENDPOINTS, enable_async_endpoints
+            if ASYNC_ENDPOINTS:
+                enable_async_endpoints(router)
+            self.app.include_router(router)
+            self.app.openapi_schema = None  # Схема OpenAPI пересоберется с новыми маршрутами
+            self.loaded.add(module_name)
+
+    def load_for_path(self, path: str) -> None:
+        if path in LOAD_ALL_PATHS:
+            self.load_all()
+            return
+        segment = path.strip("/").split("/", 1)[0]
+        for module_name in self.modules.get(segment, []):
+            self.load(module_name)
+
+    def load_all(self) -> None:
+        for module_names in self.modules.values():
+            for module_name in module_names:
+                self.load(module_name)
+
+
+class LazyRouterMiddleware:
+    """ASGI-middleware: перед обработкой запроса подключает роутер его префикса"""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.routers.load_for_path(scope["path"])
+        await self.app(scope, receive, send)
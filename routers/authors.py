@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import Author, AuthorCreate
+from crud import (
+    MAX_BULK_ITEMS, bulk_create_authors, create_author, delete_author, get_all_authors,
+    get_author_books_with_counts, get_author_by_id, update_author
+)
+from routers.common import sync_endpoint
+
+router = APIRouter()
+
+# ==================== АВТОРЫ ====================
+
+@router.get("/authors", response_model=Page[Author])
+def get_all_authors_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить всех авторов"""
+    return make_page(get_all_authors(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/authors/{author_id}", response_model=Author)
+def get_author_by_id_endpoint(author_id: int, session: Session = Depends(get_session)):
+    """Получить автора по ID"""
+    author = get_author_by_id(session, author_id)
+    if not author:
+        raise HTTPException(status_code=404, detail="Автор не найден")
+    return author
+
+@router.post("/authors", response_model=Author)
+@sync_endpoint
+def create_author_endpoint(author: AuthorCreate, session: Session = Depends(get_session)):
+    """Создать нового автора"""
+    return create_author(session, author)
+
+@router.post("/authors/bulk")
+@sync_endpoint
+def bulk_create_authors_endpoint(items: list[dict], session: Session = Depends(get_session)):
+    """Массово создать авторов (ошибки возвращаются по каждой записи)"""
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Не более {MAX_BULK_ITEMS} записей за запрос")
+    return bulk_create_authors(session, items)
+
+@router.put("/authors/{author_id}", response_model=Author)
+@sync_endpoint
+def update_author_endpoint(author_id: int, author_data: dict, session: Session = Depends(get_session)):
+    """Обновить данные автора"""
+    author = update_author(session, author_id, author_data)
+    if not author:
+        raise HTTPException(status_code=404, detail="Автор не найден")
+    return author
+
+@router.delete("/authors/{author_id}")
+@sync_endpoint
+def delete_author_endpoint(author_id: int, session: Session = Depends(get_session)):
+    """Удалить автора"""
+    success = delete_author(session, author_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Автор не найден")
+    return {"message": f"Автор {author_id} удален"}
+
+@router.get("/authors/{author_id}/books-with-counts")
+def get_author_books_with_counts_endpoint(author_id: int, live: bool = False, session: Session = Depends(get_session)):
+    """Получить все книги автора с количеством экземпляров (live=true - пересчитать сейчас)"""
+    result = get_author_books_with_counts(session, author_id, live)
+    
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    
+    return result
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import BookAuthor
+from crud import (
+    MAX_BULK_ITEMS, bulk_create_book_authors, create_book_author, delete_book_author,
+    get_all_book_authors, get_book_author_by_id, update_book_author
+)
+from routers.common import sync_endpoint
+
+router = APIRouter()
+
+# ==================== АВТОРЫ КНИГ ====================
+
+@router.get("/book-authors", response_model=Page[BookAuthor])
+def get_all_book_authors_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все связи книга-автор"""
+    return make_page(get_all_book_authors(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/book-authors/{book_author_id}", response_model=BookAuthor)
+def get_book_author_by_id_endpoint(book_author_id: int, session: Session = Depends(get_session)):
+    """Получить связь книга-автор по ID"""
+    book_author = get_book_author_by_id(session, book_author_id)
+    if not book_author:
+        raise HTTPException(status_code=404, detail="Связь книга-автор не найдена")
+    return book_author
+
+@router.post("/book-authors", response_model=BookAuthor)
+@sync_endpoint
+def create_book_author_endpoint(book_author: BookAuthor, session: Session = Depends(get_session)):
+    """Создать новую связь книга-автор"""
+    return create_book_author(session, book_author)
+
+@router.post("/book-authors/bulk")
+@sync_endpoint
+def bulk_create_book_authors_endpoint(items: list[dict], session: Session = Depends(get_session)):
+    """Массово создать связи книга-автор (ошибки возвращаются по каждой записи)"""
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Не более {MAX_BULK_ITEMS} записей за запрос")
+    return bulk_create_book_authors(session, items)
+
+@router.put("/book-authors/{book_author_id}", response_model=BookAuthor)
+@sync_endpoint
+def update_book_author_endpoint(book_author_id: int, book_author_data: dict, session: Session = Depends(get_session)):
+    """Обновить связь книга-автор"""
+    book_author = update_book_author(session, book_author_id, book_author_data)
+    if not book_author:
+        raise HTTPException(status_code=404, detail="Связь книга-автор не найдена")
+    return book_author
+
+@router.delete("/book-authors/{book_author_id}")
+@sync_endpoint
+def delete_book_author_endpoint(book_author_id: int, session: Session = Depends(get_session)):
+    """Удалить связь книга-автор"""
+    success = delete_book_author(session, book_author_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Связь книга-автор не найдена")
+    return {"message": f"Связь книга-автор {book_author_id} удалена"}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import BookCopy, BookCopyCreate
+from crud import (
+    MAX_BULK_ITEMS, bulk_create_book_copies, create_book_copy, delete_book_copy,
+    get_all_book_copies, get_book_copy_by_barcode, get_book_copy_by_id, update_book_copy
+)
+
+router = APIRouter()
+
+# ==================== ЭКЗЕМПЛЯРЫ КНИГ ====================
+
+@router.get("/book-copies", response_model=Page[BookCopy])
+def get_all_book_copies_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все экземпляры книг"""
+    return make_page(get_all_book_copies(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/book-copies/{copy_id}", response_model=BookCopy)
+def get_book_copy_by_id_endpoint(copy_id: int, session: Session = Depends(get_session)):
+    """Получить экземпляр по ID"""
+    book_copy = get_book_copy_by_id(session, copy_id)
+    if not book_copy:
+        raise HTTPException(status_code=404, detail="Экземпляр не найден")
+    return book_copy
+
+@router.get("/book-copies/by-barcode/{code}", response_model=BookCopy)
+def get_book_copy_by_barcode_endpoint(code: str, session: Session = Depends(get_session)):
+    """Найти экземпляр по штрих-коду (пробелы и дефисы не учитываются)"""
+    book_copy = get_book_copy_by_barcode(session, code)
+    if not book_copy:
+        raise HTTPException(status_code=404, detail="Экземпляр не найден")
+    return book_copy
+
+@router.post("/book-copies", response_model=BookCopy)
+def create_book_copy_endpoint(book_copy: BookCopyCreate, session: Session = Depends(get_session)):
+    """Создать новый экземпляр книги"""
+    return create_book_copy(session, book_copy)
+
+@router.post("/book-copies/bulk")
+def bulk_create_book_copies_endpoint(items: list[dict], session: Session = Depends(get_session)):
+    """Массово создать экземпляры книг (ошибки возвращаются по каждой записи)"""
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Не более {MAX_BULK_ITEMS} записей за запрос")
+    return bulk_create_book_copies(session, items)
+
+@router.put("/book-copies/{copy_id}", response_model=BookCopy)
+def update_book_copy_endpoint(copy_id: int, book_copy_data: dict, session: Session = Depends(get_session)):
+    """Обновить данные экземпляра"""
+    book_copy = update_book_copy(session, copy_id, book_copy_data)
+    if not book_copy:
+        raise HTTPException(status_code=404, detail="Экземпляр не найден")
+    return book_copy
+
+@router.delete("/book-copies/{copy_id}")
+def delete_book_copy_endpoint(copy_id: int, session: Session = Depends(get_session)):
+    """Удалить экземпляр"""
+    success = delete_book_copy(session, copy_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Экземпляр не найден")
+    return {"message": f"Экземпляр {copy_id} удален"}
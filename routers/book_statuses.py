@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import BookStatus
+from crud import (
+    create_book_status, delete_book_status, get_all_book_statuses, get_book_status_by_id,
+    update_book_status
+)
+
+router = APIRouter()
+
+# ==================== СТАТУСЫ КНИГ ====================
+
+@router.get("/book-statuses", response_model=Page[BookStatus])
+def get_all_book_statuses_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все статусы книг"""
+    etag = make_etag(reference_cache.version(session, BookStatus), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_book_statuses(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/book-statuses/{status_id}", response_model=BookStatus)
+def get_book_status_by_id_endpoint(status_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить статус книги по ID"""
+    book_status = get_book_status_by_id(session, status_id)
+    if not book_status:
+        raise HTTPException(status_code=404, detail="Статус книги не найден")
+    etag = make_etag(reference_cache.version(session, BookStatus), status_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return book_status
+
+@router.post("/book-statuses", response_model=BookStatus)
+def create_book_status_endpoint(book_status: BookStatus, session: Session = Depends(get_session)):
+    """Создать новый статус книги"""
+    return create_book_status(session, book_status)
+
+@router.put("/book-statuses/{status_id}", response_model=BookStatus)
+def update_book_status_endpoint(status_id: int, book_status_data: dict, session: Session = Depends(get_session)):
+    """Обновить статус книги"""
+    book_status = update_book_status(session, status_id, book_status_data)
+    if not book_status:
+        raise HTTPException(status_code=404, detail="Статус книги не найден")
+    return book_status
+
+@router.delete("/book-statuses/{status_id}")
+def delete_book_status_endpoint(status_id: int, session: Session = Depends(get_session)):
+    """Удалить статус книги"""
+    success = delete_book_status(session, status_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Статус книги не найден")
+    return {"message": f"Статус книги {status_id} удален"}
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from typing import Optional
+from database import get_session
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, BOOK_CACHE_CONTROL
+from models import Book, BookCreate, BookUpdate
+from identifiers import to_isbn13
+from crud import (
+    BOOK_LIST_FIELDS, MAX_BULK_ITEMS, bulk_create_books, create_book, delete_book,
+    get_all_books, get_book_by_isbn, get_book_with_version, update_book
+)
+from routers.common import fields_or_400, sync_endpoint
+
+router = APIRouter()
+
+# ==================== КНИГИ ====================
+
+@router.get("/books", response_model=Page[dict])
+def get_all_books_endpoint(fields: Optional[str] = None, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все книги (по умолчанию без аннотации, оглавления и ключевых слов; fields=a,b,c или fields=*)"""
+    columns = fields_or_400(Book, fields, BOOK_LIST_FIELDS)
+    return make_page(get_all_books(session, page.fetch_limit, page.after_id, columns), page)
+
+@router.get("/books/{book_id}", response_model=Book)
+def get_book_by_id_endpoint(book_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить книгу по ID"""
+    found = get_book_with_version(session, book_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Книга не найдена")
+    book, version = found
+    not_modified = conditional(request, response, make_etag("book", book_id, version), BOOK_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return book
+
+@router.get("/books/by-isbn/{isbn}", response_model=Book)
+def get_book_by_isbn_endpoint(isbn: str, session: Session = Depends(get_session)):
+    """Найти книгу по ISBN (ISBN-10 или ISBN-13, с дефисами или без)"""
+    try:
+        isbn13 = to_isbn13(isbn)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    book = get_book_by_isbn(session, isbn13)
+    if not book:
+        raise HTTPException(status_code=404, detail="Книга не найдена")
+    return book
+
+@router.post("/books", response_model=Book)
+@sync_endpoint
+def create_book_endpoint(book: BookCreate, session: Session = Depends(get_session)):
+    """Создать новую книгу"""
+    return create_book(session, book)
+
+@router.post("/books/bulk")
+@sync_endpoint
+def bulk_create_books_endpoint(items: list[dict], session: Session = Depends(get_session)):
+    """Массово создать книги (ошибки возвращаются по каждой записи)"""
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Не более {MAX_BULK_ITEMS} записей за запрос")
+    return bulk_create_books(session, items)
+
+@router.put("/books/{book_id}", response_model=Book)
+@sync_endpoint
+def update_book_endpoint(book_id: int, book_data: BookUpdate, session: Session = Depends(get_session)):
+    """Обновить данные книги"""
+    book = update_book(session, book_id, book_data)
+    if not book:
+        raise HTTPException(status_code=404, detail="Книга не найдена")
+    return book
+
+@router.delete("/books/{book_id}")
+@sync_endpoint
+def delete_book_endpoint(book_id: int, session: Session = Depends(get_session)):
+    """Удалить книгу"""
+    success = delete_book(session, book_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Книга не найдена")
+    return {"message": f"Книга {book_id} удалена"}
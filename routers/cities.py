@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import City
+from crud import create_city, delete_city, get_all_cities, get_city_by_id, update_city
+
+router = APIRouter()
+
+# ==================== ГОРОДА ====================
+
+@router.get("/cities", response_model=Page[City])
+def get_all_cities_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все города"""
+    etag = make_etag(reference_cache.version(session, City), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_cities(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/cities/{city_id}", response_model=City)
+def get_city_by_id_endpoint(city_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить город по ID"""
+    city = get_city_by_id(session, city_id)
+    if not city:
+        raise HTTPException(status_code=404, detail="Город не найден")
+    etag = make_etag(reference_cache.version(session, City), city_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return city
+
+@router.post("/cities", response_model=City)
+def create_city_endpoint(city: City, session: Session = Depends(get_session)):
+    """Создать новый город"""
+    return create_city(session, city)
+
+@router.put("/cities/{city_id}", response_model=City)
+def update_city_endpoint(city_id: int, city_data: dict, session: Session = Depends(get_session)):
+    """Обновить город"""
+    city = update_city(session, city_id, city_data)
+    if not city:
+        raise HTTPException(status_code=404, detail="Город не найден")
+    return city
+
+@router.delete("/cities/{city_id}")
+def delete_city_endpoint(city_id: int, session: Session = Depends(get_session)):
+    """Удалить город"""
+    success = delete_city(session, city_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Город не найден")
+    return {"message": f"Город {city_id} удален"}
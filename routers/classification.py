@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import Literal, Optional
+from database import get_session
+from models import Book
+from pagination import Page, PageParams, make_page
+from classification import normalize_code
+from crud import BOOK_LIST_FIELDS, get_classification_books, get_classification_children, get_classification_node
+from routers.common import fields_or_400
+
+router = APIRouter()
+
+Scheme = Literal["udk", "bbk"]
+
+# ==================== КЛАССИФИКАЦИЯ (УДК, ББК) ====================
+
+def _code_or_400(scheme: str, code: str) -> str:
+    normalized = normalize_code(scheme, code)
+    if not normalized:
+        raise HTTPException(status_code=400, detail=f"Некорректный индекс: {code}")
+    return normalized
+
+@router.get("/classification/{scheme}")
+def get_classification_roots_endpoint(scheme: Scheme, session: Session = Depends(get_session)):
+    """Классы верхнего уровня УДК или ББК с числом книг и экземпляров"""
+    return {"scheme": scheme, "children": get_classification_children(session, scheme)}
+
+@router.get("/classification/{scheme}/{code}")
+def get_classification_node_endpoint(scheme: Scheme, code: str, session: Session = Depends(get_session)):
+    """Узел классификации: путь от верхнего уровня и подклассы с числом книг и экземпляров"""
+    found = get_classification_node(session, scheme, _code_or_400(scheme, code))
+    if not found:
+        raise HTTPException(status_code=404, detail="В каталоге нет книг с таким индексом")
+    return {"scheme": scheme, **found}
+
+@router.get("/classification/{scheme}/{code}/books", response_model=Page[dict])
+def get_classification_books_endpoint(
+    scheme: Scheme,
+    code: str,
+    fields: Optional[str] = None,
+    page: PageParams = Depends(),
+    session: Session = Depends(get_session)
+):
+    """Книги узла и всех его подклассов ("004.4" - и 004.42, 004.43, ...)"""
+    columns = fields_or_400(Book, fields, BOOK_LIST_FIELDS)
+    books = get_classification_books(session, scheme, _code_or_400(scheme, code), page.fetch_limit, page.after_id, columns)
+    return make_page(books, page)
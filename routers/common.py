@@ -0,0 +1,19 @@
+from typing import Optional
+from fastapi import HTTPException
+from crud import resolve_fields
+
+
+def fields_or_400(model, fields: Optional[str], default: list) -> list:
+    """Разобрать параметр fields, неизвестные поля - ошибка 400"""
+    try:
+        return resolve_fields(model, fields, default)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def sync_endpoint(endpoint):
+    """Эндпоинт, который кроме запросов к БД обновляет встроенные индексы поиска и подсказок
+    или кэш фасетов: в асинхронном режиме (ASYNC_ENDPOINTS=1) он остается синхронным
+    и выполняется в пуле потоков, не занимая цикл событий"""
+    endpoint.sync_only = True
+    return endpoint
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import Country
+from crud import (
+    create_country, delete_country, get_all_countries, get_country_by_id, update_country
+)
+
+router = APIRouter()
+
+# ==================== СТРАНЫ ====================
+
+@router.get("/countries", response_model=Page[Country])
+def get_all_countries_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все страны"""
+    etag = make_etag(reference_cache.version(session, Country), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_countries(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/countries/{country_id}", response_model=Country)
+def get_country_by_id_endpoint(country_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить страну по ID"""
+    country = get_country_by_id(session, country_id)
+    if not country:
+        raise HTTPException(status_code=404, detail="Страна не найдена")
+    etag = make_etag(reference_cache.version(session, Country), country_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return country
+
+@router.post("/countries", response_model=Country)
+def create_country_endpoint(country: Country, session: Session = Depends(get_session)):
+    """Создать новую страну"""
+    return create_country(session, country)
+
+@router.put("/countries/{country_id}", response_model=Country)
+def update_country_endpoint(country_id: int, country_data: dict, session: Session = Depends(get_session)):
+    """Обновить страну"""
+    country = update_country(session, country_id, country_data)
+    if not country:
+        raise HTTPException(status_code=404, detail="Страна не найдена")
+    return country
+
+@router.delete("/countries/{country_id}")
+def delete_country_endpoint(country_id: int, session: Session = Depends(get_session)):
+    """Удалить страну"""
+    success = delete_country(session, country_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Страна не найдена")
+    return {"message": f"Страна {country_id} удалена"}
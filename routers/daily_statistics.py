@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import DailyStatistic
+from crud import (
+    create_daily_statistic, delete_daily_statistic, get_all_daily_statistics,
+    get_daily_statistic_by_id, update_daily_statistic
+)
+
+router = APIRouter()
+
+# ==================== ЕЖЕДНЕВНАЯ СТАТИСТИКА ====================
+
+@router.get("/daily-statistics", response_model=Page[DailyStatistic])
+def get_all_daily_statistics_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить всю ежедневную статистику"""
+    return make_page(get_all_daily_statistics(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/daily-statistics/{statistic_id}", response_model=DailyStatistic)
+def get_daily_statistic_by_id_endpoint(statistic_id: int, session: Session = Depends(get_session)):
+    """Получить ежедневную статистику по ID"""
+    daily_statistic = get_daily_statistic_by_id(session, statistic_id)
+    if not daily_statistic:
+        raise HTTPException(status_code=404, detail="Ежедневная статистика не найдена")
+    return daily_statistic
+
+@router.post("/daily-statistics", response_model=DailyStatistic)
+def create_daily_statistic_endpoint(daily_statistic: DailyStatistic, session: Session = Depends(get_session)):
+    """Создать новую ежедневную статистику"""
+    return create_daily_statistic(session, daily_statistic)
+
+@router.put("/daily-statistics/{statistic_id}", response_model=DailyStatistic)
+def update_daily_statistic_endpoint(statistic_id: int, daily_statistic_data: dict, session: Session = Depends(get_session)):
+    """Обновить ежедневную статистику"""
+    daily_statistic = update_daily_statistic(session, statistic_id, daily_statistic_data)
+    if not daily_statistic:
+        raise HTTPException(status_code=404, detail="Ежедневная статистика не найдена")
+    return daily_statistic
+
+@router.delete("/daily-statistics/{statistic_id}")
+def delete_daily_statistic_endpoint(statistic_id: int, session: Session = Depends(get_session)):
+    """Удалить ежедневную статистику"""
+    success = delete_daily_statistic(session, statistic_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Ежедневная статистика не найдена")
+    return {"message": f"Ежедневная статистика {statistic_id} удалена"}
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import EditionType
+from crud import (
+    create_edition_type, delete_edition_type, get_all_edition_types, get_edition_type_by_id,
+    update_edition_type
+)
+
+router = APIRouter()
+
+# ==================== ТИПЫ ИЗДАНИЙ ====================
+
+@router.get("/edition-types", response_model=Page[EditionType])
+def get_all_edition_types_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все типы изданий"""
+    etag = make_etag(reference_cache.version(session, EditionType), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_edition_types(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/edition-types/{type_id}", response_model=EditionType)
+def get_edition_type_by_id_endpoint(type_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить тип издания по ID"""
+    edition_type = get_edition_type_by_id(session, type_id)
+    if not edition_type:
+        raise HTTPException(status_code=404, detail="Тип издания не найден")
+    etag = make_etag(reference_cache.version(session, EditionType), type_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return edition_type
+
+@router.post("/edition-types", response_model=EditionType)
+def create_edition_type_endpoint(edition_type: EditionType, session: Session = Depends(get_session)):
+    """Создать новый тип издания"""
+    return create_edition_type(session, edition_type)
+
+@router.put("/edition-types/{type_id}", response_model=EditionType)
+def update_edition_type_endpoint(type_id: int, edition_type_data: dict, session: Session = Depends(get_session)):
+    """Обновить тип издания"""
+    edition_type = update_edition_type(session, type_id, edition_type_data)
+    if not edition_type:
+        raise HTTPException(status_code=404, detail="Тип издания не найден")
+    return edition_type
+
+@router.delete("/edition-types/{type_id}")
+def delete_edition_type_endpoint(type_id: int, session: Session = Depends(get_session)):
+    """Удалить тип издания"""
+    success = delete_edition_type(session, type_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Тип издания не найден")
+    return {"message": f"Тип издания {type_id} удален"}
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+import io
+import tempfile
+
+router = APIRouter()
+
+# ==================== ИМПОРТ/ЭКСПОРТ ====================
+
+CSV_SPOOL_SIZE = 8 * 1024 * 1024  # Больше этого тело запроса уходит во временный файл
+
+@router.get("/csv/{table}")
+def export_csv_endpoint(table: str):
+    """Выгрузить таблицу в CSV (потоково, через COPY TO STDOUT)"""
+    from transfer import TRANSFER_TABLES, iter_export_csv
+    if table not in TRANSFER_TABLES:
+        raise HTTPException(status_code=404, detail=f"Таблица {table} не поддерживает импорт/экспорт")
+    return StreamingResponse(
+        iter_export_csv(table),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{table}.csv"'}
+    )
+
+@router.post("/csv/{table}")
+async def import_csv_endpoint(table: str, request: Request):
+    """Загрузить CSV в таблицу (COPY FROM STDIN через промежуточную таблицу и слияние)"""
+    from transfer import TRANSFER_TABLES, import_csv
+    if table not in TRANSFER_TABLES:
+        raise HTTPException(status_code=404, detail=f"Таблица {table} не поддерживает импорт/экспорт")
+
+    with tempfile.SpooledTemporaryFile(max_size=CSV_SPOOL_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        source = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            return await run_in_threadpool(import_csv, table, source)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/export/{table}")
+def export_ndjson_endpoint(table: str, since: Optional[datetime] = None):
+    """Потоковая выгрузка таблицы в NDJSON (одна JSON-строка на запись)"""
+    from transfer import NDJSON_TABLES, iter_export_ndjson
+    if table not in NDJSON_TABLES:
+        raise HTTPException(status_code=404, detail=f"Таблица {table} не поддерживает выгрузку")
+    return StreamingResponse(iter_export_ndjson(table, since), media_type="application/x-ndjson")
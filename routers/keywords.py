@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import Optional
+from database import get_session
+from models import Book
+from pagination import Page, PageParams, make_page
+from keywords import KEYWORD_CLOUD_LIMIT
+from crud import BOOK_LIST_FIELDS, get_keyword, get_keyword_books, get_keyword_cloud
+from routers.common import fields_or_400
+
+router = APIRouter()
+
+# ==================== КЛЮЧЕВЫЕ СЛОВА ====================
+
+@router.get("/keywords")
+def get_keyword_cloud_endpoint(
+    limit: int = Query(KEYWORD_CLOUD_LIMIT, ge=1, le=1000),
+    min_books: int = Query(1, ge=1),
+    session: Session = Depends(get_session)
+):
+    """Облако ключевых слов: самые частые слова с числом книг"""
+    return {"keywords": get_keyword_cloud(session, limit, min_books)}
+
+@router.get("/keywords/{keyword}/books", response_model=Page[dict])
+def get_keyword_books_endpoint(
+    keyword: str,
+    fields: Optional[str] = None,
+    page: PageParams = Depends(),
+    session: Session = Depends(get_session)
+):
+    """Книги с ключевым словом (регистр и ё/е не учитываются)"""
+    columns = fields_or_400(Book, fields, BOOK_LIST_FIELDS)
+    found = get_keyword(session, keyword)
+    if not found:
+        raise HTTPException(status_code=404, detail="Ключевое слово не найдено")
+    return make_page(get_keyword_books(session, found.id, page.fetch_limit, page.after_id, columns), page)
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import Language
+from crud import (
+    create_language, delete_language, get_all_languages, get_language_by_id, update_language
+)
+
+router = APIRouter()
+
+# ==================== ЯЗЫКИ ====================
+
+@router.get("/languages", response_model=Page[Language])
+def get_all_languages_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все языки"""
+    etag = make_etag(reference_cache.version(session, Language), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_languages(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/languages/{language_id}", response_model=Language)
+def get_language_by_id_endpoint(language_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить язык по ID"""
+    language = get_language_by_id(session, language_id)
+    if not language:
+        raise HTTPException(status_code=404, detail="Язык не найден")
+    etag = make_etag(reference_cache.version(session, Language), language_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return language
+
+@router.post("/languages", response_model=Language)
+def create_language_endpoint(language: Language, session: Session = Depends(get_session)):
+    """Создать новый язык"""
+    return create_language(session, language)
+
+@router.put("/languages/{language_id}", response_model=Language)
+def update_language_endpoint(language_id: int, language_data: dict, session: Session = Depends(get_session)):
+    """Обновить язык"""
+    language = update_language(session, language_id, language_data)
+    if not language:
+        raise HTTPException(status_code=404, detail="Язык не найден")
+    return language
+
+@router.delete("/languages/{language_id}")
+def delete_language_endpoint(language_id: int, session: Session = Depends(get_session)):
+    """Удалить язык"""
+    success = delete_language(session, language_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Язык не найден")
+    return {"message": f"Язык {language_id} удален"}
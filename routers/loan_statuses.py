@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import LoanStatus
+from crud import (
+    create_loan_status, delete_loan_status, get_all_loan_statuses, get_loan_status_by_id,
+    update_loan_status
+)
+
+router = APIRouter()
+
+# ==================== СТАТУСЫ ВЫДАЧ ====================
+
+@router.get("/loan-statuses", response_model=Page[LoanStatus])
+def get_all_loan_statuses_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все статусы выдач"""
+    etag = make_etag(reference_cache.version(session, LoanStatus), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_loan_statuses(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/loan-statuses/{status_id}", response_model=LoanStatus)
+def get_loan_status_by_id_endpoint(status_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить статус выдачи по ID"""
+    loan_status = get_loan_status_by_id(session, status_id)
+    if not loan_status:
+        raise HTTPException(status_code=404, detail="Статус выдачи не найден")
+    etag = make_etag(reference_cache.version(session, LoanStatus), status_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return loan_status
+
+@router.post("/loan-statuses", response_model=LoanStatus)
+def create_loan_status_endpoint(loan_status: LoanStatus, session: Session = Depends(get_session)):
+    """Создать новый статус выдачи"""
+    return create_loan_status(session, loan_status)
+
+@router.put("/loan-statuses/{status_id}", response_model=LoanStatus)
+def update_loan_status_endpoint(status_id: int, loan_status_data: dict, session: Session = Depends(get_session)):
+    """Обновить статус выдачи"""
+    loan_status = update_loan_status(session, status_id, loan_status_data)
+    if not loan_status:
+        raise HTTPException(status_code=404, detail="Статус выдачи не найден")
+    return loan_status
+
+@router.delete("/loan-statuses/{status_id}")
+def delete_loan_status_endpoint(status_id: int, session: Session = Depends(get_session)):
+    """Удалить статус выдачи"""
+    success = delete_loan_status(session, status_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Статус выдачи не найден")
+    return {"message": f"Статус выдачи {status_id} удален"}
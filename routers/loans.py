@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import Loan, LoanCreate, LoanUpdate
+from crud import create_loan, delete_loan, get_all_loans, get_loan_by_id, update_loan
+from routers.common import sync_endpoint
+
+router = APIRouter()
+
+# ==================== ВЫДАЧИ ====================
+
+@router.get("/loans", response_model=Page[Loan])
+def get_all_loans_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все выдачи"""
+    return make_page(get_all_loans(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/loans/{loan_id}", response_model=Loan)
+def get_loan_by_id_endpoint(loan_id: int, session: Session = Depends(get_session)):
+    """Получить выдачу по ID"""
+    loan = get_loan_by_id(session, loan_id)
+    if not loan:
+        raise HTTPException(status_code=404, detail="Выдача не найдена")
+    return loan
+
+@router.post("/loans", response_model=Loan)
+@sync_endpoint
+def create_loan_endpoint(loan: LoanCreate, session: Session = Depends(get_session)):
+    """Создать новую выдачу"""
+    return create_loan(session, loan)
+
+@router.put("/loans/{loan_id}", response_model=Loan)
+def update_loan_endpoint(loan_id: int, loan_data: LoanUpdate, session: Session = Depends(get_session)):
+    """Обновить данные выдачи"""
+    loan = update_loan(session, loan_id, loan_data)
+    if not loan:
+        raise HTTPException(status_code=404, detail="Выдача не найдена")
+    return loan
+
+@router.delete("/loans/{loan_id}")
+@sync_endpoint
+def delete_loan_endpoint(loan_id: int, session: Session = Depends(get_session)):
+    """Удалить выдачу"""
+    success = delete_loan(session, loan_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Выдача не найдена")
+    return {"message": f"Выдача {loan_id} удалена"}
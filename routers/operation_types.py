@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import OperationType
+from crud import (
+    create_operation_type, delete_operation_type, get_all_operation_types,
+    get_operation_type_by_id, update_operation_type
+)
+
+router = APIRouter()
+
+# ==================== ТИПЫ ОПЕРАЦИЙ ====================
+
+@router.get("/operation-types", response_model=Page[OperationType])
+def get_all_operation_types_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все типы операций"""
+    etag = make_etag(reference_cache.version(session, OperationType), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_operation_types(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/operation-types/{type_id}", response_model=OperationType)
+def get_operation_type_by_id_endpoint(type_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить тип операции по ID"""
+    operation_type = get_operation_type_by_id(session, type_id)
+    if not operation_type:
+        raise HTTPException(status_code=404, detail="Тип операции не найден")
+    etag = make_etag(reference_cache.version(session, OperationType), type_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return operation_type
+
+@router.post("/operation-types", response_model=OperationType)
+def create_operation_type_endpoint(operation_type: OperationType, session: Session = Depends(get_session)):
+    """Создать новый тип операции"""
+    return create_operation_type(session, operation_type)
+
+@router.put("/operation-types/{type_id}", response_model=OperationType)
+def update_operation_type_endpoint(type_id: int, operation_type_data: dict, session: Session = Depends(get_session)):
+    """Обновить тип операции"""
+    operation_type = update_operation_type(session, type_id, operation_type_data)
+    if not operation_type:
+        raise HTTPException(status_code=404, detail="Тип операции не найден")
+    return operation_type
+
+@router.delete("/operation-types/{type_id}")
+def delete_operation_type_endpoint(type_id: int, session: Session = Depends(get_session)):
+    """Удалить тип операции"""
+    success = delete_operation_type(session, type_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Тип операции не найден")
+    return {"message": f"Тип операции {type_id} удален"}
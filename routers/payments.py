@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import Payment, PaymentCreate
+from crud import create_payment, delete_payment, get_all_payments, get_payment_by_id, update_payment
+
+router = APIRouter()
+
+# ==================== ПЛАТЕЖИ ====================
+
+@router.get("/payments", response_model=Page[Payment])
+def get_all_payments_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все платежи"""
+    return make_page(get_all_payments(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/payments/{payment_id}", response_model=Payment)
+def get_payment_by_id_endpoint(payment_id: int, session: Session = Depends(get_session)):
+    """Получить платеж по ID"""
+    payment = get_payment_by_id(session, payment_id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Платеж не найден")
+    return payment
+
+@router.post("/payments", response_model=Payment)
+def create_payment_endpoint(payment: PaymentCreate, session: Session = Depends(get_session)):
+    """Создать новый платеж"""
+    return create_payment(session, payment)
+
+@router.put("/payments/{payment_id}", response_model=Payment)
+def update_payment_endpoint(payment_id: int, payment_data: dict, session: Session = Depends(get_session)):
+    """Обновить платеж"""
+    payment = update_payment(session, payment_id, payment_data)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Платеж не найден")
+    return payment
+
+@router.delete("/payments/{payment_id}")
+def delete_payment_endpoint(payment_id: int, session: Session = Depends(get_session)):
+    """Удалить платеж"""
+    success = delete_payment(session, payment_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Платеж не найден")
+    return {"message": f"Платеж {payment_id} удален"}
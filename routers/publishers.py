@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import Publisher
+from crud import (
+    create_publisher, delete_publisher, get_all_publishers, get_publisher_by_id,
+    update_publisher
+)
+from routers.common import sync_endpoint
+
+router = APIRouter()
+
+# ==================== ИЗДАТЕЛЬСТВА ====================
+
+@router.get("/publishers", response_model=Page[Publisher])
+def get_all_publishers_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все издательства"""
+    etag = make_etag(reference_cache.version(session, Publisher), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_publishers(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/publishers/{publisher_id}", response_model=Publisher)
+def get_publisher_by_id_endpoint(publisher_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить издательство по ID"""
+    publisher = get_publisher_by_id(session, publisher_id)
+    if not publisher:
+        raise HTTPException(status_code=404, detail="Издательство не найдено")
+    etag = make_etag(reference_cache.version(session, Publisher), publisher_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return publisher
+
+@router.post("/publishers", response_model=Publisher)
+@sync_endpoint
+def create_publisher_endpoint(publisher: Publisher, session: Session = Depends(get_session)):
+    """Создать новое издательство"""
+    return create_publisher(session, publisher)
+
+@router.put("/publishers/{publisher_id}", response_model=Publisher)
+@sync_endpoint
+def update_publisher_endpoint(publisher_id: int, publisher_data: dict, session: Session = Depends(get_session)):
+    """Обновить издательство"""
+    publisher = update_publisher(session, publisher_id, publisher_data)
+    if not publisher:
+        raise HTTPException(status_code=404, detail="Издательство не найдено")
+    return publisher
+
+@router.delete("/publishers/{publisher_id}")
+@sync_endpoint
+def delete_publisher_endpoint(publisher_id: int, session: Session = Depends(get_session)):
+    """Удалить издательство"""
+    success = delete_publisher(session, publisher_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Издательство не найдено")
+    return {"message": f"Издательство {publisher_id} удалено"}
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from database import get_session
+from reference_cache import reference_cache
+from pagination import Page, PageParams, make_page
+from http_cache import make_etag, conditional, REFERENCE_CACHE_CONTROL
+from models import ReaderCategory
+from crud import (
+    create_reader_category, delete_reader_category, get_all_reader_categories,
+    get_reader_category_by_id, update_reader_category
+)
+
+router = APIRouter()
+
+# ==================== КАТЕГОРИИ ЧИТАТЕЛЕЙ ====================
+
+@router.get("/reader-categories", response_model=Page[ReaderCategory])
+def get_all_reader_categories_endpoint(request: Request, response: Response, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все категории читателей"""
+    etag = make_etag(reference_cache.version(session, ReaderCategory), page.limit, page.after_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return make_page(get_all_reader_categories(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/reader-categories/{category_id}", response_model=ReaderCategory)
+def get_reader_category_by_id_endpoint(category_id: int, request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить категорию читателя по ID"""
+    reader_category = get_reader_category_by_id(session, category_id)
+    if not reader_category:
+        raise HTTPException(status_code=404, detail="Категория читателя не найдена")
+    etag = make_etag(reference_cache.version(session, ReaderCategory), category_id)
+    not_modified = conditional(request, response, etag, REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return reader_category
+
+@router.post("/reader-categories", response_model=ReaderCategory)
+def create_reader_category_endpoint(reader_category: ReaderCategory, session: Session = Depends(get_session)):
+    """Создать новую категорию читателя"""
+    return create_reader_category(session, reader_category)
+
+@router.put("/reader-categories/{category_id}", response_model=ReaderCategory)
+def update_reader_category_endpoint(category_id: int, reader_category_data: dict, session: Session = Depends(get_session)):
+    """Обновить категорию читателя"""
+    reader_category = update_reader_category(session, category_id, reader_category_data)
+    if not reader_category:
+        raise HTTPException(status_code=404, detail="Категория читателя не найдена")
+    return reader_category
+
+@router.delete("/reader-categories/{category_id}")
+def delete_reader_category_endpoint(category_id: int, session: Session = Depends(get_session)):
+    """Удалить категорию читателя"""
+    success = delete_reader_category(session, category_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Категория читателя не найдена")
+    return {"message": f"Категория читателя {category_id} удалена"}
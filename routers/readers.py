@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import Optional
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import Reader, ReaderCreate, ReaderUpdate
+from crud import (
+    READER_LIST_FIELDS, create_reader, delete_reader, get_all_readers, get_reader_by_id,
+    update_reader
+)
+from routers.common import fields_or_400
+
+router = APIRouter()
+
+# ==================== ЧИТАТЕЛИ ====================
+
+@router.get("/readers", response_model=Page[dict])
+def get_all_readers_endpoint(fields: Optional[str] = None, page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить всех читателей (по умолчанию краткие поля; fields=a,b,c или fields=*)"""
+    columns = fields_or_400(Reader, fields, READER_LIST_FIELDS)
+    return make_page(get_all_readers(session, page.fetch_limit, page.after_id, columns), page)
+
+@router.get("/readers/{reader_id}", response_model=Reader)
+def get_reader_by_id_endpoint(reader_id: int, session: Session = Depends(get_session)):
+    """Получить читателя по ID"""
+    reader = get_reader_by_id(session, reader_id)
+    if not reader:
+        raise HTTPException(status_code=404, detail="Читатель не найден")
+    return reader
+
+@router.post("/readers", response_model=Reader)
+def create_reader_endpoint(reader: ReaderCreate, session: Session = Depends(get_session)):
+    """Создать нового читателя"""
+    return create_reader(session, reader)
+
+@router.put("/readers/{reader_id}", response_model=Reader)
+def update_reader_endpoint(reader_id: int, reader_data: ReaderUpdate, session: Session = Depends(get_session)):
+    """Обновить данные читателя"""
+    reader = update_reader(session, reader_id, reader_data)
+    if not reader:
+        raise HTTPException(status_code=404, detail="Читатель не найден")
+    return reader
+
+@router.delete("/readers/{reader_id}")
+def delete_reader_endpoint(reader_id: int, session: Session = Depends(get_session)):
+    """Удалить читателя"""
+    success = delete_reader(session, reader_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Читатель не найден")
+    return {"message": f"Читатель {reader_id} удален"}
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import ReferenceRequest
+from crud import (
+    create_reference_request, delete_reference_request, get_all_reference_requests,
+    get_reference_request_by_id, update_reference_request
+)
+
+router = APIRouter()
+
+# ==================== СПРАВОЧНЫЕ ЗАПРОСЫ ====================
+
+@router.get("/reference-requests", response_model=Page[ReferenceRequest])
+def get_all_reference_requests_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все справочные запросы"""
+    return make_page(get_all_reference_requests(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/reference-requests/{request_id}", response_model=ReferenceRequest)
+def get_reference_request_by_id_endpoint(request_id: int, session: Session = Depends(get_session)):
+    """Получить справочный запрос по ID"""
+    reference_request = get_reference_request_by_id(session, request_id)
+    if not reference_request:
+        raise HTTPException(status_code=404, detail="Справочный запрос не найден")
+    return reference_request
+
+@router.post("/reference-requests", response_model=ReferenceRequest)
+def create_reference_request_endpoint(reference_request: ReferenceRequest, session: Session = Depends(get_session)):
+    """Создать новый справочный запрос"""
+    return create_reference_request(session, reference_request)
+
+@router.put("/reference-requests/{request_id}", response_model=ReferenceRequest)
+def update_reference_request_endpoint(request_id: int, reference_request_data: dict, session: Session = Depends(get_session)):
+    """Обновить справочный запрос"""
+    reference_request = update_reference_request(session, request_id, reference_request_data)
+    if not reference_request:
+        raise HTTPException(status_code=404, detail="Справочный запрос не найден")
+    return reference_request
+
+@router.delete("/reference-requests/{request_id}")
+def delete_reference_request_endpoint(request_id: int, session: Session = Depends(get_session)):
+    """Удалить справочный запрос"""
+    success = delete_reference_request(session, request_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Справочный запрос не найден")
+    return {"message": f"Справочный запрос {request_id} удален"}
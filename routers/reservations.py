@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import Reservation
+from crud import (
+    create_reservation, delete_reservation, get_all_reservations, get_reservation_by_id,
+    update_reservation
+)
+
+router = APIRouter()
+
+# ==================== БРОНИРОВАНИЯ ====================
+
+@router.get("/reservations", response_model=Page[Reservation])
+def get_all_reservations_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все бронирования"""
+    return make_page(get_all_reservations(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/reservations/{reservation_id}", response_model=Reservation)
+def get_reservation_by_id_endpoint(reservation_id: int, session: Session = Depends(get_session)):
+    """Получить бронирование по ID"""
+    reservation = get_reservation_by_id(session, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Бронирование не найдено")
+    return reservation
+
+@router.post("/reservations", response_model=Reservation)
+def create_reservation_endpoint(reservation: Reservation, session: Session = Depends(get_session)):
+    """Создать новое бронирование"""
+    return create_reservation(session, reservation)
+
+@router.put("/reservations/{reservation_id}", response_model=Reservation)
+def update_reservation_endpoint(reservation_id: int, reservation_data: dict, session: Session = Depends(get_session)):
+    """Обновить бронирование"""
+    reservation = update_reservation(session, reservation_id, reservation_data)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Бронирование не найдено")
+    return reservation
+
+@router.delete("/reservations/{reservation_id}")
+def delete_reservation_endpoint(reservation_id: int, session: Session = Depends(get_session)):
+    """Удалить бронирование"""
+    success = delete_reservation(session, reservation_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Бронирование не найдено")
+    return {"message": f"Бронирование {reservation_id} удалено"}
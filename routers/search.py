@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import Literal, Optional
+from database import get_session
+from models import Book, Reader
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from crud import BOOK_LIST_FIELDS, READER_LIST_FIELDS, search_books, search_books_with_facets, search_readers
+from routers.common import fields_or_400, sync_endpoint
+
+router = APIRouter()
+
+# ==================== ПОИСК ====================
+
+@router.get("/search/readers")
+def search_readers_endpoint(
+    last_name: Optional[str] = None,
+    first_name: Optional[str] = None,
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    fields: Optional[str] = None,
+    mode: Literal["name", "contains", "similar"] = "name",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session)
+):
+    """Поиск читателей: mode=name - фамилия/имя с начала слова, латиницей или кириллицей;
+    contains - подстрока; similar - по похожести, лучшие первыми"""
+    try:
+        readers = search_readers(
+            session=session,
+            last_name=last_name,
+            first_name=first_name,
+            phone=phone,
+            email=email,
+            is_active=is_active,
+            fields=fields_or_400(Reader, fields, READER_LIST_FIELDS),
+            mode=mode,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "search_criteria": {
+            "last_name": last_name,
+            "first_name": first_name,
+            "phone": phone,
+            "email": email,
+            "is_active": is_active,
+            "mode": mode
+        },
+        "found": len(readers),
+        "readers": readers
+    }
+
+@router.get("/search/books")
+@sync_endpoint
+def search_books_endpoint(
+    q: Optional[str] = None,
+    title: Optional[str] = None,
+    author: Optional[str] = None,
+    isbn: Optional[str] = None,
+    year: Optional[int] = None,
+    electronic: Optional[bool] = None,
+    language_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    facets: bool = True,
+    session: Session = Depends(get_session)
+):
+    """Поиск книг (q, title - полнотекстовый поиск с ранжированием и подсветкой;
+    author - фамилия или имя автора, латиницей или кириллицей).
+    facets=true - счетчики по году, языку, типу издания, электронным и издательствам."""
+    criteria = dict(
+        query_text=q,
+        title=title,
+        author_name=author,
+        isbn=isbn,
+        publication_year=year,
+        is_electronic=electronic,
+        language_id=language_id,
+        fields=fields_or_400(Book, fields, BOOK_LIST_FIELDS),
+        limit=limit
+    )
+    # С фасетами - один запрос к БД на страницу: найденные книги и счетчики из общего CTE
+    if facets:
+        books, book_facets = search_books_with_facets(session=session, **criteria)
+    else:
+        books = search_books(session=session, **criteria)
+    
+    response = {
+        "search_criteria": {
+            "q": q,
+            "title": title,
+            "author": author,
+            "isbn": isbn,
+            "year": year,
+            "electronic": electronic,
+            "language_id": language_id
+        },
+        "found": len(books),
+        "books": books
+    }
+    if facets:
+        response["facets"] = book_facets
+    return response
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from datetime import datetime
+from database import get_session, created_engines, created_async_engines
+from pool_metrics import pool_status
+
+router = APIRouter()
+
+# ==================== СЛУЖЕБНЫЕ ЭНДПОИНТЫ ====================
+
+@router.get("/")
+def read_root():
+    return {
+        "message": "Библиотечная система управления (ГОСТ-версия)",
+        "version": "4.0.0",
+        "schema": "Ichetovkina",
+        "description": "Полный CRUD для всех 20 таблиц",
+        "tables_count": 20,
+        "endpoints": "/docs для полной документации"
+    }
+
+@router.get("/health")
+def health_check(session: Session = Depends(get_session)):
+    """Проверка здоровья системы"""
+    try:
+        session.execute("SELECT 1")
+        return {
+            "status": "healthy",
+            "timestamp": datetime.now(),
+            "database": "connected"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@router.get("/health/pool")
+def pool_health():
+    """Состояние пулов соединений: занятые соединения, overflow, ожидание"""
+    pools = {}
+    for name, sync_engine in created_engines().items():
+        pools["sync" if name == "primary" else "sync_replica"] = pool_status(sync_engine)
+    for name, async_engine in created_async_engines().items():
+        pools["async" if name == "primary" else "async_replica"] = pool_status(async_engine)
+    return pools
+
+@router.get("/api/summary")
+def api_summary():
+    """Сводка по API"""
+    return {
+        "api_name": "Library Management System (ГОСТ)",
+        "version": "4.0.0",
+        "tables": 20,
+        "endpoints": "Все CRUD операции для каждой таблицы",
+        "documentation": "/docs или /redoc"
+    }
@@ -0,0 +1,142 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import Session
+from typing import Literal, Optional
+from datetime import date, datetime
+from database import get_engine, get_session
+from http_cache import make_etag, conditional, STATISTICS_CACHE_CONTROL
+from crud import get_daily_statistics_version, get_latest_daily_statistics, get_library_counters, get_statistics_range
+from stat_views import refresh_statistics_views
+
+router = APIRouter()
+
+Bucket = Literal["day", "week", "month", "year"]
+DAILY_STATISTICS_DAYS = 7   # Дней в /statistics/daily
+
+# ==================== СТАТИСТИЧЕСКИЕ ЭНДПОИНТЫ ====================
+
+@router.get("/statistics/library")
+def get_library_statistics(live: bool = False, session: Session = Depends(get_session)):
+    """Получить сводную статистику библиотеки (live=true - пересчитать сейчас)"""
+    try:
+        counters = get_library_counters(session, live)
+        
+        return {
+            "library": {
+                "name": "Библиотечная система Ичетовкиной (ГОСТ)",
+                "schema": "Ichetovkina",
+                "last_updated": datetime.now().isoformat()
+            },
+            "readers": {
+                "total": counters["readers_total"],
+                "active": counters["readers_active"],
+                "inactive": counters["readers_total"] - counters["readers_active"]
+            },
+            "books": {
+                "bibliographic_records": counters["books_total"],
+                "physical_copies": counters["copies_total"],
+                "electronic_books": counters["books_electronic"],
+                "physical_books": counters["books_total"] - counters["books_electronic"]
+            },
+            "authors": {
+                "total": counters["authors_total"]
+            },
+            "loans": {
+                "total": counters["loans_total"],
+                "active": counters["loans_active"],
+                "returned": counters["loans_total"] - counters["loans_active"],
+                "overdue": counters["loans_overdue"]
+            },
+            "activity": {
+                "visits_today": counters["visits_today"],
+                "reference_requests_total": counters["requests_total"],
+                "reference_requests_completed": counters["requests_completed"]
+            },
+            "calculated_at": counters["calculated_at"].isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ошибка при расчете статистики: {str(e)}")
+
+@router.get("/statistics/daily")
+def get_daily_statistics_summary(request: Request, response: Response, session: Session = Depends(get_session)):
+    """Получить последние 7 дней статистики"""
+    # Версия считается по индексам и последним дням - при 304 сами строки не читаются
+    total_days, calculated_at, version = get_daily_statistics_version(session, DAILY_STATISTICS_DAYS)
+    not_modified = conditional(request, response, make_etag("daily", version), STATISTICS_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    
+    return {
+        "daily_statistics": get_latest_daily_statistics(session, DAILY_STATISTICS_DAYS),
+        "total_days": total_days,
+        "calculated_at": calculated_at.isoformat() if calculated_at else None
+    }
+
+@router.get("/statistics/range")
+def get_statistics_range_endpoint(
+    date_from: date = Query(..., alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    bucket: Bucket = "day",
+    session: Session = Depends(get_session)
+):
+    """Ежедневная статистика за период по дням, неделям, месяцам или годам"""
+    date_to = date_to or date.today()
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Начало периода позже конца")
+    return {
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "bucket": bucket,
+        "periods": get_statistics_range(session, date_from, date_to, bucket)
+    }
+
+@router.get("/api/statistics/library")
+def get_library_statistics_alias(live: bool = False, session: Session = Depends(get_session)):
+    """Алиас для /statistics/library"""
+    return get_library_statistics(live, session)
+
+@router.post("/statistics/refresh")
+def refresh_statistics():
+    """Пересчитать представления статистики сейчас"""
+    if not refresh_statistics_views(get_engine()):
+        raise HTTPException(status_code=409, detail="Статистика уже пересчитывается")
+    return {"message": "Статистика пересчитана"}
+
+@router.get("/api/statistics")
+def get_all_statistics(session: Session = Depends(get_session)):
+    """Все статистические эндпоинты"""
+    return {
+        "endpoints": {
+            "library_summary": "/statistics/library",
+            "daily_statistics": "/statistics/daily",
+            "statistics_range": "/statistics/range?from=2025-01-01&bucket=month",
+            "all_daily_stats": "/daily-statistics",
+            "visits": "/visits",
+            "reference_requests": "/reference-requests"
+        },
+        "description": "Статистические данные библиотеки"
+    }
+
+@router.get("/test/stats")
+def test_stats():
+    """Простой тест-эндпоинт для проверки"""
+    return {
+        "message": "Статистика доступна!",
+        "endpoints": {
+            "library_summary": "/statistics/library",
+            "daily_stats": "/daily-statistics",
+            "test": "/test/stats"
+        },
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/statistics/simple")
+def get_simple_statistics(live: bool = False, session: Session = Depends(get_session)):
+    """Простая сводка по библиотеке"""
+    counters = get_library_counters(session, live)
+    return {
+        "readers_count": counters["readers_total"],
+        "books_count": counters["books_total"],
+        "loans_count": counters["loans_total"],
+        "calculated_at": counters["calculated_at"].isoformat(),
+        "timestamp": datetime.now().isoformat()
+    }
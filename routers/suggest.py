@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import Optional
+from database import get_session
+from crud import suggest
+from suggest_index import SUGGEST_KINDS, SUGGEST_MAX_LIMIT
+from routers.common import sync_endpoint
+
+router = APIRouter()
+
+# ==================== ПОДСКАЗКИ ПРИ НАБОРЕ ====================
+
+@router.get("/suggest")
+@sync_endpoint
+def suggest_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=SUGGEST_MAX_LIMIT),
+    types: Optional[str] = None,
+    session: Session = Depends(get_session)
+):
+    """Подсказки для строки поиска: заглавия книг, фамилии авторов, издательства.
+    types - через запятую: title, author, publisher (по умолчанию все)"""
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else None
+    unknown = [kind for kind in kinds or [] if kind not in SUGGEST_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные типы подсказок: {', '.join(unknown)}")
+    return {"q": q, "suggestions": suggest(session, q, limit, kinds)}
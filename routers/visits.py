@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from database import get_session
+from pagination import Page, PageParams, make_page
+from models import Visit
+from crud import create_visit, delete_visit, get_all_visits, get_visit_by_id, update_visit
+
+router = APIRouter()
+
+# ==================== ПОСЕЩЕНИЯ ====================
+
+@router.get("/visits", response_model=Page[Visit])
+def get_all_visits_endpoint(page: PageParams = Depends(), session: Session = Depends(get_session)):
+    """Получить все посещения"""
+    return make_page(get_all_visits(session, page.fetch_limit, page.after_id), page)
+
+@router.get("/visits/{visit_id}", response_model=Visit)
+def get_visit_by_id_endpoint(visit_id: int, session: Session = Depends(get_session)):
+    """Получить посещение по ID"""
+    visit = get_visit_by_id(session, visit_id)
+    if not visit:
+        raise HTTPException(status_code=404, detail="Посещение не найдено")
+    return visit
+
+@router.post("/visits", response_model=Visit)
+def create_visit_endpoint(visit: Visit, session: Session = Depends(get_session)):
+    """Создать новое посещение"""
+    return create_visit(session, visit)
+
+@router.put("/visits/{visit_id}", response_model=Visit)
+def update_visit_endpoint(visit_id: int, visit_data: dict, session: Session = Depends(get_session)):
+    """Обновить посещение"""
+    visit = update_visit(session, visit_id, visit_data)
+    if not visit:
+        raise HTTPException(status_code=404, detail="Посещение не найдено")
+    return visit
+
+@router.delete("/visits/{visit_id}")
+def delete_visit_endpoint(visit_id: int, session: Session = Depends(get_session)):
+    """Удалить посещение"""
+    success = delete_visit(session, visit_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Посещение не найдено")
+    return {"message": f"Посещение {visit_id} удалено"}
@@ -57,22 +57,22 @@ def main():
     # 2. Читатели
     readers = get_json(f"{BASE_URL}/readers")
     if readers:
-        print_section("👥 ЧИТАТЕЛИ", readers)
+        print_section("👥 ЧИТАТЕЛИ", readers.get('items', []))
     
     # 3. Книги
     books = get_json(f"{BASE_URL}/books")
     if books:
-        print_section("📚 КНИГИ (библиографические записи)", books)
+        print_section("📚 КНИГИ (библиографические записи)", books.get('items', []))
     
     # 4. Авторы
     authors = get_json(f"{BASE_URL}/authors")
     if authors:
-        print_section("✍️ АВТОРЫ", authors)
+        print_section("✍️ АВТОРЫ", authors.get('items', []))
     
     # 5. Выдачи
     loans = get_json(f"{BASE_URL}/loans")
     if loans:
-        print_section("📅 ВЫДАЧИ КНИГ", loans)
+        print_section("📅 ВЫДАЧИ КНИГ", loans.get('items', []))
     
     # 6. Поиск книг
     search_result = get_json(f"{BASE_URL}/search/books?title=Граф")
@@ -114,7 +114,9 @@ def main():
     for endpoint, description in endpoints_to_check:
         data = get_json(f"{BASE_URL}{endpoint}")
         if data:
-            if isinstance(data, list):
+            if isinstance(data, dict) and "items" in data:
+                print(f"✅ {description}: {len(data['items'])} записей на первой странице")
+            elif isinstance(data, list):
                 print(f"✅ {description}: {len(data)} записей")
             else:
                 print(f"✅ {description}: работает")
@@ -0,0 +1,335 @@
+import os
+import select as selectors
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+from sqlmodel import Session, select, func
+from sqlalchemy import Column, MetaData, Table, event, literal, literal_column
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from models import Author, Book, BookCopy, BookStatus, Loan, Reader, ReferenceRequest, Visit
+from statistics_engine import refresh_queued_statistics
+
+# ==================== МАТЕРИАЛИЗОВАННЫЕ ПРЕДСТАВЛЕНИЯ СТАТИСТИКИ ====================
+# Сводка библиотеки (/statistics/library, /statistics/simple) и число доступных
+# экземпляров книг (/authors/{id}/books-with-counts) читаются из материализованных
+# представлений, а не считаются на каждый запрос:
+#   library_counters_mv  - одна строка счетчиков и calculated_at (время пересчета)
+#   book_availability_mv - по строке на книгу с экземплярами: всего и доступно
+# Оба представления обновляются вместе REFRESH MATERIALIZED VIEW CONCURRENTLY
+# (чтение во время пересчета не блокируется) фоновым потоком API:
+# каждые STATS_VIEWS_REFRESH_SECONDS и через STATS_VIEWS_WRITE_DELAY после
+# записи в таблицы, от которых зависят счетчики. Параметр live=true у эндпоинтов
+# считает статистику по таблицам напрямую.
+# Счетчики на текущую дату (visits_today, loans_overdue) в представление не входят:
+# дата в нем застыла бы на момент пересчета и после полуночи счетчики устарели бы.
+# Они всегда считаются по таблицам тем же запросом, что читает представление.
+# Поток запускается в каждом процессе API, но пересчитывает только ведущий - тот,
+# что держит сеансовую блокировку REFRESHER_LOCK_KEY. Остальные сообщают ему о
+# записях через NOTIFY и раз в STATS_VIEWS_LEADER_RETRY пробуют занять его место.
+# Тот же поток пересчитывает дни daily_statistics из очереди после записей.
+STATS_VIEWS_REFRESH_SECONDS = float(os.getenv("STATS_VIEWS_REFRESH_SECONDS", "300"))  # 0 - без периодического пересчета
+STATS_VIEWS_REFRESH_ON_WRITE = os.getenv("STATS_VIEWS_REFRESH_ON_WRITE", "1") == "1"
+STATS_VIEWS_WRITE_DELAY = float(os.getenv("STATS_VIEWS_WRITE_DELAY", "5"))   # сек., записи за это время - один пересчет
+STATS_VIEWS_LEADER_RETRY = float(os.getenv("STATS_VIEWS_LEADER_RETRY", "60"))  # сек., проверка, жив ли ведущий процесс
+
+SCHEMA = Book.__table__.schema
+# Несколько процессов API не пересчитывают представления одновременно
+REFRESH_LOCK_KEY = 710_023
+# Ведущий процесс фонового пересчета (блокировка держится все время его работы)
+REFRESHER_LOCK_KEY = 710_123
+# Канал, по которому процессы API сообщают ведущему о записях
+REFRESH_CHANNEL = "stat_views_dirty"
+# Запись в эти таблицы меняет счетчики или доступность экземпляров
+WATCHED_TABLES = {
+    model.__table__.name for model in (Reader, Book, BookCopy, Author, Loan, Visit, ReferenceRequest, BookStatus)
+}
+
+
+def day_counter_columns(today: date) -> list:
+    """Счетчики на дату today: посещения за день и просроченные выдачи
+    (по индексам visit_date и невозвращенных выдач по due_date)"""
+    visits = select(func.count()).select_from(Visit).where(Visit.visit_date == today)
+    overdue = select(func.count()).select_from(Loan).where(Loan.return_date.is_(None), Loan.due_date < today)
+    return [visits.scalar_subquery().label("visits_today"), overdue.scalar_subquery().label("loans_overdue")]
+
+
+def library_counters_query(today: Optional[date] = None):
+    """Счетчики библиотеки одним запросом: каждая таблица читается один раз,
+    условные счетчики - COUNT(*) FILTER (WHERE ...).
+    Без today - только счетчики, не зависящие от даты (для представления)"""
+    readers = select(
+        func.count().label("readers_total"),
+        func.count().filter(Reader.is_active).label("readers_active")
+    ).subquery()
+    books = select(
+        func.count().label("books_total"),
+        func.count().filter(Book.is_electronic).label("books_electronic")
+    ).subquery()
+    copies = select(func.count().label("copies_total")).select_from(BookCopy).subquery()
+    authors = select(func.count().label("authors_total")).select_from(Author).subquery()
+    loans = select(
+        func.count().label("loans_total"),
+        func.count().filter(Loan.return_date.is_(None)).label("loans_active")
+    ).subquery()
+    requests = select(
+        func.count().label("requests_total"),
+        func.count().filter(ReferenceRequest.is_completed).label("requests_completed")
+    ).subquery()
+    query = select(readers, books, copies, authors, loans, requests).select_from(readers)
+    for subquery in (books, copies, authors, loans, requests):
+        query = query.join(subquery, literal(True))
+    if today is not None:
+        query = query.add_columns(*day_counter_columns(today))
+    return query
+
+
+def book_availability_query():
+    """Экземпляров у каждой книги: всего и доступно для выдачи"""
+    return (
+        select(
+            BookCopy.book_id,
+            func.count().label("total_copies"),
+            func.count().filter(BookStatus.code == "AVAILABLE").label("available_copies")
+        )
+        .select_from(BookCopy)
+        .outerjoin(BookStatus, BookStatus.id == BookCopy.current_status_id)
+        .group_by(BookCopy.book_id)
+    )
+
+
+# Запросы представлений; у CONCURRENTLY обязателен уникальный индекс по строкам
+_VIEW_QUERIES = {
+    "library_counters_mv": (
+        library_counters_query().add_columns(
+            literal_column("1").label("row_id"), func.now().label("calculated_at")
+        ),
+        "row_id"
+    ),
+    "book_availability_mv": (book_availability_query(), "book_id"),
+}
+
+_views = MetaData(schema=SCHEMA)
+
+
+def _view_table(name: str) -> Table:
+    query, _ = _VIEW_QUERIES[name]
+    return Table(name, _views, *[Column(column.name, column.type) for column in query.selected_columns])
+
+
+library_counters_view = _view_table("library_counters_mv")
+book_availability_view = _view_table("book_availability_mv")
+
+
+def _view_sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def create_statistics_views(bind) -> list:
+    """Создать недостающие представления (сразу с данными) и их уникальные индексы"""
+    created = []
+    with bind.begin() as conn:
+        for name, (query, key) in _VIEW_QUERIES.items():
+            if conn.scalar(select(func.to_regclass(f'"{SCHEMA}".{name}'))) is not None:
+                continue
+            conn.exec_driver_sql(f'CREATE MATERIALIZED VIEW "{SCHEMA}".{name} AS {_view_sql(query)}')
+            conn.exec_driver_sql(f'CREATE UNIQUE INDEX ix_{name}_{key} ON "{SCHEMA}".{name} ({key})')
+            created.append(name)
+    return created
+
+
+def refresh_statistics_views(bind, concurrently: bool = True) -> bool:
+    """Пересчитать оба представления в одной транзакции.
+    False - пересчет уже идет в другом процессе"""
+    mode = "CONCURRENTLY " if concurrently else ""
+    with bind.begin() as conn:
+        if not conn.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_KEY))):
+            return False
+        for name in _VIEW_QUERIES:
+            conn.exec_driver_sql(f'REFRESH MATERIALIZED VIEW {mode}"{SCHEMA}".{name}')
+    return True
+
+
+def read_view(session: Session, query):
+    """Строки запроса к представлению или None, если представления еще нет
+    (create_tables.py не запускался после обновления) - тогда считаем по таблицам"""
+    try:
+        with session.begin_nested():
+            return session.execute(query).mappings().all()
+    except DBAPIError:
+        return None
+
+
+# ==================== ФОНОВЫЙ ПЕРЕСЧЕТ ====================
+
+class ViewRefresher:
+    """Поток, пересчитывающий представления и очередь дней статистики по расписанию и после записи.
+    Пересчитывает только ведущий процесс, остальные передают ему сигналы о записях"""
+
+    POLL_SECONDS = 1.0   # Как часто ведущий проверяет записи своего процесса
+
+    def __init__(self, interval: float, write_delay: float, leader_retry: float = STATS_VIEWS_LEADER_RETRY):
+        self.interval = interval
+        self.write_delay = write_delay
+        self.leader_retry = leader_retry
+        self.last_error: Optional[str] = None
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._bind = None
+        self._leader = None   # Соединение, держащее REFRESHER_LOCK_KEY
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader is not None
+
+    def start(self, bind) -> bool:
+        if self.running or (self.interval <= 0 and not STATS_VIEWS_REFRESH_ON_WRITE):
+            return False
+        self._bind = bind
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stat-views-refresh", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._dirty.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def mark_dirty(self) -> None:
+        """Данные изменились: пересчитать представления после паузы write_delay"""
+        if STATS_VIEWS_REFRESH_ON_WRITE and self.running:
+            self._dirty.set()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                try:
+                    if self._leader is not None or self._lead():
+                        self._serve()
+                    else:
+                        self._follow()
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"⚠️ Не удалось обновить представления статистики: {e}")
+                    self._release()
+                    self._stop.wait(self.write_delay)
+        finally:
+            self._release()
+
+    def _lead(self) -> bool:
+        """Занять место ведущего. Сеансовая блокировка снимается сама, когда
+        соединение закрывается, - в том числе если процесс упал"""
+        conn = self._bind.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            if not conn.scalar(select(func.pg_try_advisory_lock(REFRESHER_LOCK_KEY))):
+                conn.close()
+                return False
+            conn.exec_driver_sql(f"LISTEN {REFRESH_CHANNEL}")
+        except Exception:
+            conn.invalidate()
+            conn.close()
+            raise
+        self._leader = conn
+        print("✅ Процесс ведет пересчет представлений статистики")
+        return True
+
+    def _release(self) -> None:
+        if self._leader is not None:
+            # Соединение не возвращается в пул: вместе с ним закрываются блокировка и LISTEN
+            self._leader.invalidate()
+            self._leader.close()
+            self._leader = None
+
+    def _serve(self) -> None:
+        """Ведущий: пересчет по расписанию или после записей в любом процессе"""
+        written = self._wait_writes(self.interval if self.interval > 0 else None)
+        if self._stop.is_set():
+            return
+        if written:
+            # Записи, пришедшие во время паузы, войдут в тот же пересчет
+            self._stop.wait(self.write_delay)
+            self._wait_writes(0)
+        self._dirty.clear()
+        refresh_statistics_views(self._bind)
+        with Session(self._bind) as session:
+            while refresh_queued_statistics(session):
+                pass
+        self.last_error = None
+
+    def _wait_writes(self, timeout: Optional[float]) -> bool:
+        """Ждать записей своего процесса (_dirty) или NOTIFY от других"""
+        raw = self._leader.connection.driver_connection
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            raw.poll()
+            if raw.notifies:
+                raw.notifies.clear()
+                return True
+            if self._dirty.is_set() or self._stop.is_set():
+                return self._dirty.is_set()
+            left = self.POLL_SECONDS if deadline is None else min(self.POLL_SECONDS, deadline - time.monotonic())
+            if left <= 0:
+                return False
+            selectors.select([raw], [], [], left)
+
+    def _follow(self) -> None:
+        """Не ведущий: о записях сообщаем ведущему, сам процесс не пересчитывает"""
+        written = self._dirty.wait(timeout=self.leader_retry)
+        if self._stop.is_set() or not written:
+            return
+        self._dirty.clear()
+        with self._bind.begin() as conn:
+            conn.execute(select(func.pg_notify(REFRESH_CHANNEL, "")))
+
+
+view_refresher = ViewRefresher(STATS_VIEWS_REFRESH_SECONDS, STATS_VIEWS_WRITE_DELAY)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(state):
+    """INSERT/UPDATE/DELETE через репозиторий и crud.py"""
+    mapper = state.bind_mapper
+    if (state.is_insert or state.is_update or state.is_delete) and mapper is not None \
+            and mapper.local_table.name in WATCHED_TABLES:
+        state.session.info["stat_views_dirty"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session, flush_context):
+    """Объекты, записанные через session.add/delete"""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if type(instance).__table__.name in WATCHED_TABLES:
+            session.info["stat_views_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_after_commit(session):
+    if session.info.pop("stat_views_dirty", False):
+        view_refresher.mark_dirty()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("stat_views_dirty", None)
+
+
+if __name__ == "__main__":
+    from database import get_engine
+    print("📊 Пересчитываем представления статистики...")
+    for name in create_statistics_views(get_engine()):
+        print(f"➕ Создано представление {name}")
+    if refresh_statistics_views(get_engine()):
+        print("✅ Представления статистики обновлены")
+    else:
+        print("⏳ Представления уже пересчитываются другим процессом")
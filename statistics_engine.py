@@ -0,0 +1,408 @@
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select, update, delete, func, and_, or_
+from sqlalchemy import Date, case, cast, literal, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import Book, BookCopy, DailyStatistic, DailyStatisticQueue, Loan, Reader, ReferenceRequest, Visit
+from repository import commit
+
+# ==================== РАСЧЕТ ЕЖЕДНЕВНОЙ СТАТИСТИКИ ====================
+# Строка daily_statistics за день считается по таблицам visits, loans, readers,
+# book_copies и reference_requests агрегатами по диапазону дат (по индексам
+# колонок дат) сразу для целого окна дней и записывается UPSERT по statistic_date.
+# При записи через crud.py в той же транзакции фонд и просрочка сдвигаются
+# одним UPDATE на разницу, а дни, показатели которых зависят от измененных полей
+# строки (день посещения, день выдачи), ставятся в очередь daily_statistics_queue.
+# Очередь пересчитывает фоновый поток API (stat_views.ViewRefresher) или команда
+#   python statistics_engine.py queue
+# Пересчет дней и сдвиги не пересекаются: пересчет берет advisory-блокировку
+# STATS_LOCK_KEY монопольно, запись - разделяемо. Историю за годы строит команда
+# backfill параллельно по частям:
+#   python statistics_engine.py backfill --from 2015-01-01 --workers 4
+STATS_CHUNK_DAYS = int(os.getenv("STATS_CHUNK_DAYS", "92"))               # Дней в одном расчете
+STATS_BACKFILL_WORKERS = int(os.getenv("STATS_BACKFILL_WORKERS", "4"))    # Параллельных расчетов backfill
+STATS_QUEUE_BATCH = int(os.getenv("STATS_QUEUE_BATCH", "366"))            # Дней очереди за один пересчет
+STATS_LOCK_KEY = 710_024
+COMPLEX_REQUEST_LEVEL = "сложный"     # ReferenceRequest.complexity_level сложного запроса
+
+METRICS = [name for name in DailyStatistic.model_fields if name not in ("id", "statistic_date", "calculated_at")]
+
+
+def _days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _chunks(start: date, end: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """Окно [start, end] частями по chunk_days дней"""
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=chunk_days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _by_day(session: Session, query) -> Dict[date, tuple]:
+    """{день: остальные колонки строки} для запроса с днем в первой колонке"""
+    return {row[0]: tuple(row[1:]) for row in session.execute(query)}
+
+
+def compute_daily_statistics(session: Session, start: date, end: date) -> List[dict]:
+    """Строки daily_statistics за дни [start, end], посчитанные по таблицам"""
+    next_day = end + timedelta(days=1)
+
+    # ПОСЕЩЕНИЯ
+    visits = _by_day(session, select(Visit.visit_date, func.count(), func.count().filter(Visit.is_remote))
+                     .where(Visit.visit_date.between(start, end))
+                     .group_by(Visit.visit_date))
+
+    # ЧИТАТЕЛИ: новые - зарегистрированные в этот день, активные - пришедшие или получившие книгу
+    new_readers = _by_day(session, select(Reader.registration_date, func.count())
+                          .where(Reader.registration_date.between(start, end))
+                          .group_by(Reader.registration_date))
+    activity = union_all(
+        select(Visit.visit_date.label("day"), Visit.reader_id)
+        .where(Visit.visit_date.between(start, end), Visit.reader_id.is_not(None)),
+        select(Loan.loan_date, Loan.reader_id).where(Loan.loan_date.between(start, end))
+    ).subquery()
+    active_readers = _by_day(session, select(activity.c.day, func.count(activity.c.reader_id.distinct()))
+                             .group_by(activity.c.day))
+
+    # ВЫДАЧИ: электронные - экземпляры электронных изданий
+    loans = _by_day(session, select(Loan.loan_date, func.count(), func.count().filter(Book.is_electronic))
+                    .join(BookCopy, BookCopy.id == Loan.book_copy_id)
+                    .join(Book, Book.id == BookCopy.book_id)
+                    .where(Loan.loan_date.between(start, end))
+                    .group_by(Loan.loan_date))
+    # Просрочена на конец дня: срок прошел, а книга еще не возвращена
+    days = (
+        func.generate_series(start, end, literal(timedelta(days=1)))
+        .table_valued("day").render_derived(name="days")
+    )
+    day = cast(days.c.day, Date)
+    overdue = _by_day(session, select(day, func.count())
+                      .select_from(days)
+                      .join(Loan, and_(Loan.due_date < day, or_(Loan.return_date.is_(None), Loan.return_date > day)))
+                      .where(Loan.due_date < end, or_(Loan.return_date.is_(None), Loan.return_date > start))
+                      .group_by(day))
+
+    # ФОНД на конец дня: фонд на начало окна плюс поступления минус списания по дням
+    copies_before = session.scalar(select(func.count()).where(BookCopy.acquisition_date < start)) \
+        - session.scalar(select(func.count()).where(BookCopy.write_off_date < start))
+    new_copies = _by_day(session, select(BookCopy.acquisition_date, func.count())
+                         .where(BookCopy.acquisition_date.between(start, end))
+                         .group_by(BookCopy.acquisition_date))
+    written_off = _by_day(session, select(BookCopy.write_off_date, func.count())
+                          .where(BookCopy.write_off_date.between(start, end))
+                          .group_by(BookCopy.write_off_date))
+
+    # ЗАПРОСЫ
+    request_day = cast(ReferenceRequest.request_date, Date)
+    requests = _by_day(session, select(
+                           request_day, func.count(),
+                           func.count().filter(ReferenceRequest.complexity_level == COMPLEX_REQUEST_LEVEL))
+                       .where(ReferenceRequest.request_date >= start, ReferenceRequest.request_date < next_day)
+                       .group_by(request_day))
+
+    calculated_at = datetime.now()
+    rows = []
+    total_copies = copies_before
+    for current in _days(start, end):
+        total_visits, remote_visits = visits.get(current, (0, 0))
+        total_loans, electronic_loans = loans.get(current, (0, 0))
+        added = new_copies.get(current, (0,))[0]
+        removed = written_off.get(current, (0,))[0]
+        total_copies += added - removed
+        total_requests, complex_requests = requests.get(current, (0, 0))
+        rows.append({
+            "statistic_date": current,
+            "total_visits": total_visits,
+            "physical_visits": total_visits - remote_visits,
+            "remote_visits": remote_visits,
+            "new_readers": new_readers.get(current, (0,))[0],
+            "active_readers": active_readers.get(current, (0,))[0],
+            "total_loans": total_loans,
+            "book_loans": total_loans - electronic_loans,
+            "electronic_loans": electronic_loans,
+            "overdue_loans": overdue.get(current, (0,))[0],
+            "total_copies": total_copies,
+            "new_copies": added,
+            "written_off_copies": removed,
+            "reference_requests": total_requests,
+            "complex_requests": complex_requests,
+            "calculated_at": calculated_at,
+        })
+    return rows
+
+
+def upsert_daily_statistics(session: Session, rows: List[dict]) -> None:
+    """Записать строки: существующие дни обновляются. Без commit"""
+    if not rows:
+        return
+    query = pg_insert(DailyStatistic).values(rows)
+    session.execute(query.on_conflict_do_update(
+        index_elements=["statistic_date"],
+        set_={name: query.excluded[name] for name in METRICS + ["calculated_at"]}
+    ))
+
+
+def lock_statistics(session: Session, exclusive: bool = False) -> None:
+    """Блокировка до конца транзакции: пересчет дней - монопольно, сдвиги при записи -
+    разделяемо. Пересчет ждет незавершенные записи и видит их результат"""
+    lock = func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    session.execute(select(lock(STATS_LOCK_KEY)))
+
+
+def refresh_daily_statistics(session: Session, start: date, end: Optional[date] = None) -> int:
+    """Пересчитать дни [start, end] (по умолчанию - по сегодня). Возвращает число дней"""
+    count = 0
+    for chunk in _chunks(start, end or date.today(), STATS_CHUNK_DAYS):
+        lock_statistics(session, exclusive=True)
+        rows = compute_daily_statistics(session, *chunk)
+        upsert_daily_statistics(session, rows)
+        session.commit()
+        count += len(rows)
+    return count
+
+
+# ---------- пересчет после записи ----------
+
+def statistic_key(row) -> Optional[tuple]:
+    """Снимок полей строки, от которых зависит статистика (берется до изменения строки):
+    ("day", день, поля) - строка учитывается только в статистике своего дня;
+    ("copy", поступление, списание) - экземпляр в фонде между этими датами;
+    ("loan", (день выдачи, поля), (срок, возврат)) - выдача в день выдачи и в просрочке"""
+    if isinstance(row, Visit):
+        return ("day", row.visit_date, row.is_remote, row.reader_id)
+    if isinstance(row, Reader):
+        return ("day", row.registration_date)
+    if isinstance(row, ReferenceRequest):
+        return ("day", row.request_date.date() if row.request_date else None, row.complexity_level)
+    if isinstance(row, BookCopy):
+        return ("copy", row.acquisition_date, row.write_off_date)
+    if isinstance(row, Loan):
+        return ("loan", (row.loan_date, row.reader_id, row.book_copy_id), (row.due_date, row.return_date))
+    return None
+
+
+def _runs(days: List[date]) -> List[Tuple[date, date]]:
+    """Отсортированные дни -> отрезки подряд идущих дней"""
+    runs = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _shift_copies(session: Session, acquisition: date, write_off: Optional[date], count: int) -> None:
+    """Экземпляры поступили (count > 0) или убраны из учета (count < 0): сдвинуть
+    фонд дней после поступления и счетчики дней поступления и списания одним UPDATE"""
+    day = DailyStatistic.statistic_date
+    in_fund = case((day >= acquisition, count), else_=0)
+    values = {"new_copies": DailyStatistic.new_copies + case((day == acquisition, count), else_=0)}
+    if write_off is not None:
+        in_fund = in_fund - case((day >= write_off, count), else_=0)
+        values["written_off_copies"] = DailyStatistic.written_off_copies + case((day == write_off, count), else_=0)
+    session.execute(
+        update(DailyStatistic)
+        .where(day >= min(acquisition, write_off or acquisition))
+        .values(total_copies=DailyStatistic.total_copies + in_fund, calculated_at=datetime.now(), **values)
+    )
+
+
+def _shift_overdue(session: Session, due: date, returned: Optional[date], count: int) -> None:
+    """Сдвинуть число просроченных выдач в днях, когда выдача была просрочена"""
+    day = DailyStatistic.statistic_date
+    overdue = day > due if returned is None else and_(day > due, day < returned)
+    session.execute(
+        update(DailyStatistic)
+        .where(overdue)
+        .values(overdue_loans=DailyStatistic.overdue_loans + count, calculated_at=datetime.now())
+    )
+
+
+def refresh_rows_statistics(session: Session, changes: Iterable[Tuple[Optional[tuple], Optional[tuple]]]) -> int:
+    """Обновить статистику в транзакции записи строк: changes - пары (statistic_key до,
+    после), None - строки не было/больше нет. Фонд и просрочка сдвигаются на разницу,
+    дни, зависящие от измененных полей, ставятся в очередь пересчета.
+    Возвращает число дней, поставленных в очередь"""
+    days: Set[date] = set()
+    copies: Counter = Counter()
+    overdue: Counter = Counter()
+    for old, new in changes:
+        if old == new:
+            continue
+        for key, other, sign in ((old, new, -1), (new, old, 1)):
+            if key is None:
+                continue
+            if key[0] == "day":
+                days.add(key[1])
+            elif key[0] == "copy":
+                copies[key[1:]] += sign
+            elif key[0] == "loan":
+                if other is None or other[1] != key[1]:
+                    days.add(key[1][0])
+                if other is None or other[2] != key[2]:
+                    overdue[key[2]] += sign
+    copies = {key: count for key, count in copies.items() if count}
+    overdue = {key: count for key, count in overdue.items() if count}
+    days.discard(None)
+    if not (days or copies or overdue):
+        return 0
+
+    lock_statistics(session)
+    for (acquisition, write_off), count in copies.items():
+        if acquisition is not None:
+            _shift_copies(session, acquisition, write_off, count)
+    for (due, returned), count in overdue.items():
+        if due is not None:
+            _shift_overdue(session, due, returned, count)
+    if days:
+        session.execute(
+            pg_insert(DailyStatisticQueue)
+            .values([{"statistic_date": day} for day in sorted(days)])
+            .on_conflict_do_nothing()
+        )
+    commit(session)
+    return len(days)
+
+
+def refresh_row_statistics(session: Session, old: Optional[tuple], new: Optional[tuple]) -> int:
+    """refresh_rows_statistics для одной строки"""
+    return refresh_rows_statistics(session, [(old, new)])
+
+
+def refresh_queued_statistics(session: Session, limit: int = STATS_QUEUE_BATCH) -> int:
+    """Пересчитать до limit дней из очереди одной транзакцией. Дни раньше первого
+    посчитанного и после сегодня только убираются из очереди: историю строит backfill.
+    Возвращает число дней, взятых из очереди (0 - очередь пуста)"""
+    lock_statistics(session, exclusive=True)
+    queued = select(DailyStatisticQueue.statistic_date).order_by(DailyStatisticQueue.statistic_date).limit(limit)
+    days = session.scalars(
+        delete(DailyStatisticQueue)
+        .where(DailyStatisticQueue.statistic_date.in_(queued))
+        .returning(DailyStatisticQueue.statistic_date)
+    ).all()
+    today = date.today()
+    first = session.scalar(select(func.min(DailyStatistic.statistic_date))) or today
+    for start, end in _runs(sorted(day for day in days if first <= day <= today)):
+        upsert_daily_statistics(session, compute_daily_statistics(session, start, end))
+    session.commit()
+    return len(days)
+
+
+def refresh_statistics_dates(session: Session, dates: Iterable[date]) -> int:
+    """Пересчитать окно дней между крайними датами строк, загруженных из CSV.
+    История раньше первого посчитанного дня не создается - ее строит backfill"""
+    dates = [day for day in dates if day is not None]
+    if not dates:
+        return 0
+    end = min(max(dates), date.today())
+    first = session.scalar(select(func.min(DailyStatistic.statistic_date)))
+    start = max(min(dates), first or end)
+    if start > end:
+        return 0
+    return refresh_daily_statistics(session, start, end)
+
+
+def changed_date_window(cursor, model) -> Optional[Tuple[date, date]]:
+    """Окно дней строк (читателей, экземпляров), измененных текущей транзакцией (курсор psycopg2)"""
+    table = model.__table__
+    column = "registration_date" if model is Reader else "acquisition_date"
+    cursor.execute(
+        f'SELECT min({column}), max({column}) FROM "{table.schema}".{table.name} '
+        "WHERE xmin::text::bigint = txid_current() & 4294967295"
+    )
+    start, end = cursor.fetchone()
+    if start is None:
+        return None
+    return start, date.today() if model is BookCopy else end
+
+
+# ---------- история ----------
+
+def history_start(session: Session) -> Optional[date]:
+    """Самая ранняя дата в таблицах-источниках"""
+    firsts = [
+        session.scalar(select(func.min(column)))
+        for column in (Visit.visit_date, Loan.loan_date, Reader.registration_date, BookCopy.acquisition_date)
+    ]
+    first_request = session.scalar(select(func.min(ReferenceRequest.request_date)))
+    firsts.append(first_request.date() if first_request else None)
+    firsts = [first for first in firsts if first is not None]
+    return min(firsts) if firsts else None
+
+
+def backfill_daily_statistics(start: date, end: date, workers: int = STATS_BACKFILL_WORKERS,
+                              chunk_days: int = STATS_CHUNK_DAYS) -> int:
+    """Пересчитать дни [start, end] частями по chunk_days дней в workers потоков"""
+    from database import get_engine
+
+    def compute(chunk: Tuple[date, date]) -> int:
+        # У каждого потока своя сессия и свое соединение из пула
+        with Session(get_engine()) as session:
+            rows = compute_daily_statistics(session, *chunk)
+            upsert_daily_statistics(session, rows)
+            session.commit()
+            return len(rows)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return sum(pool.map(compute, _chunks(start, end, max(1, chunk_days))))
+
+
+# ==================== КОМАНДНАЯ СТРОКА ====================
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Расчет ежедневной статистики (daily_statistics)")
+    parser.add_argument("action", nargs="?", choices=["refresh", "backfill", "queue"], default="refresh",
+                        help="refresh - пересчитать дни (по умолчанию вчера и сегодня), backfill - построить историю, "
+                             "queue - пересчитать дни из очереди после записей")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="Первый день (backfill - по умолчанию самая ранняя дата в данных)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Последний день (по умолчанию сегодня)")
+    parser.add_argument("--workers", type=int, default=STATS_BACKFILL_WORKERS, help="Параллельных расчетов backfill")
+    parser.add_argument("--chunk-days", type=int, default=STATS_CHUNK_DAYS, help="Дней в одном расчете")
+    args = parser.parse_args(argv)
+
+    from database import get_engine
+    end = args.end or date.today()
+    if args.action == "queue":
+        count = 0
+        with Session(get_engine()) as session:
+            while True:
+                taken = refresh_queued_statistics(session)
+                if not taken:
+                    break
+                count += taken
+        print(f"✅ Дней из очереди: {count}")
+        return 0
+    if args.action == "refresh":
+        start = args.start or end - timedelta(days=1)
+        with Session(get_engine()) as session:
+            count = refresh_daily_statistics(session, start, end)
+        print(f"✅ Пересчитано дней: {count} ({start} - {end})")
+        return 0
+
+    start = args.start
+    if start is None:
+        with Session(get_engine()) as session:
+            start = history_start(session)
+        if start is None:
+            print("⚠️ В таблицах нет данных для статистики")
+            return 0
+    print(f"📊 Строим статистику за {start} - {end} ({args.workers} потоков по {args.chunk_days} дней)...")
+    count = backfill_daily_statistics(start, end, args.workers, args.chunk_days)
+    print(f"✅ Посчитано дней: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
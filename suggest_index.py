@@ -0,0 +1,269 @@
+import bisect
+import heapq
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select, func
+from models import Author, Book, BookAuthor, BookCopy, Loan, Publisher
+
+# ==================== ПОДСКАЗКИ ПРИ НАБОРЕ (/suggest) ====================
+# Отсортированный массив ключей (нормализованные заглавия книг, фамилии авторов,
+# названия издательств) в памяти процесса: подсказки для префикса - диапазон,
+# найденный двоичным поиском, лучшие по популярности (числу выдач).
+# Заглавия доступны и с начала каждого значимого слова: "мир" находит "Война и мир".
+# Записи через crud.py обновляют массив сразу, без перестроения. Записи других
+# процессов и загрузки CSV попадают в индекс при фоновом перестроении по БД:
+# его запускает запрос подсказок, если с прошлой загрузки прошло SUGGEST_RELOAD_SECONDS.
+SUGGEST_KINDS = ("title", "author", "publisher")
+SUGGEST_MAX_LIMIT = 20        # Сколько подсказок можно запросить
+SUGGEST_CACHED_PREFIX = 2     # Ответы на префиксы до этой длины кэшируются (диапазоны большие)
+MIN_WORD_KEY = 3              # Слова заглавия короче не становятся отдельным ключом
+SUGGEST_RELOAD_SECONDS = float(os.getenv("SUGGEST_RELOAD_SECONDS", "300"))  # 0 - не перестраивать
+
+_NOT_WORD_RE = re.compile(r"[^\w]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Нижний регистр, ё -> е, знаки препинания -> пробел, одиночные пробелы"""
+    if not text:
+        return ""
+    return " ".join(_NOT_WORD_RE.sub(" ", text.lower().replace("ё", "е")).split())
+
+
+def _title_keys(title: str) -> List[str]:
+    key = normalize(title)
+    if not key:
+        return []
+    words = key.split(" ")
+    keys = [key]
+    for position in range(1, len(words)):
+        if len(words[position]) >= MIN_WORD_KEY:
+            keys.append(" ".join(words[position:]))
+    return keys
+
+
+def _author_name(author) -> str:
+    return " ".join(part for part in (author.last_name, author.first_name, author.middle_name) if part)
+
+
+class SuggestIndex:
+    """Префиксный поиск по отсортированному массиву (ключ, тип, id)"""
+
+    def __init__(self):
+        self.loaded = False
+        self._entries: List[Tuple[str, str, int]] = []
+        self._items: Dict[Tuple[str, int], dict] = {}       # (тип, id) -> текст, популярность, ключи
+        self._book_loans: Dict[int, int] = {}
+        self._book_authors: Dict[int, Set[int]] = {}
+        self._book_publisher: Dict[int, Optional[int]] = {}
+        self._top_cache: Dict[str, list] = {}
+        self._loaded_at = 0.0
+        self._reloading = False
+        self._lock = threading.RLock()
+
+    # ---------- содержимое ----------
+
+    def _put(self, kind: str, item_id: int, text: str, keys: List[str]) -> None:
+        item = self._items.get((kind, item_id))
+        popularity = item["popularity"] if item else 0
+        self._remove(kind, item_id)
+        keys = list(dict.fromkeys(keys))
+        for key in keys:
+            bisect.insort(self._entries, (key, kind, item_id))
+        self._items[(kind, item_id)] = {"text": text, "popularity": popularity, "keys": keys}
+        self._top_cache.clear()
+
+    def _remove(self, kind: str, item_id: int) -> None:
+        item = self._items.pop((kind, item_id), None)
+        if item is None:
+            return
+        for key in item["keys"]:
+            position = bisect.bisect_left(self._entries, (key, kind, item_id))
+            if position < len(self._entries) and self._entries[position] == (key, kind, item_id):
+                del self._entries[position]
+        self._top_cache.clear()
+
+    def _add_popularity(self, kind: str, item_id: Optional[int], delta: int) -> None:
+        item = self._items.get((kind, item_id))
+        if item is not None and delta:
+            item["popularity"] += delta
+            self._top_cache.clear()
+
+    # ---------- загрузка ----------
+
+    def load(self, session: Session) -> int:
+        """Построить индекс по БД. Популярность - число выдач книги (для автора
+        и издательства - сумма по их книгам). Возвращает число подсказок"""
+        loans = (
+            select(BookCopy.book_id, func.count(Loan.id).label("loans"))
+            .join(Loan, Loan.book_copy_id == BookCopy.id)
+            .group_by(BookCopy.book_id)
+            .subquery()
+        )
+        books = (
+            select(Book.id, Book.main_title, Book.publisher_id, func.coalesce(loans.c.loans, 0))
+            .outerjoin(loans, loans.c.book_id == Book.id)
+            .execution_options(yield_per=5000)
+        )
+        fresh = SuggestIndex()
+        entries = []
+        for book_id, title, publisher_id, book_loans in session.execute(books):
+            keys = _title_keys(title)
+            entries += [(key, "title", book_id) for key in keys]
+            fresh._items[("title", book_id)] = {"text": title, "popularity": book_loans, "keys": keys}
+            fresh._book_loans[book_id] = book_loans
+            fresh._book_publisher[book_id] = publisher_id
+            fresh._book_authors[book_id] = set()
+        for author in session.exec(select(Author).execution_options(yield_per=5000)):
+            key = normalize(author.last_name)
+            keys = [key] if key else []
+            entries += [(key, "author", author.id) for key in keys]
+            fresh._items[("author", author.id)] = {"text": _author_name(author), "popularity": 0, "keys": keys}
+        for publisher in session.exec(select(Publisher)):
+            key = normalize(publisher.name)
+            keys = [key] if key else []
+            entries += [(key, "publisher", publisher.id) for key in keys]
+            fresh._items[("publisher", publisher.id)] = {"text": publisher.name, "popularity": 0, "keys": keys}
+        for book_id, author_id in session.execute(select(BookAuthor.book_id, BookAuthor.author_id)):
+            fresh._book_authors.setdefault(book_id, set()).add(author_id)
+            fresh._add_popularity("author", author_id, fresh._book_loans.get(book_id, 0))
+        for book_id, publisher_id in fresh._book_publisher.items():
+            fresh._add_popularity("publisher", publisher_id, fresh._book_loans[book_id])
+        entries.sort()
+        fresh._entries = entries
+
+        with self._lock:
+            self._entries, self._items = fresh._entries, fresh._items
+            self._book_loans, self._book_authors = fresh._book_loans, fresh._book_authors
+            self._book_publisher = fresh._book_publisher
+            self._top_cache = {}
+            self._loaded_at = time.monotonic()
+            self.loaded = True
+        return len(self._items)
+
+    def reload_if_due(self, bind) -> bool:
+        """Перестроить индекс в фоновом потоке, если с прошлой загрузки прошло
+        SUGGEST_RELOAD_SECONDS; до конца перестроения подсказки идут по текущему индексу"""
+        with self._lock:
+            if not self.loaded or self._reloading or SUGGEST_RELOAD_SECONDS <= 0 \
+                    or time.monotonic() - self._loaded_at < SUGGEST_RELOAD_SECONDS:
+                return False
+            self._reloading = True
+            self._loaded_at = time.monotonic()  # При ошибке следующая попытка - через интервал
+        threading.Thread(target=self._reload, args=(bind,), name="suggest-reload", daemon=True).start()
+        return True
+
+    def _reload(self, bind) -> None:
+        try:
+            with Session(bind) as session:
+                self.load(session)
+        except Exception as e:
+            print(f"⚠️ Не удалось перестроить подсказки: {e}")
+        finally:
+            self._reloading = False
+
+    # ---------- инкрементальные изменения ----------
+
+    def put_book(self, book) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            book_loans = self._book_loans.setdefault(book.id, 0)
+            self._book_authors.setdefault(book.id, set())
+            old_publisher = self._book_publisher.get(book.id)
+            if old_publisher != book.publisher_id:
+                self._add_popularity("publisher", old_publisher, -book_loans)
+                self._add_popularity("publisher", book.publisher_id, book_loans)
+            self._book_publisher[book.id] = book.publisher_id
+            self._put("title", book.id, book.main_title, _title_keys(book.main_title))
+
+    def remove_book(self, book_id: int) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            book_loans = self._book_loans.pop(book_id, 0)
+            self._add_popularity("publisher", self._book_publisher.pop(book_id, None), -book_loans)
+            for author_id in self._book_authors.pop(book_id, set()):
+                self._add_popularity("author", author_id, -book_loans)
+            self._remove("title", book_id)
+
+    def put_author(self, author) -> None:
+        if not self.loaded:
+            return
+        key = normalize(author.last_name)
+        with self._lock:
+            self._put("author", author.id, _author_name(author), [key] if key else [])
+
+    def put_publisher(self, publisher) -> None:
+        if not self.loaded:
+            return
+        key = normalize(publisher.name)
+        with self._lock:
+            self._put("publisher", publisher.id, publisher.name, [key] if key else [])
+
+    def remove(self, kind: str, item_id: int) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            self._remove(kind, item_id)
+
+    def link_author(self, book_id: int, author_id: int, linked: bool = True) -> None:
+        """Связь книга-автор создана (linked=False - удалена): популярность книги переходит к автору"""
+        if not self.loaded:
+            return
+        with self._lock:
+            authors = self._book_authors.setdefault(book_id, set())
+            if linked == (author_id in authors):
+                return
+            if linked:
+                authors.add(author_id)
+            else:
+                authors.discard(author_id)
+            book_loans = self._book_loans.get(book_id, 0)
+            self._add_popularity("author", author_id, book_loans if linked else -book_loans)
+
+    def add_loans(self, book_id: Optional[int], count: int = 1) -> None:
+        """Выдачи книги добавлены (count > 0) или удалены (count < 0): сдвинуть
+        популярность книги, ее авторов и издательства"""
+        if not self.loaded or book_id is None or not count:
+            return
+        with self._lock:
+            self._book_loans[book_id] = self._book_loans.get(book_id, 0) + count
+            self._add_popularity("title", book_id, count)
+            self._add_popularity("publisher", self._book_publisher.get(book_id), count)
+            for author_id in self._book_authors.get(book_id, set()):
+                self._add_popularity("author", author_id, count)
+
+    # ---------- подсказки ----------
+
+    def suggest(self, prefix: str, limit: int = 10, kinds: Optional[List[str]] = None) -> List[dict]:
+        """Лучшие по популярности подсказки для префикса"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        kinds = tuple(kinds or SUGGEST_KINDS)
+        cache_key = f"{prefix}|{','.join(kinds)}"
+        with self._lock:
+            cached = self._top_cache.get(cache_key)
+            if cached is None:
+                start = bisect.bisect_left(self._entries, (prefix,))
+                end = bisect.bisect_left(self._entries, (prefix + "\uffff",))
+                found = {(kind, item_id) for _, kind, item_id in self._entries[start:end] if kind in kinds}
+                best = heapq.nsmallest(
+                    SUGGEST_MAX_LIMIT, found,
+                    key=lambda ref: (-self._items[ref]["popularity"], self._items[ref]["text"], ref)
+                )
+                cached = [
+                    {"type": kind, "id": item_id, "text": self._items[(kind, item_id)]["text"],
+                     "popularity": self._items[(kind, item_id)]["popularity"]}
+                    for kind, item_id in best
+                ]
+                if len(prefix) <= SUGGEST_CACHED_PREFIX:
+                    self._top_cache[cache_key] = cached
+        return cached[:limit]
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,421 @@
+import argparse
+import csv
+import io
+import json
+import queue
+import sys
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterator, Optional
+
+import psycopg2
+from pydantic import ValidationError, create_model
+from sqlmodel import Session, select, or_
+from database import get_engine
+from fulltext import refresh_current_transaction_sql
+from name_keys import refresh_changed_rows
+from identifiers import with_isbn13
+from classification import changed_book_ids, refresh_classification, refresh_copy_counts
+from keywords import refresh_book_keywords
+from catalog_index import catalog_index
+from facet_cache import facet_cache
+from suggest_index import suggest_index
+from statistics_engine import changed_date_window, refresh_statistics_dates
+from models import *
+
+# ==================== ИМПОРТ/ЭКСПОРТ CSV ЧЕРЕЗ COPY ====================
+# Таблицы, доступные для обмена: модель, схема проверки строк и ключ слияния
+TRANSFER_TABLES = {
+    "readers": {"model": Reader, "schema": ReaderCreate, "key": "id"},
+    "books": {"model": Book, "schema": BookCreate, "key": "id"},
+    "book_copies": {"model": BookCopy, "schema": BookCopyCreate, "key": "inventory_number"},
+}
+
+IMPORT_BATCH_SIZE = 10000    # Строк в одной порции COPY FROM STDIN
+MAX_REPORTED_ERRORS = 100    # Сколько ошибок возвращать в отчете
+EXPORT_QUEUE_SIZE = 64       # Порций CSV в очереди потоковой выгрузки
+
+
+class ExportCancelled(Exception):
+    """Клиент перестал читать выгрузку"""
+
+
+def _table_name(table) -> str:
+    return f'"{table.schema}"."{table.name}"'
+
+
+def _column_list(columns) -> str:
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+def _get_spec(table: str) -> dict:
+    if table not in TRANSFER_TABLES:
+        raise ValueError(f"Таблица {table} не поддерживает импорт/экспорт")
+    return TRANSFER_TABLES[table]
+
+
+# ==================== ЭКСПОРТ ====================
+
+def export_csv(table: str, out) -> None:
+    """Выгрузить таблицу в CSV через COPY TO STDOUT (out - файл или поток)"""
+    model = _get_spec(table)["model"]
+    columns = list(model.__table__.columns.keys())
+    sql = (f"COPY (SELECT {_column_list(columns)} FROM {_table_name(model.__table__)} ORDER BY id) "
+           f"TO STDOUT WITH (FORMAT csv, HEADER true)")
+
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.copy_expert(sql, out)
+        cursor.close()
+    finally:
+        connection.close()
+
+
+class _QueueWriter:
+    """Файлоподобный приемник COPY, передающий порции в очередь"""
+
+    def __init__(self, chunks: queue.Queue, stop: threading.Event):
+        self.chunks = chunks
+        self.stop = stop
+
+    def write(self, data) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.put(data)
+
+    def put(self, item) -> None:
+        """Положить в очередь, пока клиент не отключился (иначе ExportCancelled)"""
+        while True:
+            if self.stop.is_set():
+                raise ExportCancelled()
+            try:
+                self.chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+
+def iter_export_csv(table: str) -> Iterator[bytes]:
+    """Потоковая выгрузка CSV: COPY пишет в фоне, наружу идут порции из очереди.
+
+    Очередь ограничена, поэтому в памяти не больше EXPORT_QUEUE_SIZE порций,
+    а если клиент отключился, COPY прерывается.
+    """
+    _get_spec(table)
+    chunks = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+    stop = threading.Event()
+    done = object()
+
+    def worker():
+        writer = _QueueWriter(chunks, stop)
+        try:
+            export_csv(table, writer)
+            result = done
+        except ExportCancelled:
+            return
+        except Exception as e:
+            result = e  # Ошибка поднимется в потоке, читающем очередь
+        try:
+            writer.put(result)
+        except ExportCancelled:
+            pass  # Клиент отключился, пока очередь была полна
+
+    threading.Thread(target=worker, daemon=True).start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+# ==================== ПОТОКОВАЯ ВЫГРУЗКА NDJSON ====================
+# Таблицы для ночной синхронизации: у всех есть created_at (фильтр since)
+NDJSON_TABLES = {
+    "loans": Loan,
+    "visits": Visit,
+    "payments": Payment,
+    "readers": Reader,
+    "books": Book,
+    "book_copies": BookCopy,
+}
+
+STREAM_BATCH_SIZE = 1000     # Строк, забираемых с серверного курсора за раз
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def iter_export_ndjson(table: str, since: Optional[datetime] = None) -> Iterator[bytes]:
+    """Выгрузить таблицу построчно в NDJSON через серверный курсор.
+
+    Строки читаются порциями по STREAM_BATCH_SIZE (stream_results/yield_per),
+    поэтому память не зависит от размера таблицы. since оставляет только записи,
+    созданные или измененные начиная с этого момента.
+    """
+    model = NDJSON_TABLES[table]
+    table_columns = model.__table__.columns
+    query = select(*table_columns).order_by(model.id)
+    if since is not None:
+        query = query.where(or_(*[
+            table_columns[name] >= since for name in ("created_at", "updated_at") if name in table_columns
+        ]))
+
+    with get_engine().connect() as connection:
+        result = connection.execution_options(yield_per=STREAM_BATCH_SIZE).execute(query)
+        for rows in result.mappings().partitions():
+            yield "".join(
+                json.dumps(dict(row), ensure_ascii=False, default=_json_default) + "\n" for row in rows
+            ).encode("utf-8")
+
+
+# ==================== ИМПОРТ ====================
+
+@lru_cache(maxsize=None)
+def _import_schema(table: str):
+    """Схема проверки строки: схема создания + остальные колонки таблицы (id, is_active, ...)"""
+    spec = _get_spec(table)
+    schema = spec["schema"]
+    extra = {
+        name: (Optional[field.annotation], None)
+        for name, field in spec["model"].model_fields.items()
+        if name not in schema.model_fields
+    }
+    return create_model(f"{spec['model'].__name__}Import", __base__=schema, **extra)
+
+
+def _row_defaults(table: str) -> dict:
+    """Значения по умолчанию для всех колонок; считаются один раз на импорт"""
+    spec = _get_spec(table)
+    schema = spec["schema"]
+    defaults = {}
+    for name, field in spec["model"].model_fields.items():
+        source = schema.model_fields.get(name, field)
+        defaults[name] = source.get_default(call_default_factory=True)
+    return defaults
+
+
+def _copy_batch(cursor, staging: str, columns: list, rows: list) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {staging} ({_column_list(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _reject_missing_references(cursor, model, staging: str, errors: list) -> int:
+    """Удалить из промежуточной таблицы строки с несуществующими внешними ключами"""
+    rejected = 0
+    for column in model.__table__.columns:
+        for foreign_key in column.foreign_keys:
+            target = foreign_key.column
+            cursor.execute(
+                f'DELETE FROM {staging} s WHERE s."{column.name}" IS NOT NULL AND NOT EXISTS '
+                f'(SELECT 1 FROM {_table_name(target.table)} r WHERE r."{target.name}" = s."{column.name}") '
+                f'RETURNING s._line, s."{column.name}"'
+            )
+            rejected += cursor.rowcount
+            for line, value in cursor.fetchmany(MAX_REPORTED_ERRORS):
+                errors.append({"line": line, "error": f"{column.name}={value}: запись не найдена"})
+    return rejected
+
+
+def _merge(cursor, spec: dict, staging: str, columns: list, header: list) -> tuple:
+    """Слить промежуточную таблицу в основную. Возвращает (вставлено, обновлено).
+
+    У существующих записей обновляются только колонки, присутствующие в CSV.
+    """
+    model = spec["model"]
+    key = spec["key"]
+    target = _table_name(model.__table__)
+    data_columns = [column for column in columns if column != "id"]
+    update_columns = [column for column in header if column not in ("id", key, "created_at", "updated_at")]
+    assignments = [f'"{column}" = EXCLUDED."{column}"' for column in update_columns]
+    if "updated_at" in columns:
+        assignments.append('"updated_at" = now()')
+    update_set = ", ".join(assignments) or f'"{key}" = EXCLUDED."{key}"'
+
+    def upsert(insert_columns: list, where: str) -> tuple:
+        cursor.execute(
+            f"WITH merged AS ("
+            f"  INSERT INTO {target} ({_column_list(insert_columns)}) "
+            f"  SELECT DISTINCT ON (\"{key}\") {_column_list(insert_columns)} FROM {staging} "
+            f"  WHERE {where} ORDER BY \"{key}\", _line DESC "
+            f"  ON CONFLICT (\"{key}\") DO UPDATE SET {update_set} "
+            f"  RETURNING (xmax = 0) AS inserted"
+            f") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+        )
+        return cursor.fetchone()
+
+    if key == "id":
+        cursor.execute(
+            f"INSERT INTO {target} ({_column_list(data_columns)}) "
+            f"SELECT {_column_list(data_columns)} FROM {staging} WHERE id IS NULL ORDER BY _line"
+        )
+        inserted = cursor.rowcount
+        merged_inserted, updated = upsert(columns, "id IS NOT NULL")
+        # Явно заданные ID могли обогнать последовательность
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{target}', 'id'), "
+            f"GREATEST((SELECT max(id) FROM {target}), 1))"
+        )
+        return inserted + merged_inserted, updated
+
+    return upsert(data_columns, "TRUE")
+
+
+def import_csv(table: str, source) -> dict:
+    """Загрузить CSV (текстовый поток) в таблицу: проверка -> COPY в staging -> слияние"""
+    spec = _get_spec(table)
+    model = spec["model"]
+    schema = spec["schema"]
+    columns = list(model.__table__.columns.keys())
+
+    reader = csv.DictReader(source)
+    header = reader.fieldnames or []
+    unknown = [name for name in header if name not in columns]
+    if unknown:
+        raise ValueError(f"Неизвестные колонки: {', '.join(unknown)}")
+    required = [name for name, field in schema.model_fields.items() if field.is_required()]
+    missing = [name for name in required if name not in header]
+    if missing:
+        raise ValueError(f"Нет обязательных колонок: {', '.join(missing)}")
+
+    import_schema = _import_schema(table)
+    defaults = _row_defaults(table)
+    # isbn13 вычисляется из isbn и обновляется вместе с ним
+    derive_isbn13 = model is Book and "isbn" in header
+    if derive_isbn13 and "isbn13" not in header:
+        header = header + ["isbn13"]
+    staging = f"staging_{model.__table__.name}"
+    staging_columns = columns + ["_line"]
+    errors = []
+    rows_read = 0
+    rows_invalid = 0
+
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {_column_list(columns)}, 0 AS _line FROM {_table_name(model.__table__)} WITH NO DATA"
+        )
+
+        batch = []
+        for row in reader:
+            rows_read += 1
+            line = reader.line_num
+            values = {key: value for key, value in row.items() if value not in ("", None)}
+            try:
+                validated = import_schema(**values).dict(exclude_unset=True)
+            except ValidationError as e:
+                rows_invalid += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "error": "; ".join(
+                        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                    )})
+                continue
+            if derive_isbn13:
+                validated = with_isbn13({"isbn": None, **validated})
+            batch.append({**defaults, **validated, "_line": line})
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _copy_batch(cursor, staging, staging_columns, batch)
+                batch = []
+        if batch:
+            _copy_batch(cursor, staging, staging_columns, batch)
+
+        rows_invalid += _reject_missing_references(cursor, model, staging, errors)
+        inserted, updated = _merge(cursor, spec, staging, columns, header)
+        if model is Book:
+            # Поисковые документы загруженных книг - в той же транзакции
+            cursor.execute(refresh_current_transaction_sql())
+        if model is Reader:
+            refresh_changed_rows(cursor, "reader")  # Ключи имен для поиска читателей
+        classified = changed_book_ids(cursor, model) if model in (Book, BookCopy) else []
+        stat_window = changed_date_window(cursor, model) if model in (Reader, BookCopy) else None
+        cursor.close()
+        connection.commit()
+    except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+        connection.rollback()
+        raise ValueError(f"Данные отклонены базой: {e.pgerror or e}")
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    if classified:
+        # Индексы УДК/ББК, счетчики узлов классификации и ключевые слова загруженных книг
+        with Session(get_engine()) as session:
+            if model is Book:
+                refresh_classification(session, classified)
+                refresh_book_keywords(session, classified)
+                # Встроенный индекс каталога и подсказки этого процесса (остальные сверятся сами)
+                catalog_index.index_books(session, classified)
+                facet_cache.clear()
+                if suggest_index.loaded:
+                    suggest_index.load(session)
+            else:
+                refresh_copy_counts(session, classified)
+    if stat_window:
+        # Ежедневная статистика дней регистрации читателей / поступления экземпляров
+        with Session(get_engine()) as session:
+            refresh_statistics_dates(session, stat_window)
+
+    errors.sort(key=lambda err: err["line"])
+    return {
+        "table": table,
+        "rows_read": rows_read,
+        "rows_rejected": rows_invalid,
+        "inserted": inserted,
+        "updated": updated,
+        "errors": errors[:MAX_REPORTED_ERRORS]
+    }
+
+
+# ==================== КОМАНДНАЯ СТРОКА ====================
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Импорт/экспорт CSV через PostgreSQL COPY")
+    parser.add_argument("action", choices=["import", "export"], help="Что сделать")
+    parser.add_argument("table", choices=sorted(TRANSFER_TABLES), help="Таблица")
+    parser.add_argument("file", nargs="?", default="-", help="CSV-файл (по умолчанию stdin/stdout)")
+    args = parser.parse_args(argv)
+
+    if args.action == "export":
+        if args.file == "-":
+            export_csv(args.table, sys.stdout.buffer)
+        else:
+            with open(args.file, "wb") as out:
+                export_csv(args.table, out)
+            print(f"✅ Таблица {args.table} выгружена в {args.file}", file=sys.stderr)
+        return 0
+
+    if args.file == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        report = import_csv(args.table, source)
+    else:
+        with open(args.file, encoding="utf-8-sig", newline="") as source:
+            report = import_csv(args.table, source)
+
+    print(f"📥 Прочитано строк: {report['rows_read']}", file=sys.stderr)
+    print(f"✅ Добавлено: {report['inserted']}, обновлено: {report['updated']}", file=sys.stderr)
+    if report["rows_rejected"]:
+        print(f"⚠️ Отклонено строк: {report['rows_rejected']}", file=sys.stderr)
+        for error in report["errors"]:
+            print(f"   строка {error['line']}: {error['error']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())